@@ -0,0 +1,325 @@
+"""
+SCP 原始页面归档模块 - 压缩保存抓取到的 HTML，可离线按当前解析逻辑重新解析
+
+归档是只追加的单个文件（思路与 WARC 相同），每条记录为：
+    SCPARC1 {"key": ..., "url": ..., "length": ..., "sha1": ..., "fetched_at": ...}\\n
+    <zlib 压缩的原始字节>\\n
+旁边的 <归档>.idx 为 JSON Lines 偏移索引（同一键以最后一行为准），索引丢失或落后于归档时
+会从归档本身扫描重建。内容与上次归档相同的页面不会重复写入。
+
+条目页的键为 scp-<编号>，系列页为 series-<编号>（重新解析时用它们还原名称），
+链接图前沿抓取的非编号页面为 page-<页面名>（reparse 只处理条目页）。
+
+重新解析（不访问网络，内存映射随机读取，多进程并行）：
+    python archive.py reparse scp_pages.arc --output scp_database_cn.json [--workers 8]
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'SCPARC1 '
+
+
+def item_key(scp_id: int) -> str:
+    return f"scp-{scp_id}"
+
+
+def series_key(series_number: int) -> str:
+    return f"series-{series_number}"
+
+
+def page_key(name: str) -> str:
+    return f"page-{name}"
+
+
+class PageArchive:
+    """只追加的压缩页面归档（线程安全，单进程写入）"""
+
+    def __init__(self, path: str, level: int = 6, readonly: bool = False):
+        """
+        Args:
+            path: 归档文件路径，不存在时创建
+            level: zlib 压缩级别
+            readonly: 只读打开（重新解析、统计）：归档不存在时抛出 FileNotFoundError，
+                不创建、不截断任何文件，索引落后时只在内存中补全
+        """
+        self.path = path
+        self.index_path = path + '.idx'
+        self.level = level
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._index_file = None
+        self._file = open(path, 'rb' if readonly else 'ab')
+        self._file.seek(0, os.SEEK_END)
+        self._end = self._load_index()
+        if self._end < self._file.tell():
+            self._recover_tail()
+        if not readonly:
+            self._index_file = open(self.index_path, 'a', encoding='utf-8')
+
+    def _load_index(self) -> int:
+        """读取偏移索引，返回已被索引覆盖的归档末尾位置"""
+        end = 0
+        if not os.path.exists(self.index_path):
+            return end
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时残留的半行；其对应记录会在扫描归档尾部时补回
+                    continue
+                self._entries[entry['key']] = entry
+                end = max(end, entry['offset'] + entry['size'])
+        return end
+
+    def _recover_tail(self) -> None:
+        """从索引末尾扫描归档，补全缺失的索引项，并截掉不完整的尾部记录"""
+        entries = []
+        good_end = self._end
+        with open(self.path, 'rb') as f:
+            f.seek(self._end)
+            for offset, header, size in _scan(f):
+                entries.append(dict(header, offset=offset, size=size))
+                good_end = offset + size
+        for entry in entries:
+            self._entries[entry['key']] = entry
+        self._end = good_end
+        if self.readonly:
+            return
+        if good_end < self._file.tell():
+            self._file.truncate(good_end)
+            self._file.seek(good_end)
+        with open(self.index_path, 'a', encoding='utf-8') as index_file:
+            index_file.write('\n')
+            for entry in entries:
+                index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def put(self, key: str, content: bytes, url: str = '') -> bool:
+        """归档一个页面；内容与该键上次归档的版本相同时跳过
+
+        Returns:
+            是否写入了新记录
+        """
+        if self.readonly:
+            raise io.UnsupportedOperation(f"归档以只读方式打开: {self.path}")
+        digest = hashlib.sha1(content).hexdigest()
+        if self._unchanged(key, digest):
+            return False
+        payload = zlib.compress(content, self.level)
+        header = {'key': key, 'url': url, 'length': len(payload), 'raw_length': len(content),
+                  'sha1': digest, 'fetched_at': round(time.time(), 3)}
+        head = MAGIC + json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            # 压缩在锁外进行；并发归档同一内容时只保留先到的一份
+            if self._unchanged(key, digest):
+                return False
+            offset = self._end
+            self._file.write(head + payload + b'\n')
+            self._file.flush()
+            entry = dict(header, offset=offset, size=len(head) + len(payload) + 1)
+            self._end = offset + entry['size']
+            self._entries[key] = entry
+            self._index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index_file.flush()
+        return True
+
+    def _unchanged(self, key: str, digest: str) -> bool:
+        previous = self._entries.get(key)
+        return previous is not None and previous['sha1'] == digest
+
+    def entries(self) -> List[Dict]:
+        """全部键的最新索引项（按归档偏移排序）"""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry['offset'])
+
+    def get(self, key: str) -> Optional[bytes]:
+        """读取一个页面的原始字节"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self.readonly:
+                self._file.flush()
+        with open(self.path, 'rb') as f:
+            return read_entry(f, entry)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                if self._index_file is not None:
+                    self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _scan(f) -> Iterator[Tuple[int, Dict, int]]:
+    """从当前位置顺序扫描完整的记录，产出 (偏移, 头部, 记录字节数)；遇到不完整记录即停止"""
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line.startswith(MAGIC) or not line.endswith(b'\n'):
+            return
+        try:
+            header = json.loads(line[len(MAGIC):])
+        except json.JSONDecodeError:
+            return
+        payload = f.read(header['length'] + 1)
+        if len(payload) != header['length'] + 1:
+            return
+        yield offset, header, len(line) + len(payload)
+
+
+def read_entry(buffer, entry: Dict) -> bytes:
+    """按索引项从文件对象或内存映射中读取并解压页面"""
+    start = entry['offset'] + entry['size'] - 1 - entry['length']
+    if isinstance(buffer, mmap.mmap):
+        payload = buffer[start:start + entry['length']]
+    else:
+        buffer.seek(start)
+        payload = buffer.read(entry['length'])
+    return zlib.decompress(payload)
+
+
+# --- 重新解析 ---
+
+_worker_map: Optional[mmap.mmap] = None
+
+
+def _init_worker(path: str, html_backend: Optional[str], text_options: Tuple[bool, bool]) -> None:
+    """解析进程初始化：映射归档文件并选择与主进程相同的解析后端与字段值规范化选项"""
+    global _worker_map
+    from temp_scraper import init_parse_worker
+    init_parse_worker(html_backend, text_options)
+    with open(path, 'rb') as f:
+        _worker_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _reparse_batch(batch: List[Tuple[int, Dict, str]]) -> List[Tuple[int, Dict]]:
+    from temp_scraper import parse_scp_page
+    results = []
+    for scp_id, entry, scp_name in batch:
+        try:
+            record = parse_scp_page(scp_id, read_entry(_worker_map, entry), entry['url'], scp_name)
+        except Exception as e:
+            record = {'error': f'解析失败: {e}'}
+        results.append((scp_id, record))
+    return results
+
+
+def reparse_archive(path: str, workers: Optional[int] = None, batch_size: int = 64,
+                    html_backend: Optional[str] = None) -> Tuple[Dict[str, Dict], List[int]]:
+    """用当前的解析逻辑重新解析归档中的全部条目页，不访问网络
+
+    Args:
+        path: 归档文件
+        workers: 解析进程数，默认为 CPU 核数
+        batch_size: 每个任务包含的页面数（减少进程间通信次数）
+        html_backend: HTML 解析后端，默认为当前后端
+
+    Returns:
+        (按编号排序的 db, 解析失败的编号)
+    """
+    import temp_scraper
+    from series_index import SeriesIndex
+
+    archive = PageArchive(path, readonly=True)
+    entries = archive.entries()
+    # 系列页同样来自归档，名称与在线爬取时一致
+    series = SeriesIndex(lambda n: archive.get(series_key(n)) or b'')
+    tasks = []
+    for entry in entries:
+        if entry['key'].startswith('scp-'):
+            scp_id = int(entry['key'][4:])
+            tasks.append((scp_id, entry, series.get_name(scp_id)))
+    archive.close()
+    tasks.sort(key=lambda task: task[0])
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+    db, failed_ids = {}, []
+    backend = html_backend or temp_scraper.HTML_BACKEND
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                                initializer=_init_worker,
+                                                initargs=(path, backend, temp_scraper.text_options())) as pool:
+        for results in pool.map(_reparse_batch, batches):
+            for scp_id, record in results:
+                if record and 'error' not in record:
+                    db[str(scp_id)] = record
+                else:
+                    failed_ids.append(scp_id)
+    return db, failed_ids
+
+
+def run_reparse(args) -> None:
+    """reparse 命令（archive.py 与 cli.py 共用）：重新解析归档并写出数据库
+
+    Args:
+        args: 含 archive、output、workers、html_backend、fold_variants、redact_blocks 的命令行参数
+    """
+    import temp_scraper
+    from storage import write_json_database
+
+    temp_scraper.set_text_options(fold_variants=args.fold_variants, redact_blocks=args.redact_blocks)
+    start = time.perf_counter()
+    try:
+        db, failed_ids = reparse_archive(args.archive, args.workers, html_backend=args.html_backend)
+    except FileNotFoundError:
+        sys.exit(f"归档文件不存在: {args.archive}")
+    if not db:
+        sys.exit(f"归档 {args.archive} 中没有解析成功的条目页，未写出 {args.output}")
+    write_json_database(db.items(), args.output)
+    print(f"重新解析 {len(db) + len(failed_ids)} 个页面: 成功 {len(db)} 个, 失败 {len(failed_ids)} 个, "
+          f"耗时 {time.perf_counter() - start:.2f} 秒")
+    if failed_ids:
+        print(f"失败的ID: {sorted(failed_ids)}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    reparse = commands.add_parser('reparse', help="按当前解析逻辑重新解析归档，写出数据库")
+    reparse.add_argument('archive')
+    reparse.add_argument('--output', default='scp_database_cn.json', help="数据库输出文件")
+    reparse.add_argument('--workers', type=int, default=None, help="解析进程数（默认 CPU 核数）")
+    reparse.add_argument('--html-backend', choices=['bs4', 'strainer', 'lxml'], default=None)
+    reparse.add_argument('--fold-variants', action='store_true', help="字段值中的繁体字折叠为简体")
+    reparse.add_argument('--redact-blocks', action='store_true', help="字段值中的涂黑字符替换为 [REDACTED]")
+    stats = commands.add_parser('stats', help="归档概况")
+    stats.add_argument('archive')
+    args = arg_parser.parse_args()
+
+    if args.command == 'stats':
+        with PageArchive(args.archive, readonly=True) as archive:
+            entries = archive.entries()
+        raw = sum(entry['raw_length'] for entry in entries)
+        stored = os.path.getsize(args.archive)
+        pages = sum(1 for entry in entries if entry['key'].startswith('scp-'))
+        print(f"{len(entries)} 个键（条目页 {pages} 个），原始 {raw / 1e6:.1f} MB，归档 {stored / 1e6:.1f} MB")
+        return
+
+    run_reparse(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+SCP 异步爬取引擎 - 基于 asyncio/aiohttp 的批量抓取，可替代线程池主循环
+
+网络请求由事件循环并发调度，HTML 解析交给工作池执行，避免阻塞事件循环。
+输出记录与同步路径 scrape_scp 完全一致（共用 parse_scp_page）。
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖：仅 async 引擎需要
+    aiohttp = None
+
+import temp_scraper
+from archive import item_key, series_key
+from temp_scraper import (
+    archive_page,
+    get_item_url,
+    get_scp_name_from_series,
+    get_series_number,
+    get_retry_strategy,
+    get_series_url,
+    get_session,
+    init_parse_worker,
+    parse_scp_page,
+    parse_worker_options,
+    report_exception,
+    report_result,
+    series_index,
+    series_page_cache,
+    vprint,
+)
+from metrics import metrics
+from series_index import SERIES_NUMBERS
+from throttle import RETRY_STATUSES, parse_retry_after
+
+
+REQUEST_TIMEOUT = 10
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise RuntimeError("async 引擎需要 aiohttp，请先执行: pip install aiohttp")
+
+
+async def fetch_bytes(http, url: str) -> Tuple[bytes, str]:
+    """异步 GET，重试策略与同步 session 的 urllib3 Retry 保持一致
+
+    启用了自适应限速（temp_scraper.enable_throttle）时，请求先经过同一个节流器，
+    429/503 由节流器按 Retry-After 暂停后重发，不再使用固定退避。
+
+    Returns:
+        (页面内容, 最终URL)
+    """
+    throttle = temp_scraper.throttle
+    host = throttle.for_url(url) if throttle is not None else None
+    retry_strategy = get_retry_strategy()
+    retries = retry_strategy.total
+    for attempt in range(retries + 1):
+        throttled = released = False
+        if attempt:
+            metrics.inc('http_retries_total')
+        if host is not None:
+            await host.acquire_async()
+        start = time.monotonic()
+        try:
+            async with http.get(url) as resp:
+                metrics.inc('http_responses_total', labels={'status': resp.status})
+                metrics.observe('http_ttfb_seconds', time.monotonic() - start)
+                if host is not None:
+                    host.release(resp.status, time.monotonic() - start,
+                                 parse_retry_after(resp.headers.get('Retry-After')))
+                    released = True
+                    throttled = resp.status in RETRY_STATUSES
+                if resp.status in retry_strategy.status_forcelist and attempt < retries:
+                    await resp.release()
+                else:
+                    resp.raise_for_status()
+                    content = await resp.read()
+                    metrics.inc('http_bytes_total', len(content))
+                    return content, str(resp.url)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if host is not None and not released:
+                host.release(None, time.monotonic() - start)
+            if attempt >= retries:
+                raise
+        if not throttled:
+            await asyncio.sleep(retry_strategy.backoff_factor * (2 ** attempt))
+    raise aiohttp.ClientError(f"重试次数耗尽: {url}")
+
+
+def process_parse_pool(max_workers: Optional[int] = None) -> concurrent.futures.ProcessPoolExecutor:
+    """创建解析进程池（作为 parse_pool 传入），子进程沿用主进程当前的 HTML 后端与字段值规范化选项"""
+    return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_parse_worker,
+                                                  initargs=parse_worker_options())
+
+
+async def warm_series_index(http, semaphore: asyncio.Semaphore, parse_pool) -> None:
+    """异步下载全部系列页并在工作池中解析进系列索引"""
+    loop = asyncio.get_running_loop()
+
+    async def download(series_number: int) -> bytes:
+        async with semaphore:
+            content, final_url = await fetch_bytes(http, get_series_url(series_number))
+        archive_page(series_key(series_number), content, final_url)
+        return content
+
+    async def load(series_number: int):
+        if series_index.is_loaded(series_number):
+            return
+        # 与同步路径共用单飞缓存：回退到线程中查询名称时不会再次下载
+        try:
+            content = await series_page_cache.get_async(series_number, download)
+        except Exception as e:
+            vprint(f"获取系列页失败 {get_series_url(series_number)}: {e}")
+            return
+        await loop.run_in_executor(parse_pool, series_index.ingest, series_number, content)
+
+    await asyncio.gather(*(load(s) for s in SERIES_NUMBERS))
+
+
+async def scrape_scp_async(http, id: int, semaphore: asyncio.Semaphore, parse_pool=None) -> Dict:
+    """scrape_scp 的异步版本，返回结构完全相同的记录字典"""
+    loop = asyncio.get_running_loop()
+    url = get_item_url(id)
+
+    with metrics.page(id):
+        # 系列已载入时名称查询是纯字典命中；否则回退到线程中执行阻塞查询
+        with metrics.stage('series_lookup'):
+            if series_index.is_loaded(get_series_number(id)):
+                scp_name = series_index.get_name(id)
+            else:
+                scp_name = await loop.run_in_executor(None, get_scp_name_from_series, id)
+
+        try:
+            async with semaphore:
+                with metrics.stage('fetch'):
+                    content, final_url = await fetch_bytes(http, url)
+            vprint(f"成功访问: {url}")
+            archive_page(item_key(id), content, final_url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            vprint(f"请求失败 {url}: {str(e)}")
+            return {'error': f'请求失败: {str(e)}'}
+
+        if isinstance(parse_pool, concurrent.futures.ProcessPoolExecutor):
+            return await loop.run_in_executor(parse_pool, parse_scp_page, id, content, final_url, scp_name)
+        # run_in_executor 不传递 contextvars；在当前上下文的副本中运行，解析阶段才能计入本页明细
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(parse_pool, context.run, parse_scp_page, id, content, final_url, scp_name)
+
+
+async def crawl_async_main(ids: Iterable[int], concurrency: int = 32, limit_per_host: int = 8,
+                           parse_pool: Optional[concurrent.futures.Executor] = None, sink=None,
+                           checkpoint=None) -> Tuple[Dict[str, Dict], List[int]]:
+    """异步批量爬取主协程
+
+    Args:
+        ids: 待爬取的编号
+        concurrency: 全局同时进行的请求上限
+        limit_per_host: 单个主机的连接上限
+        parse_pool: 解析工作池，默认按 CPU 数创建线程池；进程池应由 process_parse_pool 创建
+        sink: 结果容器，支持 sink[key] = record，默认为内存字典
+        checkpoint: 检查点，记录已完成与失败的编号
+
+    Returns:
+        (db, failed_ids)
+    """
+    _require_aiohttp()
+    ids = list(ids)
+    db = {} if sink is None else sink
+    failed_ids = []
+
+    own_pool = parse_pool is None
+    if own_pool:
+        parse_pool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=limit_per_host)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=dict(get_session().headers)) as http:
+            await warm_series_index(http, semaphore, parse_pool)
+
+            async def run(scp_id: int):
+                try:
+                    return scp_id, await scrape_scp_async(http, scp_id, semaphore, parse_pool), None
+                except Exception as exc:
+                    return scp_id, None, exc
+
+            tasks = [asyncio.ensure_future(run(i)) for i in ids]
+            for i, task in enumerate(asyncio.as_completed(tasks), 1):
+                scp_id, data, exc = await task
+                if exc is not None:
+                    report_exception(i, len(ids), scp_id, exc, failed_ids, checkpoint)
+                else:
+                    report_result(i, len(ids), scp_id, data, db, failed_ids, checkpoint)
+    finally:
+        if own_pool:
+            parse_pool.shutdown(wait=True)
+
+    return db, failed_ids
+
+
+def crawl_async(ids: Iterable[int], concurrency: int = 32, limit_per_host: int = 8,
+                parse_pool: Optional[concurrent.futures.Executor] = None, sink=None, checkpoint=None
+                ) -> Tuple[Dict[str, Dict], List[int]]:
+    """crawl_async_main 的同步入口，签名与 crawl_threaded 对齐"""
+    return asyncio.run(crawl_async_main(ids, concurrency, limit_per_host, parse_pool, sink, checkpoint))
@@ -0,0 +1,246 @@
+"""
+离线爬取基准 - 对本地夹具服务器运行 scrape_scp 与批量爬取，报告吞吐、分阶段延迟与峰值内存
+
+1. 逐页：依次计时 series_lookup（系列索引取名）、fetch（下载）、parse（parse_scp_page）
+2. 批量：用选定引擎爬取全部编号，报告 pages/sec
+3. 记录两种路径每条输出的摘要；与保存的基线比较时，任何输出变化或超出容差的性能退化都会以非零状态退出
+
+仓库中的基线 benchmarks/baselines/crawl.json 基于默认的合成语料与服务器参数生成；
+性能数据取决于机器，换机器后先在参考版本上重新 --save-baseline。
+
+用法：
+    python benchmarks/bench_crawl.py --save-baseline            # 在参考版本上保存基线
+    python benchmarks/bench_crawl.py --compare                  # 修改后与基线比较
+    python benchmarks/bench_crawl.py --latency 0.05 --rate-429 0.05 --error-rate 0.02 --workers 16
+
+未指定 --corpus 或语料目录为空时，自动生成合成语料（见 corpus.py）。
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import requests  # noqa: E402
+
+import temp_scraper  # noqa: E402
+from corpus import DEFAULT_DIR, corpus_ids, synthesize  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'crawl.json')
+# 输出中的服务器地址替换为固定占位符，使摘要与端口无关
+ORIGIN_PLACEHOLDER = 'http://fixture'
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """毫秒为单位的 p50/p90/p99/max"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        'p50': round(pick(0.50), 3),
+        'p90': round(pick(0.90), 3),
+        'p99': round(pick(0.99), 3),
+        'max': round(ordered[-1] * 1000, 3),
+        'mean': round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def record_digest(record: Dict, origin: str) -> str:
+    """记录的规范化摘要"""
+    text = json.dumps(record, ensure_ascii=False, sort_keys=True).replace(origin, ORIGIN_PLACEHOLDER)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def reset_state() -> None:
+    """清空系列页缓存与索引，使每轮测量都从冷启动开始"""
+    temp_scraper.series_page_cache.clear()
+    temp_scraper.series_index.clear()
+
+
+def bench_single(ids: List[int], origin: str) -> Dict:
+    """逐页顺序计时各阶段"""
+    stages = {'series_lookup': [], 'fetch': [], 'parse': []}
+    digests = {}
+    for scp_id in ids:
+        t0 = time.perf_counter()
+        scp_name = temp_scraper.get_scp_name_from_series(scp_id)
+        t1 = time.perf_counter()
+        try:
+            content, final_url = temp_scraper.fetch_scp_page(scp_id)
+        except requests.RequestException as e:
+            digests[str(scp_id)] = f"error: {type(e).__name__}"
+            continue
+        t2 = time.perf_counter()
+        record = temp_scraper.parse_scp_page(scp_id, content, final_url, scp_name)
+        t3 = time.perf_counter()
+        stages['series_lookup'].append(t1 - t0)
+        stages['fetch'].append(t2 - t1)
+        stages['parse'].append(t3 - t2)
+        digests[str(scp_id)] = record_digest(record, origin)
+    return {'stages': {name: percentiles(samples) for name, samples in stages.items()}, 'digests': digests}
+
+
+def bench_batch(ids: List[int], engine: str, workers: int, origin: str) -> Dict:
+    """用选定引擎批量爬取并计算吞吐"""
+    start = time.perf_counter()
+    # 引擎会逐条打印进度，基准中丢弃
+    with contextlib.redirect_stdout(io.StringIO()):
+        if engine == 'pipeline':
+            from pipeline import crawl_pipeline
+            db, failed_ids = crawl_pipeline(ids, fetch_workers=workers)
+        elif engine == 'async':
+            from async_scraper import crawl_async
+            db, failed_ids = crawl_async(ids, concurrency=workers)
+        else:
+            db, failed_ids = temp_scraper.crawl_threaded(ids, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    return {
+        'engine': engine,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(ids) / elapsed, 2) if elapsed else 0.0,
+        'succeeded': len(db),
+        'failed': len(failed_ids),
+        'digests': {key: record_digest(db[key], origin) for key in sorted(db, key=int)},
+    }
+
+
+def compare_digests(name: str, digests: Dict[str, str], base_digests: Dict[str, str]) -> List[str]:
+    """比较一种路径的输出摘要"""
+    problems = []
+    changed = sorted((k for k in base_digests if digests.get(k) != base_digests[k]), key=int)
+    added = sorted(set(digests) - set(base_digests), key=int)
+    if changed:
+        problems.append(f"{name}: {len(changed)} 条记录的输出与基线不同: {', '.join(changed[:20])}")
+    if added:
+        problems.append(f"{name}: {len(added)} 条记录不在基线中: {', '.join(added[:20])}")
+    return problems
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """与基线比较，返回问题列表（为空表示通过）"""
+    problems = compare_digests('逐页', result['single']['digests'], baseline['single']['digests'])
+    problems += compare_digests('批量', result['batch']['digests'], baseline['batch']['digests'])
+
+    base_rate = baseline['batch']['pages_per_sec']
+    rate = result['batch']['pages_per_sec']
+    if base_rate and rate < base_rate * (1 - tolerance):
+        problems.append(f"吞吐下降: {rate} < 基线 {base_rate} pages/sec（容差 {tolerance:.0%}）")
+    for stage in ('parse',):
+        base_p50 = baseline['single']['stages'].get(stage, {}).get('p50')
+        p50 = result['single']['stages'].get(stage, {}).get('p50')
+        if base_p50 and p50 and p50 > base_p50 * (1 + tolerance):
+            problems.append(f"{stage} p50 变慢: {p50}ms > 基线 {base_p50}ms（容差 {tolerance:.0%}）")
+    return problems
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--corpus', default=DEFAULT_DIR, help="语料目录")
+    arg_parser.add_argument('--limit', type=int, default=None, help="最多使用多少个编号")
+    arg_parser.add_argument('--engine', choices=['threads', 'async', 'pipeline'], default='threads')
+    arg_parser.add_argument('--workers', type=int, default=8)
+    arg_parser.add_argument('--html-backend', choices=['bs4', 'strainer', 'lxml'], default=temp_scraper.HTML_BACKEND)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="服务器固定延迟（秒）")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="服务器随机延迟上限（秒）")
+    arg_parser.add_argument('--rate-429', type=float, default=0.0, help="返回 429 的概率")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="返回 503 的概率")
+    arg_parser.add_argument('--rate-limit', type=float, default=None, help="服务器限流速率（请求/秒），超出返回 429")
+    arg_parser.add_argument('--throttle', action='store_true', help="启用自适应限速")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件")
+    arg_parser.add_argument('--save-baseline', action='store_true', help="将本次结果保存为基线")
+    arg_parser.add_argument('--compare', action='store_true', help="与基线比较，不通过时以状态 1 退出")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help="性能比较的相对容差")
+    arg_parser.add_argument('--output', default=None, help="将完整结果写入该 JSON 文件")
+    args = arg_parser.parse_args()
+
+    temp_scraper.set_html_backend(args.html_backend)
+    if not os.path.isdir(args.corpus) or not corpus_ids(args.corpus):
+        print(f"语料目录为空，生成合成语料: {args.corpus}")
+        synthesize(args.corpus)
+    ids = corpus_ids(args.corpus)[:args.limit]
+
+    server = FixtureServer(args.corpus, latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+                           error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed)
+    with server:
+        temp_scraper.set_site_url(server.url)
+        if args.throttle:
+            throttle = temp_scraper.enable_throttle(max_concurrency=args.workers)
+
+        reset_state()
+        single = bench_single(ids, server.url)
+        reset_state()
+        server.reset_stats()
+        batch = bench_batch(ids, args.engine, args.workers, server.url)
+        server_stats = dict(server.stats)
+
+    result = {
+        'pages': len(ids),
+        'html_backend': temp_scraper.HTML_BACKEND,
+        'server': {'latency': args.latency, 'jitter': args.jitter, 'rate_429': args.rate_429,
+                   'error_rate': args.error_rate, 'rate_limit': args.rate_limit, 'seed': args.seed,
+                   'batch_requests': server_stats},
+        'throttle': throttle.snapshot() if args.throttle else None,
+        'single': single,
+        'batch': batch,
+        # Linux 下 ru_maxrss 单位为 KB
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    print(f"页面数: {len(ids)}  解析后端: {result['html_backend']}")
+    for stage, stats in single['stages'].items():
+        print(f"  {stage:<14}" + '  '.join(f"{k}={v:.2f}ms" for k, v in stats.items()))
+    print(f"批量（{batch['engine']} x{batch['workers']}）: {batch['pages_per_sec']} pages/sec，"
+          f"成功 {batch['succeeded']}，失败 {batch['failed']}，耗时 {batch['seconds']}s")
+    print(f"服务器: {server_stats}")
+    if args.throttle:
+        print(f"限速状态: {throttle.describe()}")
+    print(f"峰值 RSS: {result['peak_rss_kb'] / 1024:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+        print(f"基线已保存: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            arg_parser.error(f"基线文件不存在: {args.baseline}（先使用 --save-baseline 生成）")
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key in ('latency', 'jitter', 'rate_429', 'error_rate', 'rate_limit', 'seed'):
+            if baseline['server'].get(key) != result['server'][key]:
+                print(f"注意: 服务器参数 {key} 与基线不同（{baseline['server'].get(key)} -> {result['server'][key]}），"
+                      f"性能数据不可直接比较")
+        problems = compare(result, baseline, args.tolerance)
+        if problems:
+            print("与基线比较: 未通过")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("与基线比较: 通过")
+
+
+if __name__ == '__main__':
+    main()
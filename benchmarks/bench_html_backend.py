@@ -0,0 +1,132 @@
+"""
+HTML 解析后端基准 - 对比各后端每页的解析时间与峰值内存，并校验提取结果一致
+
+用法：
+    python benchmarks/bench_html_backend.py [--pages 'cache/*.html'] [--repeat 20]
+
+未指定 --pages 时使用合成的 Wikidot 风格页面（含页眉、侧栏、页脚等无关结构）。
+峰值内存分两项：tracemalloc 统计的 Python 对象分配，以及独立子进程中的 RSS 增量
+（lxml 在 C 层分配的树节点只体现在后者）。
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from html_backend import BACKENDS, available_backends  # noqa: E402
+
+
+def synthetic_page(paragraphs: int = 60, sidebar_links: int = 400) -> bytes:
+    """生成结构接近 Wikidot 条目页的 HTML"""
+    head = ''.join(f'<script src="/common--javascript/{i}.js"></script>' for i in range(20))
+    head += '<style>' + 'div.x{margin:0}' * 200 + '</style>'
+    sidebar = ''.join(f'<li><a href="/scp-{i:03d}">SCP-{i:03d}</a> 项目名称 {i}</li>' for i in range(sidebar_links))
+    body = [
+        '<p><strong>项目编号：</strong>SCP-173</p>',
+        '<p><strong>项目等级：</strong>Euclid</p>',
+        '<p><strong>特殊收容措施：</strong>' + '收容单元内须保持至少三人。' * 5 + '</p>',
+        '<div class="scp-image-block"><img src="/local--files/scp-173/173.jpg" alt="SCP-173"></div>',
+        '<p><strong>描述：</strong>' + '该对象由混凝土与钢筋构成。' * 5 + '</p>',
+    ]
+    body += ['<p>' + f'第 {i} 段描述，<em>包含</em>一些<a href="/scp-{i:03d}">链接</a>。' * 4 + '</p>'
+             for i in range(paragraphs)]
+    body.append('<blockquote><p><strong>附录：</strong>' + '实验记录' * 20 + '</p></blockquote>')
+    html = (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>SCP-173</title>{head}</head><body>'
+        f'<div id="header"><h1><a href="/"><span>SCP基金会</span></a></h1></div>'
+        f'<div id="side-bar"><ul>{sidebar}</ul></div>'
+        f'<div id="main-content"><div id="page-title">SCP-173</div>'
+        f'<div id="page-content">{"".join(body)}</div>'
+        f'<div class="page-tags"><span><a href="/system:page-tags/tag/euclid">euclid</a>'
+        f'<a href="/system:page-tags/tag/scp">scp</a><a href="/system:page-tags/tag/雕像">雕像</a></span></div>'
+        f'</div><div id="footer">' + '<a href="#">页脚链接</a>' * 100 + '</div></body></html>'
+    )
+    return html.encode('utf-8')
+
+
+def signature(walk):
+    """比较用的提取结果（img 的 class 属性在不同后端中表示不同，不参与比较）"""
+    images = [{k: v for k, v in attrs.items() if k != 'class'} for attrs in walk.images]
+    return walk.found, list(walk.iter_blocks()), images, walk.tag_texts, walk.content_tag_texts
+
+
+def time_backend(parse, pages, repeat):
+    """每页平均解析时间（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            list(parse(page).iter_blocks())
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+
+def python_peak(parse, pages):
+    """tracemalloc 统计的单页最大 Python 分配峰值（KB）"""
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        walk = parse(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del walk
+    return peak / 1024
+
+
+def _rss_child(name, pages, conn):
+    parse = BACKENDS[name]
+    parse(b'<html><body><div id="page-content"><p>x</p></div></body></html>')  # 预热：解析器初始化不计入
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for page in pages:
+        parse(page)
+    conn.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+    conn.close()
+
+
+def rss_delta(name, pages):
+    """在独立子进程中解析全部页面后的峰值 RSS 增量（KB，Linux 下 ru_maxrss 单位为 KB）"""
+    parent, child = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(target=_rss_child, args=(name, pages, child))
+    proc.start()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--pages', default=None, help="页面文件的 glob 模式")
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(args.pages)):
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        if not pages:
+            arg_parser.error(f"没有匹配的页面: {args.pages}")
+    else:
+        pages = [synthetic_page()]
+    print(f"页面数: {len(pages)}，平均大小: {sum(map(len, pages)) / len(pages) / 1024:.1f} KB")
+
+    backends = available_backends()
+    reference = [signature(BACKENDS['bs4'](page)) for page in pages]
+    print(f"{'backend':<10}{'ms/page':>10}{'speedup':>10}{'py peak KB':>12}{'rss +KB':>10}  output")
+    baseline = None
+    for name in backends:
+        parse = BACKENDS[name]
+        same = all(signature(parse(page)) == ref for page, ref in zip(pages, reference))
+        ms = time_backend(parse, pages, args.repeat)
+        baseline = baseline or ms
+        print(f"{name:<10}{ms:>10.3f}{baseline / ms:>9.2f}x{python_peak(parse, pages):>12.1f}"
+              f"{rss_delta(name, pages):>10}  {'一致' if same else '不一致!'}")
+
+
+if __name__ == '__main__':
+    main()
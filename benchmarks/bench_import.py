@@ -0,0 +1,144 @@
+"""
+冷启动基准 - 在全新子进程中计时导入与短命令，检查重量级依赖是否被提前载入
+
+场景：
+    python            空解释器启动（对照）
+    import temp_scraper / import cli
+    cli --help        打印帮助
+    cli lookup        从 JSON 数据库读取一条记录（偏移索引已建立）
+每个场景运行多次取最小墙钟时间；另用 -X importtime 运行一次，列出实际导入的重量级模块
+（requests、bs4、lxml 等，这些场景中都不应出现）与解释器启动之外累计耗时最多的模块。
+
+用法：
+    python benchmarks/bench_import.py --save-baseline     # 在参考版本上保存基线
+    python benchmarks/bench_import.py --compare           # 修改后与基线比较，变慢或载入重量级模块时以状态 1 退出
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+CLI = os.path.join(ROOT, 'cli.py')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'import.json')
+
+# 这些场景都不应导入的模块（及其子模块）
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'lxml', 'aiohttp', 'asyncio', 'http.server')
+
+
+def scenarios(database: str) -> Dict[str, List[str]]:
+    return {
+        'python': ['-c', 'pass'],
+        'import temp_scraper': ['-c', 'import temp_scraper'],
+        'import cli': ['-c', 'import cli'],
+        'cli --help': [CLI, '--help'],
+        'cli lookup': [CLI, 'lookup', database, '1', '--fields', 'id,name'],
+    }
+
+
+def run_once(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, check=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """-X importtime 输出 → {模块: 累计微秒}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def heavy_imports(modules: Dict[str, int]) -> List[str]:
+    return sorted(name for name in modules
+                  if any(name == heavy or name.startswith(heavy + '.') for heavy in HEAVY_MODULES))
+
+
+def measure(args: List[str], repeat: int, startup: Set[str] = frozenset()) -> Dict:
+    """startup: 空解释器启动时已导入的模块（site 及 .pth 引入的模块），不计入耗时排行"""
+    seconds = min(run_once(args)[0] for _ in range(repeat))
+    modules = parse_importtime(run_once(args, importtime=True)[1])
+    top = sorted(((name, us) for name, us in modules.items() if '.' not in name and name not in startup),
+                 key=lambda item: -item[1])[:5]
+    return {
+        'ms': round(seconds * 1000, 2),
+        'modules': len(modules),
+        'heavy': heavy_imports(modules),
+        'top': [[name, round(us / 1000, 2)] for name, us in top],
+    }
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """与基线比较启动开销（扣除空解释器启动时间），返回问题列表"""
+    problems = []
+    base_python = baseline['python']['ms']
+    python = result['python']['ms']
+    for name, stats in result.items():
+        if name == 'python' or name not in baseline:
+            continue
+        cost, base_cost = stats['ms'] - python, baseline[name]['ms'] - base_python
+        # 绝对差小于 10ms 视为噪声
+        if base_cost > 0 and cost > base_cost * (1 + tolerance) and cost - base_cost > 10:
+            problems.append(f"{name} 变慢: {cost:.1f}ms > 基线 {base_cost:.1f}ms（容差 {tolerance:.0%}）")
+    return problems
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=10, help="每个场景运行次数（取最小值）")
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件")
+    arg_parser.add_argument('--save-baseline', action='store_true', help="将本次结果保存为基线")
+    arg_parser.add_argument('--compare', action='store_true', help="与基线比较，不通过时以状态 1 退出")
+    arg_parser.add_argument('--tolerance', type=float, default=0.3, help="比较的相对容差")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'scp_database_cn.json')
+        with open(database, 'w', encoding='utf-8') as f:
+            json.dump({'1': {'id': 'SCP-001', 'name': '基准'}}, f, ensure_ascii=False, indent=4)
+        # 先建立偏移索引，计时只包含读取
+        run_once([CLI, 'lookup', database, '1'])
+        commands = scenarios(database)
+        startup = set(parse_importtime(run_once(commands['python'], importtime=True)[1]))
+        result = {name: measure(command, args.repeat, startup) for name, command in commands.items()}
+
+    python = result['python']['ms']
+    problems = []
+    for name, stats in result.items():
+        top = ', '.join(f"{module} {ms:.1f}ms" for module, ms in stats['top'][:3])
+        print(f"{name:20s} {stats['ms']:7.1f} ms  (+{stats['ms'] - python:5.1f})  {stats['modules']:4d} 个模块  {top}")
+        if stats['heavy']:
+            problems.append(f"{name} 导入了重量级模块: {', '.join(stats['heavy'])}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+        print(f"基线已保存: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            arg_parser.error(f"基线文件不存在: {args.baseline}（先使用 --save-baseline 生成）")
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            problems += compare(result, json.load(f), args.tolerance)
+
+    if problems:
+        print("未通过:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
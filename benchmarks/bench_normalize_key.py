@@ -0,0 +1,76 @@
+"""
+normalize_key 微基准 - 对比旧版线性扫描与预编译映射表 + 缓存的实现
+
+用法：
+    python benchmarks/bench_normalize_key.py [--repeat 2000]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scp_parser import SCPParser, KeyNormalizer  # noqa: E402
+
+
+def legacy_normalize_key(key: str) -> str:
+    """旧版实现：逐项小写比较 FIELD_MAPPING，未命中时使用未预编译的正则"""
+    if not key:
+        return ''
+    key = key.strip().rstrip('：:')
+    key_lower = key.lower()
+    for pattern, standard_key in SCPParser.FIELD_MAPPING.items():
+        if pattern.lower() == key_lower:
+            return standard_key
+    return re.sub(r'[^\w\u4e00-\u9fff]', '_', key).lower()
+
+
+def corpus_keys():
+    """样本语料中的键名，加上中文分部页面上常见的字段名写法"""
+    keys = []
+    with open(os.path.join(ROOT, 'sample_database.json'), 'r', encoding='utf-8') as f:
+        for record in json.load(f).values():
+            keys.extend(record.keys())
+    keys += [
+        '项目编号：', '項目編號：', '项目等级：', '項目等級:', '特殊收容措施：', '描述：',
+        'Item #:', 'Object Class:', 'Special Containment Procedures:', 'Description:',
+        '附录 049-1：', '实验记录 049-A：', '访谈记录：', '事件记录 049-3：', '备注：',
+    ]
+    return keys
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=2000, help="每个实现遍历键名列表的次数")
+    args = arg_parser.parse_args()
+
+    keys = corpus_keys()
+    current = SCPParser()
+    uncached = KeyNormalizer(SCPParser.FIELD_MAPPING, cache_size=0)
+
+    mismatches = [k for k in keys if legacy_normalize_key(k) != current.normalize_key(k)]
+
+    def run(fn):
+        return timeit.timeit(lambda: [fn(k) for k in keys], number=args.repeat)
+
+    results = {
+        'legacy (linear scan)': run(legacy_normalize_key),
+        'index, no cache': run(uncached._normalize),
+        'index + cache': run(current.normalize_key),
+    }
+
+    calls = len(keys) * args.repeat
+    baseline = results['legacy (linear scan)']
+    print(f"{len(keys)} 个键名 × {args.repeat} 次 = {calls} 次调用")
+    for name, seconds in results.items():
+        print(f"{name:24s} {seconds * 1e9 / calls:8.1f} ns/次  加速 {baseline / seconds:5.1f}x")
+    if mismatches:
+        print(f"与旧版结果不同的键名（映射表折叠标点后新增命中）: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
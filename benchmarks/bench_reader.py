@@ -0,0 +1,98 @@
+"""
+随机读取基准 - 对比 json.load 整个数据库与 RecordReader（偏移索引 + 内存映射）读取少量条目
+
+每种方式在独立子进程中运行，报告启动到取得记录的耗时与进程 RSS 增量。不指定数据库时
+用 sample_database.json 的记录复制生成一个合成数据库。
+
+用法：
+    python benchmarks/bench_reader.py [--database scp_database_cn.json] [--records 8000] [--lookups 5]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reader import RecordReader  # noqa: E402
+from storage import write_json_database  # noqa: E402
+
+FIELDS = ('id', 'name', 'class')
+
+
+def synthetic_database(path: str, records: int) -> None:
+    with open(os.path.join(ROOT, 'sample_database.json'), 'r', encoding='utf-8') as f:
+        sample = next(iter(json.load(f).values()))
+
+    def items():
+        for scp_id in range(1, records + 1):
+            yield str(scp_id), dict(sample, id=f"SCP-{scp_id:03d}")
+
+    write_json_database(items(), path)
+
+
+def _rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _child(mode, path, keys, conn):
+    rss_before = _rss_kb()
+    start = time.perf_counter()
+    if mode == 'json.load':
+        with open(path, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+        found = [{field: db[key][field] for field in FIELDS if field in db[key]} for key in keys]
+    else:
+        with RecordReader(path) as reader:
+            found = [reader.get(key, fields=FIELDS) for key in keys]
+    seconds = time.perf_counter() - start
+    conn.send((seconds, _rss_kb() - rss_before, found))
+    conn.close()
+
+
+def run(mode, path, keys):
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_child, args=(mode, path, keys, child))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--database', default=None, help="JSON 或 JSONL 数据库（默认生成合成数据库）")
+    arg_parser.add_argument('--records', type=int, default=8000, help="合成数据库的记录数")
+    arg_parser.add_argument('--lookups', type=int, default=5, help="每次读取的条目数")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database
+        if path is None:
+            path = os.path.join(tmp, 'scp_database_cn.json')
+            synthetic_database(path, args.records)
+        with RecordReader(path) as reader:
+            keys = random.Random(0).sample(reader.keys(), min(args.lookups, len(reader)))
+            count = len(reader)
+        print(f"{count} 条记录，{os.path.getsize(path) / 1e6:.1f} MB，读取 {len(keys)} 条")
+
+        results = {}
+        for mode in ('json.load', 'reader (cold index)', 'reader'):
+            if mode == 'reader (cold index)' and os.path.exists(path + '.offsets'):
+                os.remove(path + '.offsets')
+            results[mode] = run(mode, path, keys)
+        baseline = results['json.load'][0]
+        for mode, (seconds, rss, _) in results.items():
+            print(f"{mode:22s} {seconds * 1e3:9.1f} ms  加速 {baseline / seconds:6.1f}x  RSS +{rss / 1024:.1f} MB")
+        if results['json.load'][2] != results['reader'][2]:
+            print("警告：两种方式读取的结果不一致")
+
+
+if __name__ == '__main__':
+    main()
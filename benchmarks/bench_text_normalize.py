@@ -0,0 +1,81 @@
+"""
+字段值规范化微基准 - 对比旧版三次正则替换与 TextNormalizer（映射表 + 合并扫描）
+
+语料为 sample_database.json 中的全部字符串字段值，外加带敏感信息标记、前导冒号、
+多余空白与繁体写法的典型字段值。
+
+用法：
+    python benchmarks/bench_text_normalize.py [--repeat 200]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from text_normalize import TextNormalizer  # noqa: E402
+
+RE_REDACT = re.compile(r'\[数据删除\]|\[资料删除\]|\[已编辑\]|\[删除\]|\[REDACTED\]|\[DATA EXPUNGED\]', re.IGNORECASE)
+RE_WS = re.compile(r'\s+')
+RE_COLON_PREFIX = re.compile(r'^[：:]\s*')
+
+
+def legacy_clean_value(value: str) -> str:
+    """旧版 SCPParser.clean_value：依次做三次正则替换"""
+    if not value:
+        return ''
+    value = RE_REDACT.sub('[REDACTED]', value)
+    value = RE_WS.sub(' ', value)
+    value = RE_COLON_PREFIX.sub('', value)
+    return value.strip()
+
+
+def corpus_values():
+    values = []
+    with open(os.path.join(ROOT, 'sample_database.json'), 'r', encoding='utf-8') as f:
+        for record in json.load(f).values():
+            values.extend(v for v in record.values() if isinstance(v, str))
+    values += [
+        '：  Euclid', ': Keter ', '  描述：SCP-049 是一个 [数据删除] 的人形实体。\n\n',
+        'Dr. [REDACTED] 于 [DATA EXPUNGED] 进行了实验。', '项目编号：\tSCP-173',
+        '收容措施　　每周检查一次。', '特殊收容措施：SCP-049 應收容於標準人形收容單元內。',
+    ]
+    return values
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=200, help="每个实现遍历语料的次数")
+    args = arg_parser.parse_args()
+
+    values = corpus_values()
+    current = TextNormalizer()
+    folding = TextNormalizer(fold_variants=True, redact_blocks=True)
+
+    mismatches = [v for v in values if legacy_clean_value(v) != current(v)]
+
+    def run(fn):
+        return timeit.timeit(lambda: [fn(v) for v in values], number=args.repeat)
+
+    results = {
+        'legacy (3 regex passes)': run(legacy_clean_value),
+        'TextNormalizer': run(current),
+        'TextNormalizer + folding': run(folding),
+    }
+
+    calls = len(values) * args.repeat
+    chars = sum(map(len, values))
+    baseline = results['legacy (3 regex passes)']
+    print(f"{len(values)} 个字段值（共 {chars} 字符）× {args.repeat} 次 = {calls} 次调用")
+    for name, seconds in results.items():
+        print(f"{name:26s} {seconds * 1e9 / calls:9.1f} ns/次  加速 {baseline / seconds:5.1f}x")
+    if mismatches:
+        print(f"与旧版结果不同的值: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
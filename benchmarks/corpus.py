@@ -0,0 +1,186 @@
+"""
+基准语料 - 录制真实页面或生成合成页面，供本地夹具服务器回放
+
+语料目录中每个文件以 URL 路径命名（scp-173、scp-series、scp-series-2 ...），
+fixture_server 按请求路径直接返回同名文件。
+
+用法：
+    python benchmarks/corpus.py synth [--dir benchmarks/corpus] [--count 300]
+    python benchmarks/corpus.py record [--dir benchmarks/corpus] [--start 1 --end 300]
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import sys
+from typing import Iterable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+CLASSES = ['Safe', 'Euclid', 'Keter', 'Thaumiel', 'Neutralized']
+TAGS = ['人形', '异常', '雕像', '自主', '敌对', '可变形', '地点', '记忆', '外星', '生物']
+SENTENCES = [
+    'SCP-{sid}应被收容在标准收容间内。',
+    '所有人员在进入收容间前必须获得三级权限。',
+    '该对象的异常性质仅在无人观察时表现。',
+    '研究人员发现[数据删除]与对象存在关联。',
+    '█████博士建议每周进行一次例行检查。',
+    '对象表面覆盖着无法识别的符号。',
+    '与SCP-{sid}的接触必须在监控下进行。',
+]
+
+
+def _id_str(n: int) -> str:
+    return str(n).zfill(3)
+
+
+def synthetic_item(n: int, rng: random.Random) -> str:
+    """生成一个结构接近 Wikidot 条目页的页面"""
+    sid = _id_str(n)
+
+    def paragraph(count):
+        return ''.join(rng.choice(SENTENCES).format(sid=sid) for _ in range(count))
+
+    body = [
+        f'<p><strong>项目编号：</strong>SCP-{sid}</p>',
+        f'<p><strong>项目等级：</strong>{rng.choice(CLASSES)}</p>',
+        f'<div class="scp-image-block"><img src="http://scp-wiki-cn.wdfiles.com/local--files/scp-{sid}/scp-{sid}.jpg" '
+        f'alt="SCP-{sid}" /><div class="scp-image-caption"><p>SCP-{sid}</p></div></div>',
+        f'<p><strong>特殊收容措施：</strong>{paragraph(rng.randint(2, 6))}</p>',
+        f'<p><strong>描述：</strong>{paragraph(rng.randint(3, 10))}</p>',
+    ]
+    for _ in range(rng.randint(2, 12)):
+        body.append(f'<p>{paragraph(rng.randint(1, 5))}</p>')
+    if rng.random() < 0.5:
+        body.append('<div class="collapsible-block"><div class="collapsible-block-content">'
+                    f'<p><strong>附录 {sid}-1：</strong>{paragraph(3)}</p><blockquote><p>{paragraph(2)}</p></blockquote>'
+                    '</div></div>')
+    body.append(f'<p>« <a href="/scp-{_id_str(max(n - 1, 1))}">SCP-{_id_str(max(n - 1, 1))}</a> | SCP-{sid} | '
+                f'<a href="/scp-{_id_str(n + 1)}">SCP-{_id_str(n + 1)}</a> »</p>')
+
+    tags = ''.join(f'<a href="/system:page-tags/tag/{t}">{t}</a>'
+                   for t in ['scp', 'euclid'] + rng.sample(TAGS, rng.randint(1, 4)))
+    sidebar = ''.join(f'<p><a href="/scp-series-{s}">系列 {s}</a></p>' for s in range(1, 10)) * 5
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>SCP-{sid} - SCP基金会</title>'
+        f'<script src="/common--javascript/init.combined.js"></script></head><body>'
+        f'<div id="header"><h1><a href="/"><span>SCP基金会</span></a></h1></div>'
+        f'<div id="side-bar">{sidebar}</div>'
+        f'<div id="main-content"><div id="page-title">SCP-{sid}</div>'
+        f'<div id="page-content">\n' + '\n'.join(body) + '\n</div>'
+        f'<div class="page-tags"><span>{tags}</span></div></div>'
+        f'<div id="footer"><a href="/system:join">加入</a></div></body></html>'
+    )
+
+
+def synthetic_series(series_number: int, ids: Iterable[int]) -> str:
+    """生成系列页，列出该系列中存在的条目"""
+    items = ''.join(f'<li><a href="/scp-{_id_str(i)}">SCP-{_id_str(i)}</a> - 合成条目 {i}</li>\n' for i in ids)
+    return f'<html><body><div id="page-content"><h1>系列 {series_number}</h1><ul>\n{items}</ul></div></body></html>'
+
+
+def _series_path(series_number: int) -> str:
+    return 'scp-series' if series_number == 1 else f'scp-series-{series_number}'
+
+
+def synthesize(out_dir: str = DEFAULT_DIR, count: int = 300, seed: int = 0, missing_every: int = 13) -> List[int]:
+    """生成合成语料（相同参数总是生成相同内容）
+
+    Args:
+        out_dir: 语料目录
+        count: 编号范围 1..count
+        seed: 随机种子
+        missing_every: 每隔多少个编号留一个空位（无页面，请求时返回 404）
+
+    Returns:
+        存在页面的编号
+    """
+    from temp_scraper import get_series_number
+
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    existing = [n for n in range(1, count + 1) if not missing_every or n % missing_every]
+    for n in existing:
+        with open(os.path.join(out_dir, f'scp-{_id_str(n)}'), 'w', encoding='utf-8') as f:
+            f.write(synthetic_item(n, rng))
+
+    by_series = {}
+    for n in existing:
+        by_series.setdefault(get_series_number(n), []).append(n)
+    for series_number in range(1, 10):
+        with open(os.path.join(out_dir, _series_path(series_number)), 'w', encoding='utf-8') as f:
+            f.write(synthetic_series(series_number, by_series.get(series_number, [])))
+    return existing
+
+
+def record(ids: Iterable[int], out_dir: str = DEFAULT_DIR, max_workers: int = 4) -> List[int]:
+    """从真实站点录制条目页与所需的系列页（原始字节，不做任何改写）
+
+    Returns:
+        录制成功的编号
+    """
+    import requests
+    from temp_scraper import SITE_URL, get_item_url, get_series_number, get_session
+
+    ids = list(ids)
+    os.makedirs(out_dir, exist_ok=True)
+
+    session = get_session()
+
+    def save(path, url):
+        resp = session.get(url, timeout=20)
+        resp.raise_for_status()
+        with open(os.path.join(out_dir, path), 'wb') as f:
+            f.write(resp.content)
+
+    for series_number in sorted({get_series_number(i) for i in ids}):
+        path = _series_path(series_number)
+        save(path, f"{SITE_URL}/{path}")
+
+    def record_one(scp_id):
+        try:
+            save(f'scp-{_id_str(scp_id)}', get_item_url(scp_id))
+            return True
+        except requests.RequestException as e:
+            print(f"录制失败 SCP-{_id_str(scp_id)}: {e}")
+            return False
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [i for i, ok in zip(ids, executor.map(record_one, ids)) if ok]
+
+
+def corpus_ids(corpus_dir: str = DEFAULT_DIR) -> List[int]:
+    """语料目录中已有条目页的编号"""
+    ids = []
+    for name in os.listdir(corpus_dir):
+        if name.startswith('scp-') and name[4:].isdigit():
+            ids.append(int(name[4:]))
+    return sorted(ids)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = arg_parser.add_subparsers(dest='command', required=True)
+    synth = sub.add_parser('synth', help="生成合成语料")
+    synth.add_argument('--dir', default=DEFAULT_DIR)
+    synth.add_argument('--count', type=int, default=300)
+    synth.add_argument('--seed', type=int, default=0)
+    rec = sub.add_parser('record', help="从真实站点录制语料")
+    rec.add_argument('--dir', default=DEFAULT_DIR)
+    rec.add_argument('--start', type=int, default=1)
+    rec.add_argument('--end', type=int, default=300)
+    rec.add_argument('--workers', type=int, default=4)
+    args = arg_parser.parse_args()
+
+    if args.command == 'synth':
+        ids = synthesize(args.dir, args.count, args.seed)
+    else:
+        ids = record(range(args.start, args.end + 1), args.dir, args.workers)
+    print(f"语料目录 {args.dir}：{len(ids)} 个条目页")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+本地夹具服务器 - 回放语料目录中的页面，可注入延迟、429 限流与服务器错误
+
+用法（独立运行，便于手动把爬虫指向它）：
+    python benchmarks/fixture_server.py [--dir benchmarks/corpus] [--port 8765] [--latency 0.05]
+
+    python temp_scraper.py --site http://127.0.0.1:8765 ...
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class FixtureServer:
+    """在后台线程中运行的 HTTP 服务器
+
+    Args:
+        corpus_dir: 语料目录，文件名即请求路径（不含前导 /）
+        host/port: 监听地址，port 为 0 时自动分配
+        latency: 每个响应前的固定延迟（秒）
+        jitter: 在固定延迟上叠加 [0, jitter) 的随机延迟
+        rate_429: 以该概率返回 429 Too Many Requests
+        retry_after: 429 响应的 Retry-After 头（秒），为 None 时不发送
+        error_rate: 以该概率返回 503 Service Unavailable
+        rate_limit: 模拟站点限流：超过该速率（请求/秒，令牌桶，容量一秒）的请求返回 429
+        seed: 随机种子，保证注入的故障序列可复现
+    """
+
+    def __init__(self, corpus_dir: str, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, rate_429: float = 0.0, retry_after: Optional[float] = 0,
+                 error_rate: float = 0.0, rate_limit: Optional[float] = None, seed: int = 0):
+        self.corpus_dir = corpus_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._bucket = rate_limit or 0.0
+        self._bucket_time = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'ok': 0, 'not_found': 0, 'throttled': 0, 'errors': 0}
+        self._pages: Dict[str, bytes] = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _page(self, path: str) -> Optional[bytes]:
+        """读取并缓存语料文件，避免磁盘 I/O 计入测量"""
+        name = path.split('?', 1)[0].strip('/')
+        if not name or '/' in name or name.startswith('.'):
+            return None
+        with self._lock:
+            if name in self._pages:
+                return self._pages[name]
+        file_path = os.path.join(self.corpus_dir, name)
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        with self._lock:
+            self._pages[name] = content
+        return content
+
+    def _decide(self) -> tuple:
+        """为一个请求抽取延迟与注入的故障"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            roll = self._rng.random()
+            if self.rate_limit:
+                now = time.monotonic()
+                self._bucket = min(self.rate_limit, self._bucket + (now - self._bucket_time) * self.rate_limit)
+                self._bucket_time = now
+                if self._bucket < 1.0:
+                    return delay, 429
+                self._bucket -= 1.0
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 503
+        return delay, None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 响应头与正文合并写出，避免小包触发 Nagle/延迟确认带来的约 40ms 停顿
+            wbufsize = -1
+
+            def _respond(self, with_body: bool) -> None:
+                delay, injected = server._decide()
+                if delay:
+                    time.sleep(delay)
+                if injected == 429:
+                    server._count('throttled')
+                    headers = {} if server.retry_after is None else {'Retry-After': str(server.retry_after)}
+                    self._send(429, b'Too Many Requests', with_body, headers)
+                    return
+                if injected == 503:
+                    server._count('errors')
+                    self._send(503, b'Service Unavailable', with_body)
+                    return
+                content = server._page(self.path)
+                if content is None:
+                    server._count('not_found')
+                    self._send(404, b'Not Found', with_body)
+                    return
+                server._count('ok')
+                self._send(200, content, with_body, content_type='text/html; charset=utf-8')
+
+            def _send(self, status, body, with_body, headers=None, content_type='text/plain; charset=utf-8'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    from corpus import DEFAULT_DIR
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--dir', default=DEFAULT_DIR)
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--latency', type=float, default=0.0)
+    arg_parser.add_argument('--jitter', type=float, default=0.0)
+    arg_parser.add_argument('--rate-429', type=float, default=0.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--rate-limit', type=float, default=None)
+    args = arg_parser.parse_args()
+
+    server = FixtureServer(args.dir, args.host, args.port, args.latency, args.jitter,
+                           args.rate_429, error_rate=args.error_rate, rate_limit=args.rate_limit)
+    print(f"夹具服务器: {server.url}（语料 {args.dir}），Ctrl+C 退出")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+SCP 断点续爬模块 - 周期性记录已完成与失败的编号，支持 --resume 跳过已完成编号并重试失败项
+
+失败重试使用独立于 urllib3 Retry 的指数退避：urllib3 负责单次请求内的瞬时错误，
+这里负责跨整批任务的“稍后再试”。
+"""
+import concurrent.futures
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# 请求失败的错误文本以 HTTP 状态码开头（可带 "请求失败: " 前缀）：
+#   requests: "404 Client Error: Not Found for url: ..."
+#   aiohttp:  "404, message='Not Found', url=..."
+# 只认开头的状态码，URL 中的数字（如 /scp-1404）不会被误认
+RE_HTTP_STATUS = re.compile(r'(?:请求失败:\s*)?(\d{3})(?: Client Error| Server Error|, message=)')
+# 这类错误重试也不会成功，resume 时不再重试
+PERMANENT_STATUSES = frozenset({404})
+PERMANENT_ERRORS = ('未找到页面内容',)
+
+
+def http_status(error: Optional[str]) -> Optional[int]:
+    """从错误文本开头解析 HTTP 状态码，不是 HTTP 错误时返回 None"""
+    match = RE_HTTP_STATUS.match(error or '')
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(error: Optional[str], status: Optional[int] = None) -> bool:
+    """判断失败是否值得重试
+
+    Args:
+        error: 错误文本
+        status: 已知的 HTTP 状态码，默认从 error 开头解析
+    """
+    if status is None:
+        status = http_status(error)
+    if status in PERMANENT_STATUSES:
+        return False
+    return not (error or '').startswith(PERMANENT_ERRORS)
+
+
+def backoff_delay(attempts: int, base_delay: float = 2.0, max_delay: float = 300.0) -> float:
+    """第 attempts 次重试前的等待时间：指数增长、封顶并加入随机抖动"""
+    delay = min(max_delay, base_delay * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Checkpoint:
+    """线程安全的爬取检查点
+
+    记录格式：
+        {"done": [编号...], "failed": {"编号": {"error": 错误, "status": HTTP 状态码或 null, "attempts": 次数}},
+         "updated_at": 时间戳}
+    """
+
+    def __init__(self, path: str = 'scp_checkpoint.json', save_every: int = 50, save_interval: float = 30.0):
+        """
+        Args:
+            path: 检查点文件路径，已存在时载入
+            save_every: 每记录多少条结果保存一次
+            save_interval: 距上次保存超过该秒数时也会保存
+        """
+        self.path = path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.done = set()
+        self.failed: Dict[int, Dict[str, Any]] = {}
+        self._dirty = 0
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.done = set(data.get('done', []))
+            self.failed = {int(k): v for k, v in data.get('failed', {}).items()}
+
+    def is_done(self, scp_id: int) -> bool:
+        return scp_id in self.done
+
+    def pending(self, ids: Iterable[int]) -> List[int]:
+        """从未尝试过的编号（既不在已完成也不在失败中）"""
+        return [i for i in ids if i not in self.done and i not in self.failed]
+
+    def retryable_failures(self, max_attempts: int) -> List[int]:
+        """尚未超过重试次数且非永久错误的失败编号"""
+        with self._lock:
+            return sorted(i for i, info in self.failed.items()
+                          if info['attempts'] < max_attempts and is_retryable(info['error'], info.get('status')))
+
+    def mark_done(self, scp_id: int) -> None:
+        with self._lock:
+            self.done.add(scp_id)
+            self.failed.pop(scp_id, None)
+            self._touch_locked()
+
+    def mark_failed(self, scp_id: int, error: str) -> None:
+        with self._lock:
+            attempts = self.failed.get(scp_id, {}).get('attempts', 0) + 1
+            self.failed[scp_id] = {'error': str(error), 'status': http_status(str(error)), 'attempts': attempts}
+            self._touch_locked()
+
+    def _touch_locked(self) -> None:
+        self._dirty += 1
+        if self._dirty >= self.save_every or time.monotonic() - self._last_save >= self.save_interval:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        data = {
+            'done': sorted(self.done),
+            'failed': {str(k): v for k, v in sorted(self.failed.items())},
+            'updated_at': time.time(),
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
+        self._last_save = time.monotonic()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+
+def retry_failed(checkpoint: Checkpoint, scrape: Callable[[int], Dict], db, max_workers: int = 4,
+                 max_attempts: int = 5, base_delay: float = 2.0, max_delay: float = 300.0,
+                 failed_ids: Optional[List[int]] = None) -> List[int]:
+    """以指数退避重试检查点中的失败编号
+
+    每个编号在独立线程中等待各自的退避时间后重试，直到成功、遇到永久错误或达到 max_attempts。
+
+    Args:
+        checkpoint: 检查点
+        scrape: 单条爬取函数，如 scrape_scp
+        db: 结果容器，支持 db[key] = record
+        max_workers: 并发重试线程数
+        max_attempts: 每个编号的总尝试次数上限（含首次）
+        base_delay/max_delay: 退避基准与上限（秒）
+        failed_ids: 若提供，仍然失败的编号会追加到其中
+
+    Returns:
+        最终仍然失败的编号
+    """
+    targets = checkpoint.retryable_failures(max_attempts)
+    if not targets:
+        return []
+    print(f"重试 {len(targets)} 个失败编号（指数退避，最多 {max_attempts} 次）")
+
+    def retry_one(scp_id: int) -> bool:
+        while True:
+            attempts = checkpoint.failed[scp_id]['attempts']
+            time.sleep(backoff_delay(attempts, base_delay, max_delay))
+            try:
+                data = scrape(scp_id)
+                error = data.get('error') if data else '未知错误'
+            except Exception as exc:
+                data, error = None, str(exc)
+            if not error:
+                db[str(scp_id)] = data
+                checkpoint.mark_done(scp_id)
+                print(f"重试成功: SCP-{scp_id:03d}")
+                return True
+            checkpoint.mark_failed(scp_id, error)
+            if attempts + 1 >= max_attempts or not is_retryable(error):
+                print(f"重试放弃: SCP-{scp_id:03d} - {error}")
+                return False
+
+    still_failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for scp_id, ok in zip(targets, executor.map(retry_one, targets)):
+            if not ok:
+                still_failed.append(scp_id)
+    checkpoint.save()
+
+    if failed_ids is not None:
+        failed_ids.extend(i for i in still_failed if i not in failed_ids)
+    return still_failed
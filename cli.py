@@ -0,0 +1,327 @@
+"""
+SCP 爬取器命令行入口 - crawl / resume / reparse / lookup / bench 子命令
+
+启动时只导入 argparse；各子命令执行时才导入所需模块，requests、bs4、lxml 与全局 HTTP session
+在第一次下载或解析页面时才载入，查询单条记录、打印帮助这类短任务不承担这些开销
+（冷启动耗时见 benchmarks/bench_import.py）。
+
+用法：
+    python cli.py crawl --start 1 --end 5 --workers 4
+    python cli.py resume --start 1 --end 999
+    python cli.py reparse scp_pages.arc --output scp_database_cn.json
+    python cli.py lookup scp_database_cn.json 173 049 --fields id,name,class
+    python cli.py bench import --compare
+"""
+import argparse
+import os
+import sys
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+HTML_BACKENDS = ('bs4', 'strainer', 'lxml')
+
+
+def add_crawl_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    """crawl 与 resume 共用的参数"""
+    arg_parser.add_argument('--start', type=int, default=1, help="起始编号")
+    arg_parser.add_argument('--end', type=int, default=9999, help="结束编号")
+    arg_parser.add_argument('--engine', choices=['threads', 'async', 'pipeline'], default='threads',
+                            help="爬取引擎：线程池、asyncio 或 下载/多进程解析流水线")
+    arg_parser.add_argument('--workers', type=int, default=8, help="下载线程数（threads/pipeline 引擎）")
+    arg_parser.add_argument('--parse-workers', type=int, default=None, help="解析进程数（pipeline 引擎，默认CPU数）")
+    arg_parser.add_argument('--queue-size', type=int, default=64, help="待解析页面队列上限（pipeline 引擎）")
+    arg_parser.add_argument('--concurrency', type=int, default=32, help="全局并发上限（async 引擎）")
+    arg_parser.add_argument('--per-host', type=int, default=8, help="单主机连接上限（async 引擎）")
+    arg_parser.add_argument('--site', default=None, help="目标站点根地址（如本地夹具服务器 http://127.0.0.1:8765）")
+    arg_parser.add_argument('--html-backend', choices=HTML_BACKENDS, default=None,
+                            help="页面 HTML 解析后端（默认 lxml，未安装时为 bs4）")
+    arg_parser.add_argument('--fold-variants', action='store_true', help="字段值中的繁体字折叠为简体")
+    arg_parser.add_argument('--redact-blocks', action='store_true', help="字段值中的涂黑字符（█）替换为 [REDACTED]")
+    arg_parser.add_argument('--cache', metavar='PATH', default=None, help="启用持久化响应缓存（SQLite 文件）")
+    arg_parser.add_argument('--offline', action='store_true', help="离线模式：只从缓存解析，不访问网络")
+    arg_parser.add_argument('--throttle', action='store_true',
+                            help="启用按主机的自适应限速（令牌桶 + AIMD 并发，遵守 Retry-After）")
+    arg_parser.add_argument('--rate', type=float, default=5.0, help="自适应限速的初始速率（请求/秒）")
+    arg_parser.add_argument('--max-rate', type=float, default=50.0, help="自适应限速的速率上限（请求/秒）")
+    arg_parser.add_argument('--max-concurrency', type=int, default=16, help="自适应限速的单主机并发上限")
+    arg_parser.add_argument('--stats-interval', type=float, default=10.0,
+                            help="每隔多少秒打印一行统计（0 关闭）")
+    arg_parser.add_argument('--metrics-json', metavar='PATH', default=None, help="结束时把全部指标写入 JSON 文件")
+    arg_parser.add_argument('--metrics-port', type=int, default=None,
+                            help="在该端口提供 Prometheus 文本格式的 /metrics")
+    arg_parser.add_argument('--slow-pages', type=int, default=10, help="结束时列出最慢的 N 个页面及其阶段耗时")
+    arg_parser.add_argument('--output', default='scp_database_cn.json', help="数据库输出文件")
+    arg_parser.add_argument('--images', metavar='DIR', default=None,
+                            help="爬取结束后把记录中的图片并发下载到该目录（按内容哈希存放，重跑时跳过已完成）")
+    arg_parser.add_argument('--image-workers', type=int, default=8, help="图片下载线程数")
+    arg_parser.add_argument('--search-index', metavar='PATH', default=None,
+                            help="爬取结束后把数据库增量同步进全文检索索引（见 search_index.py）")
+    arg_parser.add_argument('--link-graph', metavar='PATH', default=None,
+                            help="爬取结束后把记录间的链接保存为邻接表（见 link_graph.py）")
+    arg_parser.add_argument('--jsonl', metavar='PATH', default=None,
+                            help="流式写入 JSONL（每完成一条立即追加），结束后紧凑化为 --output")
+    arg_parser.add_argument('--archive', metavar='PATH', default=None,
+                            help="压缩归档下载的原始页面，之后可用 reparse 子命令离线重新解析")
+    arg_parser.add_argument('--sqlite', metavar='PATH', default=None,
+                            help="逐条写入 SQLite 数据库（可随机读取与按条件查询），结束后导出为 --output")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="增量模式：只抓取新增、失败或最近修改的编号并合并进已有数据库")
+    arg_parser.add_argument('--manifest', default='scp_manifest.json', help="增量模式的清单文件")
+    arg_parser.add_argument('--checkpoint', default='scp_checkpoint.json', help="检查点文件")
+    arg_parser.add_argument('--resume', action='store_true',
+                            help="从检查点继续：跳过已完成的编号，并以指数退避重试失败项")
+    arg_parser.add_argument('--max-attempts', type=int, default=5, help="续爬时每个失败编号的总尝试次数上限")
+    arg_parser.add_argument('--discover', action='store_true',
+                            help="先从系列页（必要时 HEAD 探测）确定存在的编号，只爬取真实页面")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    crawl = commands.add_parser('crawl', help="按编号范围爬取")
+    add_crawl_arguments(crawl)
+    resume = commands.add_parser('resume', help="从检查点继续上次的爬取（等同于 crawl --resume）")
+    add_crawl_arguments(resume)
+    resume.set_defaults(resume=True)
+
+    reparse = commands.add_parser('reparse', help="按当前解析逻辑重新解析页面归档，不访问网络")
+    reparse.add_argument('archive')
+    reparse.add_argument('--output', default='scp_database_cn.json', help="数据库输出文件")
+    reparse.add_argument('--workers', type=int, default=None, help="解析进程数（默认 CPU 核数）")
+    reparse.add_argument('--html-backend', choices=HTML_BACKENDS, default=None)
+    reparse.add_argument('--fold-variants', action='store_true', help="字段值中的繁体字折叠为简体")
+    reparse.add_argument('--redact-blocks', action='store_true', help="字段值中的涂黑字符替换为 [REDACTED]")
+
+    lookup = commands.add_parser('lookup', help="从 JSON / JSONL 数据库读取指定编号的记录（偏移索引，不载入整个文件）")
+    lookup.add_argument('database')
+    lookup.add_argument('keys', nargs='+')
+    lookup.add_argument('--fields', default=None, help="逗号分隔的字段列表")
+
+    bench = commands.add_parser('bench', help="运行 benchmarks/ 下的基准脚本，其余参数原样传给脚本")
+    bench.add_argument('name', help="基准名，如 import、crawl、reader（对应 bench_<name>.py）")
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    return arg_parser
+
+
+def run_crawl(args, arg_parser: argparse.ArgumentParser) -> None:
+    """crawl / resume 子命令"""
+    import json
+    import time
+
+    import temp_scraper
+    from metrics import StatsReporter, metrics, serve_prometheus
+
+    if args.site:
+        temp_scraper.set_site_url(args.site)
+    try:
+        temp_scraper.set_html_backend(args.html_backend)
+    except ValueError as e:
+        arg_parser.error(str(e))
+    temp_scraper.set_text_options(fold_variants=args.fold_variants, redact_blocks=args.redact_blocks)
+
+    if args.cache or args.offline:
+        if args.engine == 'async':
+            arg_parser.error("响应缓存挂载在 requests session 上，仅支持 threads/pipeline 引擎")
+        temp_scraper.enable_http_cache(args.cache or 'http_cache.sqlite', offline=args.offline)
+    throttle = None
+    if args.throttle:
+        throttle = temp_scraper.enable_throttle(rate=args.rate, max_rate=args.max_rate,
+                                                max_concurrency=args.max_concurrency)
+    page_archive = temp_scraper.enable_archive(args.archive) if args.archive else None
+    if args.jsonl and args.sqlite:
+        arg_parser.error("--jsonl 与 --sqlite 只能选择一个")
+
+    start_id, end_id = args.start, args.end
+    ids = range(start_id, end_id + 1)
+
+    metrics.slow_pages = args.slow_pages
+    metrics.reset()
+    if args.metrics_port:
+        serve_prometheus(metrics, args.metrics_port)
+        print(f"指标: http://127.0.0.1:{args.metrics_port}/metrics")
+    reporter = None
+    if args.stats_interval > 0:
+        reporter = StatsReporter(metrics, args.stats_interval,
+                                 extra=(lambda: throttle.describe()) if throttle is not None else None).start()
+
+    start_time = time.time()
+
+    if args.discover:
+        from discovery import discover_ids
+        candidates = len(ids)
+        ids = discover_ids(ids)
+        print(f"发现 {len(ids)} 个存在的编号（跳过 {candidates - len(ids)} 个空位）")
+
+    if args.incremental:
+        from incremental import crawl_incremental
+        summary = crawl_incremental(ids, db_path=args.output, manifest_path=args.manifest,
+                                    max_workers=args.workers)
+        if reporter is not None:
+            reporter.stop()
+        print("\n=== 增量爬取完成 ===")
+        print(f"耗时: {time.time() - start_time:.2f} 秒")
+        print(f"计划: {summary['planned']} 个, 更新: {summary['ok']} 个, 未变化: {summary['unchanged']} 个, "
+              f"失败: {summary['failed']} 个, 不存在: {summary['missing']} 个")
+        return
+
+    from checkpoint import Checkpoint, retry_failed
+
+    # 非续爬时开始新的检查点
+    if not args.resume and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.resume:
+        ids = checkpoint.pending(ids)
+        print(f"从检查点继续: 已完成 {len(checkpoint.done)} 个, 待爬 {len(ids)} 个, 失败待重试 {len(checkpoint.failed)} 个")
+
+    sink = None
+    if args.jsonl:
+        from storage import JSONLWriter, compact_jsonl
+        sink = JSONLWriter(args.jsonl)
+    elif args.sqlite:
+        from storage import SQLiteStore, export_sqlite
+        sink = SQLiteStore(args.sqlite)
+
+    try:
+        if args.engine == 'async':
+            from async_scraper import crawl_async
+            db, failed_ids = crawl_async(ids, concurrency=args.concurrency, limit_per_host=args.per_host,
+                                         sink=sink, checkpoint=checkpoint)
+        elif args.engine == 'pipeline':
+            from pipeline import crawl_pipeline
+            db, failed_ids = crawl_pipeline(ids, fetch_workers=args.workers, parse_workers=args.parse_workers,
+                                            queue_size=args.queue_size, sink=sink, checkpoint=checkpoint)
+        else:
+            db, failed_ids = temp_scraper.crawl_threaded(ids, max_workers=args.workers, sink=sink,
+                                                         checkpoint=checkpoint)
+
+        if args.resume:
+            retry_failed(checkpoint, temp_scraper.scrape_scp, db, max_workers=args.workers,
+                         max_attempts=args.max_attempts)
+            failed_ids = [i for i in sorted(checkpoint.failed) if start_id <= i <= end_id]
+    finally:
+        checkpoint.save()
+        if sink is not None:
+            sink.close()
+        if reporter is not None:
+            reporter.stop()
+        if page_archive is not None:
+            page_archive.close()
+
+    end_time = time.time()
+
+    # --- 结果处理 ---
+    # 写入数据库文件
+    output_start = time.perf_counter()
+    try:
+        if args.jsonl:
+            compact_jsonl(args.jsonl, args.output)
+        elif args.sqlite:
+            # 库中保留历次写入的记录，续爬时无需再与旧文件合并
+            export_sqlite(args.sqlite, args.output)
+        else:
+            # 续爬时与上次写出的数据库合并
+            if args.resume and os.path.exists(args.output):
+                with open(args.output, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+                previous.update(db)
+                db = previous
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(db, f, ensure_ascii=False, indent=4)
+    except IOError as e:
+        print(f"写入文件失败: {e}")
+    metrics.record_stage('output', time.perf_counter() - output_start)
+
+    # 镜像图片：从写出的数据库读取图片 URL，下载后把 image_hashes 写回
+    image_summary = None
+    if args.images and os.path.exists(args.output):
+        from images import mirror_database
+        with metrics.stage('images'):
+            image_summary = mirror_database(args.output, args.images, args.image_workers)
+
+    index_summary = None
+    if args.search_index and os.path.exists(args.output):
+        from search_index import build_index
+        with metrics.stage('search_index'):
+            index_summary = build_index(args.output, args.search_index)
+
+    graph = None
+    if args.link_graph and os.path.exists(args.output):
+        from link_graph import build_graph
+        graph = build_graph(args.output, args.link_graph)
+
+    print("\n=== 爬取完成 ===")
+    print(f"耗时: {end_time - start_time:.2f} 秒")
+    print(f"成功: {len(db)} 个")
+    print(f"失败: {len(failed_ids)} 个")
+    if failed_ids:
+        print(f"失败的ID: {sorted(failed_ids)}")
+    if image_summary is not None:
+        print(f"图片: {image_summary['urls']} 个, 下载 {image_summary['downloaded']} 个, "
+              f"跳过 {image_summary['skipped']} 个, 失败 {image_summary['failed']} 个")
+    if index_summary is not None:
+        print(f"检索索引: 新增 {index_summary['added']} 个, 更新 {index_summary['updated']} 个, "
+              f"删除 {index_summary['removed']} 个, 未变化 {index_summary['unchanged']} 个")
+    if graph is not None:
+        print(f"链接图: {len(graph)} 个页面, {graph.edge_count()} 条链接")
+    if throttle is not None:
+        print(f"限速状态: {throttle.describe()}")
+    print(f"统计: {metrics.stats_line()}")
+    slowest = metrics.slowest()
+    if slowest:
+        print(f"最慢的 {len(slowest)} 个页面:")
+        for page in slowest:
+            breakdown = ', '.join(f"{stage} {ms:.0f}ms" for stage, ms in page['stages_ms'].items())
+            print(f"  SCP-{page['id']:03d} {page['total_ms']:.0f}ms ({breakdown})")
+    if args.metrics_json:
+        metrics.dump_json(args.metrics_json)
+        print(f"指标已写入: {args.metrics_json}")
+
+
+def run_reparse(args) -> None:
+    """reparse 子命令，与 archive.py reparse 共用实现"""
+    from archive import run_reparse as reparse
+
+    reparse(args)
+
+
+def run_lookup(args) -> None:
+    """lookup 子命令：只导入 reader，不加载爬取相关模块"""
+    import json
+
+    from reader import RecordReader, record_key
+
+    fields = args.fields.split(',') if args.fields else None
+    with RecordReader(args.database) as reader:
+        result = {key: reader.get(record_key(key), fields=fields) for key in args.keys}
+    print(json.dumps(result, ensure_ascii=False, indent=4))
+
+
+def run_bench(args, arg_parser: argparse.ArgumentParser) -> None:
+    """bench 子命令：以脚本方式运行 benchmarks/bench_<name>.py"""
+    import runpy
+
+    path = os.path.join(BENCH_DIR, f"bench_{args.name}.py")
+    if not os.path.exists(path):
+        names = sorted(f[len('bench_'):-len('.py')] for f in os.listdir(BENCH_DIR)
+                       if f.startswith('bench_') and f.endswith('.py'))
+        arg_parser.error(f"未知的基准: {args.name}（可选: {', '.join(names)}）")
+    sys.argv = [path] + args.args
+    runpy.run_path(path, run_name='__main__')
+
+
+def main(argv=None):
+    arg_parser = build_parser()
+    args = arg_parser.parse_args(argv)
+    if args.command in ('crawl', 'resume'):
+        run_crawl(args, arg_parser)
+    elif args.command == 'reparse':
+        run_reparse(args)
+    elif args.command == 'lookup':
+        run_lookup(args)
+    else:
+        run_bench(args, arg_parser)
+
+
+if __name__ == '__main__':
+    main()
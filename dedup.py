@@ -0,0 +1,453 @@
+"""
+SCP 内容去重模块 - 基于哈希的重复块检测：页面内去重、全库共享块统计与近似重复检测
+
+块：按句末标点（。！？!? 以及后接空白的 .）切分出的片段，保留原文（含空白），
+比较时用规范化形式（小写、去除空白与标点）。
+
+页面内（dedupe_record）：
+    - 解析时只处理 description 与 containment，删除同一字段内完全重复（规范化后相同）的块，
+      与旧版按 。 切分的去重相同，但同样适用于英文标点，且不再丢弃唯一的短句
+    - 跨字段去重（前面字段已出现的块）与近似重复（与前面某一个块的 k 字符 shingle 重合率达到阈值）
+      会删除有意义的内容（如各次实验中相同的结果句），只在 strip 命令或显式传参时启用
+    - 规范化后短于 MIN_BLOCK_CHARS 的短句只在同一字段内完全重复时删除
+每个块的 shingle 只计算一次，近似重复用 shingle → 块的倒排索引逐块比较。
+
+全库（CorpusDeduplicator，可选）：
+    - 统计跨字段、跨记录完全相同的块及其可节省的字节数
+    - 可选用 MinHash（单次置换分桶）+ LSH 分段找出近似重复的块簇
+    - pack_shared/expand_shared：共享块只存一份，字段中以短引用代替，可无损还原
+
+用法：
+    python dedup.py report scp_database_cn.json [--near]
+    python dedup.py strip scp_database_cn.json --output scp_database_stripped.json [--near]
+    python dedup.py pack scp_database_cn.json --output scp_database_packed.json
+    python dedup.py unpack scp_database_packed.json --output scp_database_cn.json
+"""
+import argparse
+import hashlib
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# 块的切分点：句末标点之后，或后接空白的英文句点之后（切分不丢弃任何字符）
+RE_SEGMENT = re.compile(r'(?<=[。！？!?])|(?<=\.)(?=\s)')
+RE_NORMALIZE = re.compile(r'[\W_]+')
+
+SHINGLE_SIZE = 8
+# 规范化后短于此长度的块只做同一字段内的完全重复判定
+MIN_BLOCK_CHARS = 10
+# 规范化后达到此长度的块才做近似重复判定（更短的块只判完全重复）
+NEAR_MIN_CHARS = 32
+# 块的 shingle 有多大比例已在前文出现时视为近似重复
+NEAR_DUP_THRESHOLD = 0.9
+# 解析时去重的字段（与旧版相同）；其他字段（实验记录、附录等）中的重复句子通常是有意义的内容
+PARSE_FIELDS = ('description', 'containment')
+# 不参与去重的元数据字段
+SKIP_FIELDS = frozenset(('id', 'name', 'class', 'url', 'series', 'tags', 'images', 'image_hashes',
+                         'record_start', 'record_end', 'warning', 'error'))
+
+# MinHash 签名的桶数与 LSH 分段（BANDS * ROWS == MINHASH_BINS）
+MINHASH_BINS = 32
+LSH_BANDS = 8
+LSH_ROWS = 4
+# 参与全库近似重复检测的最短块（太短的块签名几乎全靠补桶，估计不可靠）
+CORPUS_NEAR_MIN_CHARS = 48
+# 签名相同桶比例（Jaccard 估计）达到此值的块视为近似重复
+CORPUS_NEAR_THRESHOLD = 0.8
+
+_MASK64 = (1 << 64) - 1
+_EMPTY = _MASK64 + 1
+# 共享块引用：私用区字符包围的块 ID，嵌在字段字符串中
+BLOCK_MARK = '\ue000'
+RE_BLOCK_REF = re.compile(BLOCK_MARK + '([0-9a-f]{16})' + BLOCK_MARK)
+REF_BYTES = len((BLOCK_MARK * 2 + '0' * 16).encode('utf-8'))
+
+
+def split_segments(text: str) -> List[str]:
+    """把文本切成块，''.join(结果) == text"""
+    return [segment for segment in RE_SEGMENT.split(text) if segment]
+
+
+def normalize_block(segment: str) -> str:
+    """比较用的块形式：小写并去除空白与标点"""
+    return RE_NORMALIZE.sub('', segment.lower())
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """文本全部 k 字符窗口的哈希集合
+
+    k 固定时每个窗口的切片哈希是常数开销，整体与文本长度成线性；切片哈希在 C 中完成，
+    比逐字符维护的纯 Python 滚动哈希快约 3 倍。哈希值依赖 PYTHONHASHSEED，只在单个进程内比较。
+    """
+    if len(text) <= k:
+        return {hash(text)}
+    return {hash(text[i:i + k]) for i in range(len(text) - k + 1)}
+
+
+def block_id(text: str) -> str:
+    """共享块的稳定 ID"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class _BlockShingles:
+    """逐块的 shingle 倒排索引：判断新块是否与前面的某一个块近似重复"""
+
+    def __init__(self, threshold: float, shingle_size: int):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.owners: Dict[int, List[int]] = defaultdict(list)
+        self.blocks = 0
+
+    def seen_or_add(self, key: str) -> bool:
+        """key 与已加入的某个块近似重复时返回 True，否则把它加入索引"""
+        shingles = shingle_hashes(key, self.shingle_size)
+        overlap: Dict[int, int] = defaultdict(int)
+        for h in shingles:
+            for block in self.owners.get(h, ()):
+                overlap[block] += 1
+        if overlap and max(overlap.values()) >= self.threshold * len(shingles):
+            return True
+        for h in shingles:
+            self.owners[h].append(self.blocks)
+        self.blocks += 1
+        return False
+
+
+def dedupe_record(record: Dict[str, Any], fields: Optional[Iterable[str]] = None,
+                  skip: Iterable[str] = SKIP_FIELDS, cross_field: bool = False, near: bool = False,
+                  min_chars: int = MIN_BLOCK_CHARS, threshold: float = NEAR_DUP_THRESHOLD,
+                  shingle_size: int = SHINGLE_SIZE) -> int:
+    """就地删除一条记录中重复的块，默认只删除同一字段内完全重复的块
+
+    Args:
+        record: 记录字典，只处理字符串字段
+        fields: 只处理这些字段，默认为 skip 之外的全部字段
+        skip: 不处理的字段
+        cross_field: 同时删除前面字段中已出现的块（有损，整个字段都重复时变为空串）
+        near: 同时删除与前面某一个块近似重复的块（有损；cross_field 时也跨字段比较）
+        min_chars: 规范化后短于此长度的块只在同一字段内去重
+        threshold: 近似重复判定的 shingle 重合率
+        shingle_size: shingle 长度（字符）
+
+    Returns:
+        删除的字节数（UTF-8）
+    """
+    skip = skip if isinstance(skip, (set, frozenset)) else frozenset(skip)
+    if fields is not None:
+        fields = frozenset(fields)
+    seen_blocks: Set[str] = set()
+    seen_near = _BlockShingles(threshold, shingle_size) if near else None
+    saved = 0
+    for field, value in list(record.items()):
+        if field in skip or (fields is not None and field not in fields) or not isinstance(value, str) or not value:
+            continue
+        if not cross_field:
+            seen_blocks = set()
+            seen_near = _BlockShingles(threshold, shingle_size) if near else None
+        kept, dropped = [], []
+        short_seen: Set[str] = set()
+        for segment in split_segments(value):
+            key = normalize_block(segment)
+            if len(key) < min_chars:
+                if key in short_seen:
+                    dropped.append(segment)
+                else:
+                    kept.append(segment)
+                    if key:
+                        short_seen.add(key)
+                continue
+            if key in seen_blocks:
+                dropped.append(segment)
+                continue
+            if seen_near is not None and len(key) >= NEAR_MIN_CHARS and seen_near.seen_or_add(key):
+                dropped.append(segment)
+                continue
+            kept.append(segment)
+            seen_blocks.add(key)
+        if not dropped:
+            continue
+        text = ''.join(kept).strip()
+        record[field] = text
+        saved += len(value.encode('utf-8')) - len(text.encode('utf-8'))
+    return saved
+
+
+def strip_record(record: Dict[str, Any], near: bool = False) -> int:
+    """记录内跨字段去重（strip 命令）：删除前面字段已出现的块，near 时含近似重复"""
+    return dedupe_record(record, cross_field=True, near=near)
+
+
+def minhash_signature(shingles: Set[int], bins: int = MINHASH_BINS) -> Tuple[int, ...]:
+    """单次置换 MinHash：按哈希值分桶取每桶最小值，空桶从后面最近的非空桶借值（循环补桶）"""
+    signature = [_EMPTY] * bins
+    for h in shingles:
+        h &= _MASK64
+        b = h % bins
+        v = h // bins
+        if v < signature[b]:
+            signature[b] = v
+    for i in range(bins):
+        if signature[i] == _EMPTY:
+            for offset in range(1, bins):
+                donor = signature[(i + offset) % bins]
+                if donor != _EMPTY and donor <= _MASK64:
+                    # 加上借用距离，避免不同位置的补桶偶然相等
+                    signature[i] = _MASK64 + 1 + donor * bins + offset
+                    break
+    return tuple(signature)
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent.get(x, x)
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _saving(entry: List) -> int:
+    """共享块只存一份、各处改为引用时节省的字节数"""
+    count, size = entry[0], entry[1]
+    return (count - 1) * size - count * REF_BYTES
+
+
+class CorpusDeduplicator:
+    """流式统计全库重复块：add() 逐条加入记录，report() 汇总"""
+
+    def __init__(self, near: bool = False, min_chars: int = MIN_BLOCK_CHARS,
+                 skip: Iterable[str] = SKIP_FIELDS, near_threshold: float = CORPUS_NEAR_THRESHOLD):
+        """
+        Args:
+            near: 是否用 MinHash/LSH 检测近似重复块（每个唯一块计算一次签名）
+            min_chars: 规范化后短于此长度的块不统计
+            skip: 不统计的字段
+            near_threshold: 近似重复的 Jaccard 估计阈值
+        """
+        self.near = near
+        self.min_chars = min_chars
+        self.skip = frozenset(skip)
+        self.near_threshold = near_threshold
+        self.records = 0
+        self.total_bytes = 0
+        # 块原文 → [出现次数, UTF-8 字节数, 首次出现的记录键, 涉及的记录数]
+        self.blocks: Dict[str, List] = {}
+        self._last_record: Dict[str, str] = {}
+        # 近似重复：唯一块序号 → 块原文；LSH 桶 → 块序号
+        self._near_blocks: List[str] = []
+        self._buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        self._signatures: List[Tuple[int, ...]] = []
+
+    def add(self, key: str, record: Dict[str, Any]) -> None:
+        self.records += 1
+        for field, value in record.items():
+            if field in self.skip or not isinstance(value, str):
+                continue
+            self.total_bytes += len(value.encode('utf-8'))
+            for segment in split_segments(value):
+                text = segment.strip()
+                normalized = normalize_block(text)
+                if len(normalized) < self.min_chars:
+                    continue
+                entry = self.blocks.get(text)
+                if entry is None:
+                    self.blocks[text] = [1, len(text.encode('utf-8')), key, 1]
+                    self._last_record[text] = key
+                    if self.near and len(normalized) >= CORPUS_NEAR_MIN_CHARS:
+                        self._index_near(text, normalized)
+                else:
+                    entry[0] += 1
+                    if self._last_record[text] != key:
+                        self._last_record[text] = key
+                        entry[3] += 1
+
+    def _index_near(self, text: str, normalized: str) -> None:
+        index = len(self._near_blocks)
+        self._near_blocks.append(text)
+        signature = minhash_signature(shingle_hashes(normalized))
+        self._signatures.append(signature)
+        for band in range(LSH_BANDS):
+            start = band * LSH_ROWS
+            self._buckets[(band,) + signature[start:start + LSH_ROWS]].append(index)
+
+    def shared_blocks(self) -> Dict[str, List]:
+        """出现不止一次、且改为引用能节省空间的块"""
+        return {text: entry for text, entry in self.blocks.items() if _saving(entry) > 0}
+
+    def near_duplicate_clusters(self) -> List[List[str]]:
+        """近似重复块簇（每簇至少两个不同的块），按簇大小降序"""
+        if not self.near:
+            return []
+        groups = _DisjointSet()
+        checked: Set[Tuple[int, int]] = set()
+        for members in self._buckets.values():
+            if len(members) < 2:
+                continue
+            first = members[0]
+            for other in members[1:]:
+                pair = (first, other)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                a, b = self._signatures[first], self._signatures[other]
+                same = sum(1 for x, y in zip(a, b) if x == y)
+                if same >= self.near_threshold * MINHASH_BINS:
+                    groups.union(first, other)
+        clusters: Dict[int, List[str]] = defaultdict(list)
+        for index in groups.parent:
+            clusters[groups.find(index)].append(self._near_blocks[index])
+        for root in list(clusters):
+            if self._near_blocks[root] not in clusters[root]:
+                clusters[root].insert(0, self._near_blocks[root])
+        return sorted(clusters.values(), key=len, reverse=True)
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """汇总：记录数、文本字节数、共享块数与共享块只存一份可节省的字节数等"""
+        shared = self.shared_blocks()
+        saved = sum(_saving(entry) for entry in shared.values())
+        most = sorted(shared.items(), key=lambda item: _saving(item[1]), reverse=True)[:top]
+        result = {
+            'records': self.records,
+            'text_bytes': self.total_bytes,
+            'unique_blocks': len(self.blocks),
+            'shared_blocks': len(shared),
+            'cross_record_blocks': sum(1 for entry in shared.values() if entry[3] > 1),
+            'bytes_saved': saved,
+            'top_shared': [{'text': text, 'count': entry[0], 'records': entry[3], 'bytes': entry[1]}
+                           for text, entry in most],
+        }
+        if self.near:
+            clusters = self.near_duplicate_clusters()
+            result['near_duplicate_clusters'] = len(clusters)
+            result['near_duplicate_blocks'] = sum(len(cluster) for cluster in clusters)
+            result['top_near_duplicates'] = [cluster[:3] for cluster in clusters[:top]]
+        return result
+
+
+def analyze_corpus(db: Dict[str, Dict], near: bool = False) -> CorpusDeduplicator:
+    """统计数据库中的重复块"""
+    deduplicator = CorpusDeduplicator(near=near)
+    for key, record in db.items():
+        deduplicator.add(key, record)
+    return deduplicator
+
+
+def pack_shared(db: Dict[str, Dict], deduplicator: Optional[CorpusDeduplicator] = None) -> Dict[str, Any]:
+    """共享块只存一份：字段中的共享块替换为引用（私用区字符包围的块 ID）
+
+    Returns:
+        {'blocks': {ID: 块原文}, 'records': {键: 记录}}，用 expand_shared 还原
+
+    Raises:
+        ValueError: 字段文本本身含有引用标记字符
+    """
+    deduplicator = deduplicator or analyze_corpus(db)
+    skip = deduplicator.skip
+    ids = {text: block_id(text) for text in deduplicator.shared_blocks()}
+    blocks: Dict[str, str] = {}
+    records: Dict[str, Dict] = {}
+    for key, record in db.items():
+        packed = {}
+        for field, value in record.items():
+            if field in skip or not isinstance(value, str):
+                packed[field] = value
+                continue
+            if BLOCK_MARK in value:
+                raise ValueError(f"{key}.{field} 含有引用标记字符 U+E000，无法打包")
+            parts = []
+            for segment in split_segments(value):
+                text = segment.strip()
+                ref = ids.get(text)
+                if ref is not None:
+                    blocks[ref] = text
+                    # 块两侧的空白保留在原处，保证无损还原
+                    segment = segment.replace(text, BLOCK_MARK + ref + BLOCK_MARK, 1)
+                parts.append(segment)
+            packed[field] = ''.join(parts)
+        records[key] = packed
+    return {'blocks': blocks, 'records': records}
+
+
+def expand_shared(packed: Dict[str, Any]) -> Dict[str, Dict]:
+    """pack_shared 的逆操作"""
+    blocks = packed['blocks']
+
+    def expand(match):
+        return blocks[match.group(1)]
+
+    db = {}
+    for key, record in packed['records'].items():
+        db[key] = {field: RE_BLOCK_REF.sub(expand, value) if isinstance(value, str) and BLOCK_MARK in value else value
+                   for field, value in record.items()}
+    return db
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    report = commands.add_parser('report', help="统计重复块与可节省的字节数")
+    report.add_argument('database')
+    report.add_argument('--near', action='store_true', help="同时用 MinHash/LSH 检测近似重复块")
+    report.add_argument('--top', type=int, default=5, help="列出节省最多的前几个共享块")
+    strip = commands.add_parser('strip', help="在每条记录内删除跨字段重复的块（有损），写出新的数据库")
+    strip.add_argument('database')
+    strip.add_argument('--output', required=True)
+    strip.add_argument('--near', action='store_true', help="同时删除近似重复的块")
+    pack = commands.add_parser('pack', help="共享块只存一份，写出打包后的数据库")
+    pack.add_argument('database')
+    pack.add_argument('--output', required=True)
+    unpack = commands.add_parser('unpack', help="还原打包的数据库")
+    unpack.add_argument('database')
+    unpack.add_argument('--output', required=True)
+    args = arg_parser.parse_args()
+
+    with open(args.database, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if args.command == 'report':
+        summary = analyze_corpus(data, near=args.near).report(args.top)
+        print(f"{summary['records']} 条记录，文本 {summary['text_bytes'] / 1e6:.2f} MB，"
+              f"唯一块 {summary['unique_blocks']} 个，共享块 {summary['shared_blocks']} 个"
+              f"（跨记录 {summary['cross_record_blocks']} 个），共享块只存一份可节省 {summary['bytes_saved']} 字节")
+        for item in summary['top_shared']:
+            print(f"  x{item['count']}（{item['records']} 条记录）{item['text'][:60]}")
+        stripped = sum(strip_record(dict(record), near=args.near) for record in data.values())
+        print(f"记录内跨字段去重（strip{' --near' if args.near else ''}）可删除 {stripped} 字节")
+        if args.near:
+            print(f"近似重复块簇 {summary['near_duplicate_clusters']} 个，"
+                  f"涉及 {summary['near_duplicate_blocks']} 个块")
+            for cluster in summary['top_near_duplicates']:
+                print('  ' + ' | '.join(text[:40] for text in cluster))
+        return
+
+    if args.command == 'strip':
+        saved = sum(strip_record(record, near=args.near) for record in data.values())
+        print(f"{len(data)} 条记录，删除 {saved} 字节")
+        result = data
+    elif args.command == 'pack':
+        result = pack_shared(data)
+        before = sum(len(value.encode('utf-8')) for record in data.values()
+                     for value in record.values() if isinstance(value, str))
+        after = sum(len(value.encode('utf-8')) for record in result['records'].values()
+                    for value in record.values() if isinstance(value, str))
+        after += sum(len(text.encode('utf-8')) for text in result['blocks'].values())
+        print(f"共享块 {len(result['blocks'])} 个，文本 {before} → {after} 字节")
+    else:
+        result = expand_shared(data)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+SCP 编号发现模块 - 在正式爬取前低成本地确定哪些编号真实存在
+
+优先使用系列索引（九个系列页中已创建的条目链接）；无法载入的系列回退为对条目页发送
+HEAD 探测。正式爬取只调度真实存在的页面，省去空位的完整请求、重试与解析开销。
+"""
+import concurrent.futures
+from typing import Iterable, List
+
+import requests
+
+from temp_scraper import get_item_url, get_series_number, get_session, series_index, vprint
+
+
+def probe_exists(scp_id: int) -> bool:
+    """以 HEAD 请求探测条目页是否存在
+
+    只有明确的 404 视为不存在；其他错误保守地视为存在，交给正式爬取处理。
+    """
+    url = get_item_url(scp_id)
+    try:
+        resp = get_session().head(url, timeout=10, allow_redirects=True)
+        return resp.status_code != 404
+    except requests.RequestException as e:
+        vprint(f"探测失败 {url}: {e}")
+        return True
+
+
+def discover_ids(ids: Iterable[int], probe_workers: int = 16, verify_absent: bool = False) -> List[int]:
+    """筛选出真实存在的编号
+
+    Args:
+        ids: 候选编号
+        probe_workers: HEAD 探测线程数
+        verify_absent: 对系列页中未列出的编号也做 HEAD 探测（更全面，但请求更多）
+
+    Returns:
+        排序后的存在编号列表
+    """
+    ids = list(ids)
+    loaded = series_index.warm({get_series_number(i) for i in ids})
+    known = series_index.known_ids()
+
+    existing, to_probe = [], []
+    for scp_id in ids:
+        if get_series_number(scp_id) not in loaded:
+            to_probe.append(scp_id)
+        elif scp_id in known:
+            existing.append(scp_id)
+        elif verify_absent:
+            to_probe.append(scp_id)
+
+    if to_probe:
+        vprint(f"HEAD 探测 {len(to_probe)} 个编号")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=probe_workers) as executor:
+            for scp_id, ok in zip(to_probe, executor.map(probe_exists, to_probe)):
+                if ok:
+                    existing.append(scp_id)
+
+    return sorted(existing)
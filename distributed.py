@@ -0,0 +1,357 @@
+"""
+SCP 分布式爬取模块 - 多个节点从共享工作队列租约编号批次，各自写分片，最后合并
+
+工作队列保存在 SQLite 文件中，进程间通过数据库事务协调：
+    - 默认 WAL 模式，只适用于同一台机器上的多个进程：WAL 依赖共享内存（-shm 文件），
+      不能放在网络文件系统上
+    - 多台机器共享一个队列时，所有命令都加 --journal-mode delete，且队列文件必须位于文件锁可靠的
+      文件系统上；NFS/SMB 的锁常不可靠，可能损坏队列或把同一批编号同时租给两个进程。
+      不满足时改为每台机器各用一个本地队列，用 init --start/--end 划分编号范围，最后 merge 全部分片
+    - 每个编号一行：pending → leased（带租约持有者与到期时间）→ done / failed
+    - 工作进程按批租约编号，后台线程定期心跳延长租约；进程退出或失联后租约到期，
+      编号自动回到 pending，由其他工作进程接手
+    - 可重试的失败在 max_attempts 次以内重新排队，永久错误（404 等）直接记为 failed
+每个工作进程把记录写入自己的 JSONL 分片（先落盘再确认完成），merge 把分片合并为标准数据库。
+给定 --global-rate 时，各工作进程按当前存活的工作进程数平分全局速率上限。
+
+用法：
+    python distributed.py --queue crawl_queue.sqlite init --start 1 --end 7999
+    python distributed.py --queue crawl_queue.sqlite worker --shard-dir shards --global-rate 20   # 同一台机器上每个进程各运行一个
+    python distributed.py --queue crawl_queue.sqlite status
+    python distributed.py merge --shard-dir shards --output scp_database_cn.json
+"""
+import argparse
+import glob
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from checkpoint import is_retryable
+
+
+JOURNAL_MODES = ('wal', 'delete')
+
+
+class WorkQueue:
+    """SQLite 文件中的编号租约队列（进程间通过数据库事务协调）"""
+
+    def __init__(self, path: str = 'crawl_queue.sqlite', lease_seconds: float = 120.0, max_attempts: int = 5,
+                 journal_mode: str = 'wal'):
+        """
+        Args:
+            path: 队列数据库文件
+            lease_seconds: 租约时长，超过该时间未心跳的租约会被收回
+            max_attempts: 可重试失败的最大尝试次数
+            journal_mode: 'wal'（单机多进程）或 'delete'（多台机器共享，需要可靠的文件锁）；
+                访问同一队列的所有进程必须一致
+
+        Raises:
+            ValueError: 未知的日志模式
+        """
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"未知的日志模式: {journal_mode}（可选: {', '.join(JOURNAL_MODES)}）")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f'PRAGMA journal_mode={journal_mode.upper()}')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+            CREATE TABLE IF NOT EXISTS workers (
+                name TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL,
+                pages INTEGER NOT NULL DEFAULT 0
+            );
+        ''')
+
+    def _transaction(self):
+        """BEGIN IMMEDIATE 事务：写锁在开始时获取，避免多个进程同时租到同一批编号"""
+        conn = self._conn
+
+        class Transaction:
+            def __enter__(self):
+                conn.execute('BEGIN IMMEDIATE')
+                return conn
+
+            def __exit__(self, exc_type, exc, tb):
+                conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+        return Transaction()
+
+    def enqueue(self, ids: Iterable[int]) -> int:
+        """加入编号（已在队列中的编号保持原状态），返回新增数量"""
+        with self._lock, self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO jobs (id, updated_at) VALUES (?, ?)',
+                             [(i, time.time()) for i in ids])
+            return conn.total_changes - before
+
+    def lease(self, worker: str, batch_size: int) -> List[int]:
+        """租约一批待爬编号（先收回已过期的租约）"""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = 'pending', owner = NULL "
+                         "WHERE state = 'leased' AND lease_expires < ?", (now,))
+            ids = [i for (i,) in conn.execute(
+                "SELECT id FROM jobs WHERE state = 'pending' ORDER BY id LIMIT ?", (batch_size,))]
+            conn.executemany("UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, updated_at = ? "
+                             "WHERE id = ?", [(worker, now + self.lease_seconds, now, i) for i in ids])
+            return ids
+
+    def heartbeat(self, worker: str) -> int:
+        """延长该工作进程持有的全部租约并登记存活，返回当前存活的工作进程数"""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.execute("UPDATE jobs SET lease_expires = ? WHERE state = 'leased' AND owner = ?",
+                         (now + self.lease_seconds, worker))
+            conn.execute('INSERT INTO workers (name, last_seen) VALUES (?, ?) '
+                         'ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen', (worker, now))
+            return conn.execute('SELECT COUNT(*) FROM workers WHERE last_seen >= ?',
+                                (now - self.lease_seconds,)).fetchone()[0]
+
+    def complete(self, worker: str, done: Iterable[int], failed: Dict[int, str]) -> None:
+        """确认一批结果；租约已被收回并转交他人的编号不受影响"""
+        now = time.time()
+        done = list(done)
+        with self._lock, self._transaction() as conn:
+            conn.executemany("UPDATE jobs SET state = 'done', owner = NULL, error = NULL, updated_at = ?, "
+                             "attempts = attempts + 1 WHERE id = ? AND owner = ?",
+                             [(now, i, worker) for i in done])
+            for scp_id, error in failed.items():
+                row = conn.execute('SELECT attempts FROM jobs WHERE id = ? AND owner = ?',
+                                   (scp_id, worker)).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                state = 'pending' if is_retryable(error) and attempts < self.max_attempts else 'failed'
+                conn.execute('UPDATE jobs SET state = ?, owner = NULL, error = ?, attempts = ?, updated_at = ? '
+                             'WHERE id = ?', (state, error, attempts, now, scp_id))
+            conn.execute('UPDATE workers SET pages = pages + ? WHERE name = ?', (len(done), worker))
+
+    def release(self, worker: str) -> None:
+        """正常退出时归还未完成的租约"""
+        with self._lock, self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = 'pending', owner = NULL WHERE state = 'leased' AND owner = ?",
+                         (worker,))
+            conn.execute('DELETE FROM workers WHERE name = ?', (worker,))
+
+    def stats(self) -> Dict[str, int]:
+        """各状态的编号数，如 {'pending': 10, 'leased': 40, 'done': 950, 'failed': 3}"""
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'))
+        return {state: counts.get(state, 0) for state in ('pending', 'leased', 'done', 'failed')}
+
+    def failures(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT id, error FROM jobs WHERE state = 'failed' ORDER BY id"))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BatchResults:
+    """收集一批编号的结果，接口与 checkpoint.Checkpoint 相同，可直接传给各爬取引擎"""
+
+    def __init__(self):
+        self.done: List[int] = []
+        self.failed: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def mark_done(self, scp_id: int) -> None:
+        with self._lock:
+            self.done.append(scp_id)
+            self.failed.pop(scp_id, None)
+
+    def mark_failed(self, scp_id: int, error: str) -> None:
+        with self._lock:
+            self.failed[scp_id] = str(error)
+
+
+def _crawl_batch(engine: str, ids: List[int], workers: int, sink, results: BatchResults) -> None:
+    if engine == 'async':
+        from async_scraper import crawl_async
+        crawl_async(ids, concurrency=workers, sink=sink, checkpoint=results)
+    elif engine == 'pipeline':
+        from pipeline import crawl_pipeline
+        crawl_pipeline(ids, fetch_workers=workers, sink=sink, checkpoint=results)
+    else:
+        from temp_scraper import crawl_threaded
+        crawl_threaded(ids, max_workers=workers, sink=sink, checkpoint=results)
+
+
+def run_worker(queue_path: str, shard_dir: str = 'shards', workers: int = 8, batch_size: Optional[int] = None,
+               engine: str = 'threads', global_rate: Optional[float] = None, lease_seconds: float = 120.0,
+               name: Optional[str] = None, journal_mode: str = 'wal') -> Dict[str, int]:
+    """运行一个工作进程，直到队列中既没有待爬编号也没有其他进程持有的租约
+
+    Args:
+        queue_path: 队列数据库文件
+        shard_dir: 分片目录，本进程写入 <目录>/<名称>.jsonl
+        workers: 本进程的并发数
+        batch_size: 每次租约的编号数，默认为 4 × workers
+        engine: 爬取引擎（threads/async/pipeline）
+        global_rate: 所有工作进程合计的速率上限（请求/秒），按存活进程数平分
+        lease_seconds: 租约时长
+        name: 工作进程名称，默认为 主机名-进程号
+        journal_mode: 队列数据库的日志模式，见 WorkQueue
+
+    Returns:
+        本进程的计数 {'done': ..., 'failed': ..., 'batches': ...}
+    """
+    import temp_scraper
+    from storage import JSONLWriter
+
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    batch_size = batch_size or 4 * workers
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds, journal_mode=journal_mode)
+    os.makedirs(shard_dir, exist_ok=True)
+    sink = JSONLWriter(os.path.join(shard_dir, f"{name}.jsonl"))
+
+    throttle = temp_scraper.throttle
+    if global_rate and throttle is None:
+        throttle = temp_scraper.enable_throttle(rate=min(5.0, global_rate), max_rate=global_rate,
+                                                max_concurrency=workers)
+
+    def apply_share(live_workers: int) -> None:
+        if global_rate and throttle is not None:
+            throttle.set_max_rate(global_rate / max(1, live_workers))
+
+    stop = threading.Event()
+
+    def heartbeat_loop():
+        while not stop.wait(lease_seconds / 3):
+            apply_share(queue.heartbeat(name))
+
+    apply_share(queue.heartbeat(name))
+    heartbeat = threading.Thread(target=heartbeat_loop, daemon=True)
+    heartbeat.start()
+
+    summary = {'done': 0, 'failed': 0, 'batches': 0}
+    try:
+        while True:
+            ids = queue.lease(name, batch_size)
+            if not ids:
+                # 其他进程仍持有租约时继续等待：它们若失联，租约到期后由这里接手
+                if not queue.stats()['leased']:
+                    break
+                stop.wait(min(1.0, lease_seconds / 3))
+                continue
+            results = BatchResults()
+            _crawl_batch(engine, ids, workers, sink, results)
+            # 记录先落盘再确认完成：确认之前崩溃时租约到期，编号会被重新爬取而不会丢失
+            sink.flush()
+            queue.complete(name, results.done, results.failed)
+            summary['done'] += len(results.done)
+            summary['failed'] += len(results.failed)
+            summary['batches'] += 1
+    finally:
+        stop.set()
+        heartbeat.join()
+        sink.close()
+        queue.release(name)
+        queue.close()
+    return summary
+
+
+def merge_shards(shard_paths: Iterable[str], output: str, base: Optional[str] = None) -> int:
+    """把各分片合并为标准 JSON 数据库（按编号排序）
+
+    同一编号出现在多个分片中时（租约过期后被重爬）取最后写入的一条。
+
+    Args:
+        shard_paths: JSONL 分片文件
+        output: 输出数据库文件
+        base: 已有数据库，分片中的记录覆盖其中的同名编号
+
+    Returns:
+        写出的记录数
+    """
+    import json
+    from storage import iter_jsonl, write_json_database
+
+    db: Dict[str, Dict] = {}
+    if base and os.path.exists(base):
+        with open(base, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+    for path in sorted(shard_paths, key=os.path.getmtime):
+        for key, record in iter_jsonl(path):
+            db[key] = record
+    ordered = sorted(db.items(), key=lambda item: int(item[0]) if item[0].isdigit() else float('inf'))
+    return write_json_database(ordered, output)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--queue', default='crawl_queue.sqlite', help="队列数据库文件")
+    arg_parser.add_argument('--journal-mode', choices=JOURNAL_MODES, default='wal',
+                            help="队列的 SQLite 日志模式：wal 仅限单机多进程，多台机器共享队列时用 delete")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    init = commands.add_parser('init', help="把编号范围加入队列")
+    init.add_argument('--start', type=int, default=1)
+    init.add_argument('--end', type=int, default=7999)
+
+    worker = commands.add_parser('worker', help="运行一个工作进程，直到队列耗尽")
+    worker.add_argument('--shard-dir', default='shards')
+    worker.add_argument('--workers', type=int, default=8)
+    worker.add_argument('--batch-size', type=int, default=None)
+    worker.add_argument('--engine', choices=['threads', 'async', 'pipeline'], default='threads')
+    worker.add_argument('--global-rate', type=float, default=None, help="所有工作进程合计的速率上限（请求/秒）")
+    worker.add_argument('--lease-seconds', type=float, default=120.0)
+    worker.add_argument('--site', default=None, help="目标站点根地址")
+    worker.add_argument('--html-backend', choices=['bs4', 'strainer', 'lxml'], default=None)
+    worker.add_argument('--name', default=None)
+
+    commands.add_parser('status', help="队列进度")
+
+    merge = commands.add_parser('merge', help="合并分片为标准数据库")
+    merge.add_argument('--shard-dir', default='shards')
+    merge.add_argument('--output', default='scp_database_cn.json')
+    merge.add_argument('--base', default=None, help="合并进已有数据库")
+    args = arg_parser.parse_args()
+
+    if args.command == 'init':
+        queue = WorkQueue(args.queue, journal_mode=args.journal_mode)
+        added = queue.enqueue(range(args.start, args.end + 1))
+        print(f"加入 {added} 个编号，队列: {queue.stats()}")
+        queue.close()
+    elif args.command == 'worker':
+        import temp_scraper
+        if args.site:
+            temp_scraper.set_site_url(args.site)
+        if args.html_backend:
+            temp_scraper.set_html_backend(args.html_backend)
+        start = time.time()
+        summary = run_worker(args.queue, args.shard_dir, args.workers, args.batch_size, args.engine,
+                             args.global_rate, args.lease_seconds, args.name, args.journal_mode)
+        print(f"工作进程结束: 成功 {summary['done']} 个, 失败 {summary['failed']} 个, "
+              f"{summary['batches']} 批, 耗时 {time.time() - start:.2f} 秒")
+    elif args.command == 'status':
+        queue = WorkQueue(args.queue, journal_mode=args.journal_mode)
+        print(f"队列: {queue.stats()}")
+        failures = queue.failures()
+        if failures:
+            print(f"永久失败: {sorted(failures)}")
+        queue.close()
+    else:
+        shards = glob.glob(os.path.join(args.shard_dir, '*.jsonl'))
+        count = merge_shards(shards, args.output, args.base)
+        print(f"合并 {len(shards)} 个分片，写出 {count} 条记录: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+SCP 页面单次遍历模块 - 一次 DOM 遍历同时收集字段块、图片与标签
+
+原流程对每个页面分别执行 find_all(['p','div','blockquote'])、逐元素 get_text()/find('strong')、
+find_all('img')、soup.find('div', class_='page-tags') 等多次扫描，嵌套 div 的文本还会被
+get_text() 反复拼接。这里每个节点只访问一次：文本片段按文档顺序存入同一个列表，
+每个字段块只记录片段区间，真正需要时才拼接成字符串。
+
+walk_page 遍历 BeautifulSoup 树，walk_lxml 直接遍历 lxml 元素树，两者产出相同的 PageWalk。
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import CData, NavigableString, Tag
+
+
+# 与 Tag.get_text() 默认行为一致：只收集 NavigableString 与 CData（不含注释、脚本等）
+TEXT_TYPES = getattr(Tag, 'MAIN_CONTENT_STRING_TYPES', {NavigableString, CData})
+BLOCK_TAGS = frozenset(('p', 'div', 'blockquote'))
+# 以下与 BeautifulSoup HTML 构建器的默认设置一致，供 walk_lxml 复现 get_text() 的结果：
+# 这些标签内的文本不是 NavigableString（Script、Stylesheet 等），get_text() 会跳过
+NON_TEXT_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+# 这些标签内保留原样空白；其他位置的纯 ASCII 空白片段会被折叠为单个换行或空格
+PRESERVE_WHITESPACE_TAGS = frozenset(('pre', 'textarea'))
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class PageWalk:
+    """一次遍历的结果，与具体 HTML 解析后端无关
+
+    Attributes:
+        found: 是否找到 div#page-content
+        images: 主体内 <img> 的属性字典，按文档顺序
+        tag_texts: 第一个 div.page-tags 内所有链接的文本；没有该容器时为 None
+        content_tag_texts: 主体内 href 含 /tag/ 的链接文本
+        links: 主体内全部链接的 href 原值，按文档顺序
+    """
+
+    __slots__ = ('found', 'images', 'tag_texts', 'content_tag_texts', 'links', '_pieces', '_blocks')
+
+    def __init__(self):
+        self.found = False
+        self.images: List[Dict[str, Any]] = []
+        self.tag_texts: Optional[List[str]] = None
+        self.content_tag_texts: List[str] = []
+        self.links: List[str] = []
+        self._pieces: List[str] = []
+        # 每个字段块为 [起, 止, 强调起, 强调止]，强调区间为 None 表示块内没有 <strong>
+        self._blocks: List[list] = []
+
+    def _text(self, start: int, end: int) -> str:
+        return ''.join(self._pieces[start:end])
+
+    def iter_blocks(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """按文档顺序惰性产出 (块文本, 首个 strong 文本)，均已 strip"""
+        for start, end, strong_start, strong_end in self._blocks:
+            strong_text = None
+            if strong_start is not None:
+                strong_text = self._text(strong_start, strong_end).strip()
+            yield self._text(start, end).strip(), strong_text
+
+
+def walk_page(soup) -> PageWalk:
+    """遍历整棵文档树一次，收集解析所需的全部信息"""
+    walk = PageWalk()
+    pieces = walk._pieces
+    blocks = walk._blocks
+    open_blocks: List[list] = []
+    text_types = TEXT_TYPES
+
+    def visit(tag: Tag, in_content: bool, in_tags: bool) -> None:
+        for child in tag.contents:
+            if not isinstance(child, Tag):
+                if (in_content or in_tags) and type(child) in text_types:
+                    pieces.append(child)
+                continue
+
+            name = child.name
+            child_in_content = in_content
+            child_in_tags = in_tags
+
+            if not walk.found and name == 'div' and child.get('id') == 'page-content':
+                walk.found = True
+                visit(child, True, in_tags)
+                continue
+            if walk.tag_texts is None and name == 'div' and 'page-tags' in (child.get('class') or ()):
+                walk.tag_texts = []
+                child_in_tags = True
+
+            if not (child_in_content or child_in_tags):
+                visit(child, False, False)
+                continue
+
+            start = len(pieces)
+            block = None
+            owners = None
+            if child_in_content:
+                if name in BLOCK_TAGS:
+                    block = [start, start, None, None]
+                    blocks.append(block)
+                    open_blocks.append(block)
+                elif name == 'strong':
+                    # 首个 strong 后代：归属于所有尚未拥有 strong 的打开块（即栈顶连续的一段）
+                    owners = []
+                    for pending in reversed(open_blocks):
+                        if pending[2] is not None:
+                            break
+                        pending[2] = start
+                        owners.append(pending)
+                elif name == 'img':
+                    walk.images.append(child.attrs)
+
+            visit(child, child_in_content, child_in_tags)
+            end = len(pieces)
+
+            if block is not None:
+                block[1] = end
+                open_blocks.pop()
+            if owners:
+                for pending in owners:
+                    pending[3] = end
+            if name == 'a':
+                if child_in_tags:
+                    walk.tag_texts.append(''.join(pieces[start:end]))
+                if child_in_content:
+                    href = child.get('href')
+                    if href:
+                        walk.links.append(href)
+                        if '/tag/' in href:
+                            walk.content_tag_texts.append(''.join(pieces[start:end]))
+
+    visit(soup, False, False)
+    return walk
+
+
+def _collapse_whitespace(text: str) -> str:
+    """BeautifulSoup 对纯空白文本片段的处理"""
+    if text.strip(ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def walk_lxml(root) -> PageWalk:
+    """遍历 lxml 元素树一次，产出与 walk_page 相同的结果
+
+    lxml 把文本存放在 element.text（首个子元素之前）与 child.tail（子元素之后）中；
+    注释与处理指令的 tag 不是字符串，其自身文本跳过，但 tail 仍属于父元素。
+    """
+    walk = PageWalk()
+    pieces = walk._pieces
+    blocks = walk._blocks
+    open_blocks: List[list] = []
+
+    def add_text(text: str, preserve: bool) -> None:
+        pieces.append(text if preserve else _collapse_whitespace(text))
+
+    def visit(el, in_content: bool, in_tags: bool, skip_text: bool, preserve: bool) -> None:
+        collecting = (in_content or in_tags) and not skip_text
+        if collecting and el.text:
+            add_text(el.text, preserve)
+
+        for child in el:
+            name = child.tag
+            if not isinstance(name, str):
+                if collecting and child.tail:
+                    add_text(child.tail, preserve)
+                continue
+
+            child_in_content = in_content
+            child_in_tags = in_tags
+            child_skip = skip_text or name in NON_TEXT_TAGS
+            child_preserve = preserve or name in PRESERVE_WHITESPACE_TAGS
+
+            if not walk.found and name == 'div' and child.get('id') == 'page-content':
+                walk.found = True
+                visit(child, True, in_tags, child_skip, child_preserve)
+                if collecting and child.tail:
+                    add_text(child.tail, preserve)
+                continue
+            if walk.tag_texts is None and name == 'div' and 'page-tags' in (child.get('class') or '').split():
+                walk.tag_texts = []
+                child_in_tags = True
+
+            if not (child_in_content or child_in_tags):
+                visit(child, False, False, child_skip, child_preserve)
+                continue
+
+            start = len(pieces)
+            block = None
+            owners = None
+            if child_in_content:
+                if name in BLOCK_TAGS:
+                    block = [start, start, None, None]
+                    blocks.append(block)
+                    open_blocks.append(block)
+                elif name == 'strong':
+                    owners = []
+                    for pending in reversed(open_blocks):
+                        if pending[2] is not None:
+                            break
+                        pending[2] = start
+                        owners.append(pending)
+                elif name == 'img':
+                    walk.images.append(dict(child.attrib))
+
+            visit(child, child_in_content, child_in_tags, child_skip, child_preserve)
+            end = len(pieces)
+
+            if block is not None:
+                block[1] = end
+                open_blocks.pop()
+            if owners:
+                for pending in owners:
+                    pending[3] = end
+            if name == 'a':
+                if child_in_tags:
+                    walk.tag_texts.append(''.join(pieces[start:end]))
+                if child_in_content:
+                    href = child.get('href')
+                    if href:
+                        walk.links.append(href)
+                        if '/tag/' in href:
+                            walk.content_tag_texts.append(''.join(pieces[start:end]))
+
+            if collecting and child.tail:
+                add_text(child.tail, preserve)
+
+    visit(root, False, False, False, False)
+    return walk
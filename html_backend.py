@@ -0,0 +1,112 @@
+"""
+SCP HTML 解析后端模块 - 把页面 HTML 解析为 dom_walk.PageWalk 的可替换实现
+
+提取只需要 div#page-content 与 div.page-tags，而 Wikidot 页面还包含侧栏、页眉、页脚等大量无关结构。
+可选后端：
+    bs4       完整构建 BeautifulSoup 树后遍历（原有行为）
+    strainer  BeautifulSoup + SoupStrainer，只为两个目标容器及其后代创建节点
+    lxml      直接用 lxml 构建元素树并遍历，不创建任何 BeautifulSoup 对象
+
+所有后端产出相同的 PageWalk，提取结果一致。
+"""
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import UnicodeDammit
+
+from dom_walk import PageWalk, walk_lxml, walk_page
+
+# 优先使用 lxml，加速解析；不可用则回退
+try:
+    from lxml import etree
+    BS_PARSER = 'lxml'
+except Exception:
+    etree = None
+    BS_PARSER = 'html.parser'
+
+
+def _is_target(name, attrs) -> bool:
+    """是否为需要保留的容器：div#page-content 或 div.page-tags"""
+    if name != 'div' or not attrs:
+        return False
+    if attrs.get('id') == 'page-content':
+        return True
+    classes = attrs.get('class') or ''
+    if isinstance(classes, str):
+        classes = classes.split()
+    return 'page-tags' in classes
+
+
+class PageStrainer(SoupStrainer):
+    """只保留目标容器（及其全部后代）的 SoupStrainer
+
+    bs4 4.13 起通过 allow_tag_creation 判断是否创建顶层节点；
+    更早的版本以 (name, attrs) 调用传入的 name 函数。
+    """
+
+    def __init__(self):
+        super().__init__(_is_target)
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return _is_target(name, attrs)
+
+
+PAGE_STRAINER = PageStrainer()
+
+
+def parse_bs4(content) -> PageWalk:
+    """完整构建 BeautifulSoup 树"""
+    return walk_page(BeautifulSoup(content, BS_PARSER))
+
+
+def parse_strainer(content) -> PageWalk:
+    """只为目标容器构建 BeautifulSoup 树"""
+    return walk_page(BeautifulSoup(content, BS_PARSER, parse_only=PAGE_STRAINER))
+
+
+def parse_lxml(content) -> PageWalk:
+    """直接用 lxml 解析
+
+    字节内容先按 BeautifulSoup 相同的规则（BOM、meta 声明、UTF-8、windows-1252）确定编码，
+    保证非 UTF-8 页面的解码结果与其他后端一致。
+    """
+    if isinstance(content, bytes):
+        content = UnicodeDammit(content, is_html=True).unicode_markup
+    if not content or not content.strip():
+        return PageWalk()
+    try:
+        root = etree.fromstring(content, etree.HTMLParser())
+    except ValueError:
+        # 带编码声明的 XML 头不能以 str 形式交给 lxml
+        root = etree.fromstring(content.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
+    if root is None:
+        return PageWalk()
+    return walk_lxml(root)
+
+
+BACKENDS: Dict[str, Callable[[object], PageWalk]] = {
+    'bs4': parse_bs4,
+    'strainer': parse_strainer,
+    'lxml': parse_lxml,
+}
+
+# lxml 可用时直接使用 lxml 后端，否则只为目标容器建树
+DEFAULT_BACKEND = 'lxml' if etree is not None else 'strainer'
+
+
+def available_backends() -> List[str]:
+    """当前环境可用的后端名称"""
+    return [name for name in BACKENDS if name != 'lxml' or etree is not None]
+
+
+def get_backend(name: str) -> Callable[[object], PageWalk]:
+    """按名称取得解析函数
+
+    Raises:
+        ValueError: 名称未知或所需依赖未安装
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"未知的 HTML 解析后端: {name}（可选: {', '.join(BACKENDS)}）")
+    if name not in available_backends():
+        raise ValueError(f"HTML 解析后端 {name} 不可用：未安装 lxml")
+    return BACKENDS[name]
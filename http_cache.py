@@ -0,0 +1,148 @@
+"""
+SCP HTTP 响应缓存模块 - 持久化到本地 SQLite，支持条件请求重验证与离线模式
+
+用法：将 CachingAdapter 挂载到 requests.Session 上，session.get 的调用方无需改动。
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+# 缓存成功响应与重定向（离线模式需要重放 http→https 等跳转）
+CACHEABLE_STATUS = (200, 301, 302, 303, 307, 308)
+
+
+class ResponseCache:
+    """基于 SQLite 的响应缓存，正文以 zlib 压缩存储
+
+    任何实现 get/put/touch 三个方法的对象都可以替换本类传给 CachingAdapter。
+    """
+
+    def __init__(self, path: str = 'http_cache.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，未命中返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, etag, last_modified, fetched_at FROM responses WHERE url = ?',
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, etag, last_modified, fetched_at = row
+        return {
+            'url': url,
+            'status': status,
+            'headers': json.loads(headers),
+            'body': zlib.decompress(body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """写入或覆盖缓存条目"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(dict(headers)), zlib.compress(body),
+                 headers.get('ETag'), headers.get('Last-Modified'), time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """重验证成功（304）后刷新获取时间"""
+        with self._lock:
+            self._conn.execute('UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """带持久化缓存的 HTTPAdapter
+
+    - 已缓存的 GET 请求会附带 If-None-Match / If-Modified-Since，收到 304 时复用缓存正文
+    - max_age 秒内的缓存直接命中，不发请求
+    - offline=True 时完全不访问网络，缓存未命中抛出 requests.ConnectionError
+    """
+
+    def __init__(self, cache, offline: bool = False, max_age: float = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.offline = offline
+        self.max_age = max_age
+
+    def _build_from_cache(self, request, entry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = HTTPStatus(entry['status']).phrase
+        response.from_cache = True
+        return response
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+
+        if self.offline:
+            if entry is None:
+                raise requests.ConnectionError(f"离线模式下缓存未命中: {request.url}", request=request)
+            return self._build_from_cache(request, entry)
+
+        if entry is not None:
+            if self.max_age and time.time() - entry['fetched_at'] < self.max_age:
+                return self._build_from_cache(request, entry)
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(request.url)
+            response.close()
+            return self._build_from_cache(request, entry)
+
+        if response.status_code in CACHEABLE_STATUS:
+            self.cache.put(request.url, response.status_code, response.headers, response.content)
+        response.from_cache = False
+        return response
@@ -0,0 +1,198 @@
+"""
+SCP 图片镜像模块 - 并发下载记录中的图片，按内容哈希存储
+
+extract_images_from_soup/analyze_images 只收集图片 URL。这里把数据库中全部记录的 images
+去重后交给线程池，经连接池并发下载，分块流式写入临时文件并同时计算 SHA-256：
+    - 文件按内容哈希存放（<目录>/ab/abcdef...），不同 SCP 共用的图片只保存一份
+    - URL→哈希的清单持久化在 <目录>/manifest.json，重跑时已完成的 URL 直接跳过
+    - 每条记录写回 image_hashes: {URL: 哈希}
+内存占用只取决于分块大小与线程数，与图片大小无关。
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import temp_scraper
+from metrics import metrics
+from throttle import ThrottledAdapter
+from temp_scraper import get_retry_strategy, get_session, vprint
+
+CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = 30
+
+
+class ImageStore:
+    """按内容哈希存放图片的目录，附带 URL→哈希清单（线程安全）"""
+
+    def __init__(self, root: str, save_every: int = 50):
+        """
+        Args:
+            root: 存储目录，不存在时创建
+            save_every: 每完成多少个下载保存一次清单，中断后已下载的文件不必重下
+        """
+        self.root = root
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        self.save_every = save_every
+        self._urls: Dict[str, str] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        # 上次中断留下的半截下载
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._urls = json.load(f)
+
+    def path_for(self, digest: str) -> str:
+        """哈希对应的文件路径"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """已下载且文件仍在时返回哈希"""
+        with self._lock:
+            digest = self._urls.get(url)
+        if digest is not None and os.path.exists(self.path_for(digest)):
+            return digest
+        return None
+
+    def put(self, url: str, chunks: Iterable[bytes]) -> str:
+        """把分块内容写入存储并登记 URL，返回内容哈希"""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+            path = self.path_for(digest)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                metrics.inc('images_deduplicated_total')
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                metrics.inc('image_bytes_total', size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._urls[url] = digest
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save_locked()
+        return digest
+
+    def _save_locked(self) -> None:
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._urls, f, ensure_ascii=False, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        self._unsaved = 0
+
+    def save(self) -> None:
+        """原子写入清单文件"""
+        with self._lock:
+            self._save_locked()
+
+
+def image_session(pool_size: int) -> requests.Session:
+    """图片下载专用 session：连接池与线程数匹配，不经过页面响应缓存
+
+    已启用节流（--throttle、--global-rate）时与页面请求共用同一个节流器，图片下载同样计入站点速率。
+    """
+    http = requests.Session()
+    http.headers.update(get_session().headers)
+    kwargs = dict(pool_connections=pool_size, pool_maxsize=pool_size)
+    if temp_scraper.throttle is not None:
+        adapter = ThrottledAdapter(throttle=temp_scraper.throttle, max_retries=temp_scraper.throttled_retry_strategy(),
+                                   **kwargs)
+    else:
+        adapter = HTTPAdapter(max_retries=get_retry_strategy(), **kwargs)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    return http
+
+
+def download_image(http: requests.Session, store: ImageStore, url: str) -> str:
+    """流式下载一张图片到存储，返回内容哈希"""
+    with http.get(url, stream=True, timeout=REQUEST_TIMEOUT) as resp:
+        resp.raise_for_status()
+        digest = store.put(url, resp.iter_content(CHUNK_SIZE))
+    metrics.inc('images_downloaded_total')
+    return digest
+
+
+def mirror_images(db: Dict[str, Dict], root: str, workers: int = 8) -> Dict[str, int]:
+    """镜像数据库中全部图片，并把 URL→哈希写回各记录的 image_hashes
+
+    Args:
+        db: 编号→记录的数据库字典（就地修改）
+        root: 图片存储目录
+        workers: 下载线程数（同时也是连接池大小）
+
+    Returns:
+        计数，如 {'urls': 120, 'downloaded': 30, 'skipped': 88, 'failed': 2}
+    """
+    store = ImageStore(root)
+    urls = list(dict.fromkeys(url for record in db.values() for url in record.get('images', ())))
+    summary = {'urls': len(urls), 'downloaded': 0, 'skipped': 0, 'failed': 0}
+
+    hashes: Dict[str, str] = {}
+    to_fetch = []
+    for url in urls:
+        digest = store.lookup(url)
+        if digest is not None:
+            hashes[url] = digest
+        else:
+            to_fetch.append(url)
+    summary['skipped'] = len(hashes)
+
+    if to_fetch:
+        vprint(f"下载 {len(to_fetch)} 张图片（跳过已完成的 {len(hashes)} 张）")
+        http = image_session(workers)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                future_to_url = {executor.submit(download_image, http, store, url): url for url in to_fetch}
+                for future in concurrent.futures.as_completed(future_to_url):
+                    url = future_to_url[future]
+                    try:
+                        hashes[url] = future.result()
+                        summary['downloaded'] += 1
+                    except (requests.RequestException, OSError) as e:
+                        summary['failed'] += 1
+                        vprint(f"图片下载失败 {url}: {e}")
+        finally:
+            http.close()
+            store.save()
+
+    for record in db.values():
+        images = record.get('images')
+        if images:
+            record['image_hashes'] = {url: hashes[url] for url in images if url in hashes}
+    return summary
+
+
+def mirror_database(db_path: str, root: str, workers: int = 8) -> Dict[str, int]:
+    """镜像 JSON 数据库文件中的图片，并把 image_hashes 写回该文件"""
+    with open(db_path, 'r', encoding='utf-8') as f:
+        db = json.load(f)
+    summary = mirror_images(db, root, workers)
+    tmp_path = db_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(db, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, db_path)
+    return summary
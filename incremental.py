@@ -0,0 +1,199 @@
+"""
+SCP 增量爬取模块 - 基于清单（manifest）与站点最近修改列表，只重新抓取有变化的条目
+
+清单记录每个编号的最近获取时间、页面内容哈希与状态：
+- ok: 抓取并解析成功
+- failed: 上次抓取失败，下次会重试
+- missing: 页面不存在（404），仅当最近修改列表或系列页显示其已创建时才重新抓取
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import requests
+
+from temp_scraper import (
+    fetch_scp_page,
+    get_recent_changes_url,
+    get_scp_name_from_series,
+    get_session,
+    parse_scp_page,
+    series_index,
+    vprint,
+)
+
+
+RE_CHANGED_PAGE = re.compile(r'/scp-(\d+)$', re.IGNORECASE)
+RE_CHANGED_HREF = re.compile(r'/scp-(\d+)(?=["\'<\s#?]|$)', re.IGNORECASE)
+
+
+class Manifest:
+    """线程安全的抓取清单，以 JSON 文件持久化"""
+
+    def __init__(self, path: str = 'scp_manifest.json'):
+        self.path = path
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = {int(k): v for k, v in json.load(f).items()}
+
+    def get(self, scp_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(scp_id)
+
+    def record(self, scp_id: int, status: str, content_hash: Optional[str] = None,
+               error: Optional[str] = None) -> None:
+        """记录一次抓取结果；哈希缺失时保留上一次的值"""
+        with self._lock:
+            entry = self._entries.get(scp_id, {})
+            entry = {
+                'status': status,
+                'fetched_at': time.time(),
+                'hash': content_hash or entry.get('hash'),
+            }
+            if error:
+                entry['error'] = error
+            self._entries[scp_id] = entry
+
+    def save(self) -> None:
+        """原子写入清单文件"""
+        with self._lock:
+            data = {str(k): v for k, v in sorted(self._entries.items())}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
+
+
+def parse_recent_changes(content: bytes) -> Set[int]:
+    """从最近修改 RSS 中提取被修改的 SCP 编号"""
+    changed = set()
+    try:
+        root = ET.fromstring(content)
+        for element in root.iter():
+            if element.tag.rsplit('}', 1)[-1] in ('link', 'guid') and element.text:
+                match = RE_CHANGED_PAGE.search(element.text.strip())
+                if match:
+                    changed.add(int(match.group(1)))
+    except ET.ParseError:
+        # 非 XML（如 HTML 版最近修改页）时回退到按链接搜索
+        text = content.decode('utf-8', errors='replace')
+        changed.update(int(m) for m in RE_CHANGED_HREF.findall(text))
+    return changed
+
+
+def fetch_recent_changes(url: Optional[str] = None) -> Set[int]:
+    """下载并解析站点最近修改列表，失败时返回空集合"""
+    url = url or get_recent_changes_url()
+    try:
+        resp = get_session().get(url, timeout=10)
+        resp.raise_for_status()
+        return parse_recent_changes(resp.content)
+    except requests.RequestException as e:
+        vprint(f"获取最近修改失败 {url}: {e}")
+        return set()
+
+
+def plan_ids(ids: Iterable[int], manifest: Manifest, changed: Set[int]) -> List[int]:
+    """挑选需要重新抓取的编号：新编号、上次失败、最近修改过、或新创建的缺失页"""
+    planned = []
+    for scp_id in ids:
+        entry = manifest.get(scp_id)
+        if entry is None or entry['status'] == 'failed' or scp_id in changed:
+            planned.append(scp_id)
+        elif entry['status'] == 'missing' and series_index.exists(scp_id):
+            planned.append(scp_id)
+    return planned
+
+
+def refresh_one(scp_id: int, previous: Optional[Dict[str, Any]], have_record: bool) -> Dict[str, Any]:
+    """抓取单个编号，内容哈希未变且已有记录时跳过解析
+
+    Returns:
+        {'status': ok/unchanged/failed/missing, 'data': 记录, 'hash': 哈希, 'error': 错误}
+    """
+    scp_name = get_scp_name_from_series(scp_id)
+    try:
+        content, final_url = fetch_scp_page(scp_id)
+    except requests.HTTPError as e:
+        status = 'missing' if e.response is not None and e.response.status_code == 404 else 'failed'
+        return {'status': status, 'error': f'请求失败: {str(e)}'}
+    except requests.RequestException as e:
+        return {'status': 'failed', 'error': f'请求失败: {str(e)}'}
+
+    content_hash = hashlib.sha1(content).hexdigest()
+    if (have_record and previous and previous.get('status') == 'ok'
+            and previous.get('hash') == content_hash):
+        return {'status': 'unchanged', 'hash': content_hash}
+
+    data = parse_scp_page(scp_id, content, final_url, scp_name)
+    if 'error' in data:
+        return {'status': 'failed', 'hash': content_hash, 'error': data['error']}
+    return {'status': 'ok', 'data': data, 'hash': content_hash}
+
+
+def load_database(db_path: str) -> Dict[str, Dict]:
+    if not os.path.exists(db_path):
+        return {}
+    with open(db_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def crawl_incremental(ids: Iterable[int], db_path: str = 'scp_database_cn.json',
+                      manifest_path: str = 'scp_manifest.json', recent_changes_url: Optional[str] = None,
+                      max_workers: int = 8) -> Dict[str, int]:
+    """增量爬取并把结果合并进已有数据库
+
+    Args:
+        ids: 关注的编号范围
+        db_path: 数据库 JSON 文件，不存在时新建
+        manifest_path: 清单文件
+        recent_changes_url: 最近修改列表 URL，默认为站点 RSS
+        max_workers: 下载线程数
+
+    Returns:
+        各状态计数，如 {'planned': 12, 'ok': 3, 'unchanged': 8, 'failed': 1, 'missing': 0}
+    """
+    manifest = Manifest(manifest_path)
+    db = load_database(db_path)
+
+    changed = fetch_recent_changes(recent_changes_url)
+    vprint(f"最近修改涉及 {len(changed)} 个编号")
+
+    planned = plan_ids(ids, manifest, changed)
+    summary = {'planned': len(planned), 'ok': 0, 'unchanged': 0, 'failed': 0, 'missing': 0}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_id = {
+            executor.submit(refresh_one, i, manifest.get(i), str(i) in db): i for i in planned
+        }
+        for i, future in enumerate(concurrent.futures.as_completed(future_to_id), 1):
+            scp_id = future_to_id[future]
+            try:
+                outcome = future.result()
+            except Exception as exc:
+                outcome = {'status': 'failed', 'error': str(exc)}
+
+            status = outcome['status']
+            summary[status] += 1
+            manifest.record(scp_id, status, outcome.get('hash'), outcome.get('error'))
+
+            if status == 'ok':
+                db[str(scp_id)] = outcome['data']
+            elif status == 'missing':
+                # 页面已被删除
+                db.pop(str(scp_id), None)
+            print(f"({i}/{len(planned)}) {status}: SCP-{scp_id:03d}")
+
+    with open(db_path, 'w', encoding='utf-8') as f:
+        json.dump(db, f, ensure_ascii=False, indent=4)
+    manifest.save()
+
+    return summary
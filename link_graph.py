@@ -0,0 +1,367 @@
+"""
+SCP 链接图模块 - 记录页面间的引用关系，并以抓取前沿（frontier）扩展到非编号页面
+
+解析时 page_links 把 div#page-content 中的站内链接规范化为页面名（如 scp-173、scp-cn-001、
+scp-001-j、某篇故事或中心页），写入记录的 links 字段。LinkGraph 由数据库中各记录的 links
+组成邻接表，可保存为 JSON 并按出链、入链查询。
+
+crawl_frontier 从已有记录的出链（或指定的种子页面）出发，按优先级抓取尚未收录的页面：
+编号条目 > -CN- 条目 > -J/-EX 条目 > 其他页面（故事、中心页等），同级按链接深度先浅后深。
+每个页面名只进入前沿一次（集合判重），新页面的出链再加入前沿，直到达到页面数或深度上限。
+编号条目以编号为键（与正常爬取一致），其余页面以页面名为键。
+
+用法：
+    python link_graph.py build scp_database_cn.json --graph scp_link_graph.json
+    python link_graph.py crawl --database scp_database_cn.json --max-pages 500 --max-depth 2
+    python link_graph.py query --graph scp_link_graph.json in scp-173
+"""
+import argparse
+import concurrent.futures
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+# 编号条目页（与 harmonize_id 的格式一致：至少三位数字）
+RE_NUMBERED = re.compile(r'^scp-(\d{3,})$')
+RE_CN = re.compile(r'^scp-cn-\d{3,}(?:-j|-ex)?$')
+RE_VARIANT = re.compile(r'^scp-\d{3,}-(?:j|ex)$')
+# Wikidot 页面名：小写字母、数字与连字符（带冒号的分类页如 system:、forum:、nav: 不收录）
+RE_PAGE_NAME = re.compile(r'^[a-z0-9][a-z0-9\-_]*$')
+
+# 前沿优先级（数值小的先抓）
+KIND_PRIORITY = {'scp': 0, 'scp-cn': 1, 'scp-variant': 2, 'page': 3}
+
+
+def page_name(href: str, page_url: str) -> Optional[str]:
+    """把链接规范化为同站页面名；站外链接、锚点、文件与分类页返回 None"""
+    if not href or href.startswith(('#', 'javascript:', 'mailto:')):
+        return None
+    full = urlsplit(urljoin(page_url, href))
+    if full.scheme not in ('http', 'https') or full.netloc.lower() != urlsplit(page_url).netloc.lower():
+        return None
+    # /scp-173/offset/2 之类的页面参数不属于页面名
+    name = unquote(full.path).strip('/').split('/', 1)[0].lower()
+    if not RE_PAGE_NAME.match(name) or name.startswith('local--'):
+        return None
+    return name
+
+
+def page_links(hrefs: Iterable[str], page_url: str) -> List[str]:
+    """页面主体中的站内链接目标（去重、保持顺序、不含页面自身）"""
+    own = page_name(page_url, page_url)
+    links, seen = [], set()
+    for href in hrefs:
+        name = page_name(href, page_url)
+        if name is not None and name != own and name not in seen:
+            seen.add(name)
+            links.append(name)
+    return links
+
+
+def page_kind(name: str) -> str:
+    """页面类别：scp（编号条目）、scp-cn、scp-variant（-J/-EX）或 page"""
+    if numbered_id(name) is not None:
+        return 'scp'
+    if RE_CN.match(name):
+        return 'scp-cn'
+    if RE_VARIANT.match(name):
+        return 'scp-variant'
+    return 'page'
+
+
+def numbered_id(name: str) -> Optional[int]:
+    """编号条目页的编号；scp-0173 这类非规范写法不算"""
+    match = RE_NUMBERED.match(name)
+    if match is None:
+        return None
+    scp_id = int(match.group(1))
+    return scp_id if str(scp_id).zfill(3) == match.group(1) else None
+
+
+def record_key(name: str) -> str:
+    """页面在数据库中的键：编号条目为编号，其余为页面名"""
+    scp_id = numbered_id(name)
+    return str(scp_id) if scp_id is not None else name
+
+
+def key_to_page(key: str) -> str:
+    """record_key 的逆映射"""
+    return f"scp-{key.zfill(3)}" if key.isdigit() else key
+
+
+class LinkGraph:
+    """页面引用关系的邻接表（线程安全）"""
+
+    def __init__(self):
+        self._out: Dict[str, List[str]] = {}
+        self._in: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add(self, source: str, targets: Iterable[str]) -> None:
+        """设置页面的出链（覆盖之前的记录）"""
+        targets = list(targets)
+        with self._lock:
+            for old in self._out.get(source, ()):
+                self._in[old].discard(source)
+            self._out[source] = targets
+            for target in targets:
+                self._in[target].add(source)
+
+    def links_from(self, name: str) -> List[str]:
+        return list(self._out.get(name, ()))
+
+    def links_to(self, name: str) -> List[str]:
+        return sorted(self._in.get(name, ()))
+
+    def most_linked(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """入链最多的页面"""
+        with self._lock:
+            counts = [(name, len(sources)) for name, sources in self._in.items() if sources]
+        return sorted(counts, key=lambda item: (-item[1], item[0]))[:limit]
+
+    def nodes(self) -> Set[str]:
+        with self._lock:
+            return set(self._out) | {name for name, sources in self._in.items() if sources}
+
+    def edge_count(self) -> int:
+        with self._lock:
+            return sum(len(targets) for targets in self._out.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._out
+
+    def __len__(self) -> int:
+        return len(self._out)
+
+    def save(self, path: str) -> None:
+        """原子写入邻接表 JSON：{页面名: [出链页面名, ...]}"""
+        with self._lock:
+            data = dict(sorted(self._out.items()))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LinkGraph':
+        graph = cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            for source, targets in json.load(f).items():
+                graph.add(source, targets)
+        return graph
+
+    @classmethod
+    def from_database(cls, db: Dict[str, Dict]) -> 'LinkGraph':
+        """由数据库各记录的 links 字段构建"""
+        graph = cls()
+        for key, record in db.items():
+            graph.add(key_to_page(key), record.get('links') or ())
+        return graph
+
+
+class Frontier:
+    """带优先级与判重的抓取前沿（线程安全）
+
+    每个页面名只能加入一次；mark_seen 可预先登记已收录的页面。
+    """
+
+    def __init__(self, max_depth: Optional[int] = None, kinds: Optional[Iterable[str]] = None):
+        """
+        Args:
+            max_depth: 距种子的最大链接深度，None 表示不限
+            kinds: 只抓取这些类别的页面（见 page_kind），None 表示全部
+        """
+        self.max_depth = max_depth
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self._heap: List[Tuple[int, int, int, str]] = []
+        self._seen: Set[str] = set()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_seen(self, names: Iterable[str]) -> None:
+        with self._lock:
+            self._seen.update(names)
+
+    def add(self, name: str, depth: int = 0) -> bool:
+        """加入前沿；已见过、超出深度或类别不符时返回 False"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        kind = page_kind(name)
+        if self.kinds is not None and kind not in self.kinds:
+            return False
+        with self._lock:
+            if name in self._seen:
+                return False
+            self._seen.add(name)
+            heapq.heappush(self._heap, (KIND_PRIORITY[kind], depth, next(self._seq), name))
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """取出优先级最高的 (页面名, 深度)，前沿为空时返回 None"""
+        with self._lock:
+            if not self._heap:
+                return None
+            _, depth, _, name = heapq.heappop(self._heap)
+            return name, depth
+
+    def seen_count(self) -> int:
+        return len(self._seen)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def _scrape(name: str) -> Dict[str, Any]:
+    from temp_scraper import scrape_page, scrape_scp
+    scp_id = numbered_id(name)
+    return scrape_scp(scp_id) if scp_id is not None else scrape_page(name)
+
+
+def crawl_frontier(seeds: Iterable[str], known: Iterable[str] = (), max_pages: int = 1000,
+                   max_workers: int = 8, max_depth: Optional[int] = None, kinds: Optional[Iterable[str]] = None,
+                   sink=None, graph: Optional[LinkGraph] = None) -> Tuple[Dict, List[str], LinkGraph]:
+    """从种子页面出发按优先级抓取，新页面的出链继续加入前沿
+
+    Args:
+        seeds: 种子页面名（深度 0）
+        known: 已收录的页面名，不会再次抓取
+        max_pages: 最多抓取多少个页面
+        max_workers: 线程数
+        max_depth: 最大链接深度
+        kinds: 只抓取这些类别的页面
+        sink: 结果容器，支持 sink[key] = record，默认为内存字典
+        graph: 要补充的链接图，默认新建
+
+    Returns:
+        (db, 失败的页面名, 链接图)
+    """
+    from temp_scraper import series_index
+    from metrics import metrics
+
+    db = {} if sink is None else sink
+    graph = graph if graph is not None else LinkGraph()
+    frontier = Frontier(max_depth, kinds)
+    frontier.mark_seen(known)
+    for name in seeds:
+        frontier.add(name, 0)
+
+    failed: List[str] = []
+    done = 0
+    series_index.warm()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: Dict[concurrent.futures.Future, Tuple[str, int]] = {}
+        submitted = 0
+        while True:
+            # 在途任务保持在线程数的两倍以内，前沿的优先级才能对后发现的页面生效
+            while submitted < max_pages and len(running) < max_workers * 2:
+                item = frontier.pop()
+                if item is None:
+                    break
+                running[executor.submit(_scrape, item[0])] = item
+                submitted += 1
+            if not running:
+                break
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                name, depth = running.pop(future)
+                done += 1
+                try:
+                    record = future.result()
+                except Exception as exc:
+                    record = {'error': str(exc)}
+                if record and 'error' not in record:
+                    db[record_key(name)] = record
+                    links = record.get('links') or ()
+                    graph.add(name, links)
+                    for link in links:
+                        frontier.add(link, depth + 1)
+                    metrics.inc('pages_total', labels={'result': 'ok'})
+                    print(f"({done}/{submitted}，待抓 {len(frontier)}) 成功: {name}")
+                else:
+                    failed.append(name)
+                    metrics.inc('pages_total', labels={'result': 'failed'})
+                    print(f"({done}/{submitted}，待抓 {len(frontier)}) 失败: {name} - {record.get('error', '未知错误')}")
+    return db, failed, graph
+
+
+def build_graph(db_path: str, graph_path: str) -> LinkGraph:
+    """由 JSON 数据库构建链接图并保存"""
+    with open(db_path, 'r', encoding='utf-8') as f:
+        graph = LinkGraph.from_database(json.load(f))
+    graph.save(graph_path)
+    return graph
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="由数据库的 links 字段构建链接图")
+    build.add_argument('database')
+    build.add_argument('--graph', default='scp_link_graph.json', help="邻接表输出文件")
+    crawl = commands.add_parser('crawl', help="抓取已有记录链接到、但尚未收录的页面")
+    crawl.add_argument('--database', default='scp_database_cn.json', help="已有数据库（不存在时只从种子开始）")
+    crawl.add_argument('--seed', action='append', default=[], help="额外的种子页面名（可重复）")
+    crawl.add_argument('--output', default=None, help="合并后的数据库输出文件（默认覆盖 --database）")
+    crawl.add_argument('--graph', default='scp_link_graph.json', help="邻接表输出文件")
+    crawl.add_argument('--max-pages', type=int, default=1000, help="最多抓取的页面数")
+    crawl.add_argument('--max-depth', type=int, default=None, help="距种子的最大链接深度")
+    crawl.add_argument('--kind', action='append', choices=sorted(KIND_PRIORITY), default=None,
+                       help="只抓取该类别的页面（可重复）")
+    crawl.add_argument('--workers', type=int, default=8, help="线程数")
+    crawl.add_argument('--site', default=None, help="目标站点根地址")
+    query = commands.add_parser('query', help="查询链接图")
+    query.add_argument('--graph', default='scp_link_graph.json')
+    query.add_argument('direction', choices=['out', 'in', 'top'], help="出链、入链或入链最多的页面")
+    query.add_argument('page', nargs='?', default=None, help="页面名（如 scp-173）")
+    query.add_argument('--limit', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.command == 'build':
+        graph = build_graph(args.database, args.graph)
+        print(f"{len(graph)} 个页面，{graph.edge_count()} 条链接，已写入 {args.graph}")
+        return
+
+    if args.command == 'query':
+        graph = LinkGraph.load(args.graph)
+        if args.direction == 'top':
+            for name, count in graph.most_linked(args.limit):
+                print(f"{count:6d}  {name}")
+            return
+        if args.page is None:
+            arg_parser.error("out/in 需要页面名")
+        names = graph.links_from(args.page) if args.direction == 'out' else graph.links_to(args.page)
+        print('\n'.join(names))
+        return
+
+    import temp_scraper
+    from storage import write_json_database
+
+    if args.site:
+        temp_scraper.set_site_url(args.site)
+    db = {}
+    if os.path.exists(args.database):
+        with open(args.database, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+    graph = LinkGraph.from_database(db)
+    known = {key_to_page(key) for key in db}
+    seeds = [name for name in graph.nodes() if name not in known] + args.seed
+    # 排序后加入，同优先级页面的抓取顺序可复现
+    new_db, failed, graph = crawl_frontier(sorted(set(seeds)), known, args.max_pages, args.workers,
+                                           args.max_depth, args.kind, graph=graph)
+    db.update(new_db)
+    write_json_database(db.items(), args.output or args.database)
+    graph.save(args.graph)
+    print(f"新收录 {len(new_db)} 个页面，失败 {len(failed)} 个；链接图 {len(graph)} 个页面，"
+          f"{graph.edge_count()} 条链接")
+    if failed:
+        print(f"失败的页面: {failed}")
+
+
+if __name__ == '__main__':
+    main()
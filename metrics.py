@@ -0,0 +1,339 @@
+"""
+SCP 爬取指标模块 - 分阶段计时、计数器与直方图，支持周期性统计行、JSON 导出与 Prometheus 文本格式
+
+用法：
+    with metrics.page(scp_id):              # 单页上下文，结束时记录总耗时并参与慢页面排行
+        with metrics.stage('fetch'):        # 阶段计时，同时计入当前页面的阶段明细
+            ...
+    metrics.inc('http_bytes_total', len(content))
+
+当前页面保存在 contextvars 中，线程与 asyncio 任务各自独立。
+"""
+import contextlib
+import contextvars
+import heapq
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# 直方图桶上界（秒），与 Prometheus 客户端的默认桶一致
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = 'scp_'
+
+_current_page: contextvars.ContextVar = contextvars.ContextVar('scp_current_page', default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, object]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def _format_labels(key: LabelKey, extra: str = '') -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Histogram:
+    """固定桶直方图（非线程安全，由 Metrics 加锁）"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """按桶线性插值估计分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, upper in enumerate(self.buckets):
+            in_bucket = self.counts[i]
+            if seen + in_bucket >= rank:
+                if not in_bucket:
+                    return upper
+                return min(self.max, lower + (upper - lower) * (rank - seen) / in_bucket)
+            seen += in_bucket
+            lower = upper
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """毫秒为单位的摘要"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 3),
+            'p90_ms': round(self.quantile(0.9) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    """线程安全的指标注册表"""
+
+    def __init__(self, slow_pages: int = 10):
+        """
+        Args:
+            slow_pages: 慢页面排行保留的条数
+        """
+        self.slow_pages = slow_pages
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        # 最小堆保存耗时最长的 N 个页面：(总耗时, 序号, 编号, 阶段明细)
+        self._slowest: List[tuple] = []
+        self._seq = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self._counters.clear()
+            self._histograms.clear()
+            self._slowest.clear()
+
+    # --- 记录 ---
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, object]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, object]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def record_stage(self, stage: str, seconds: float, page: Optional[Dict] = None) -> None:
+        """记录一个阶段的耗时，并累加到页面的阶段明细（默认为当前页面）"""
+        self.observe('stage_seconds', seconds, {'stage': stage})
+        if page is None:
+            page = _current_page.get()
+        if page is not None:
+            stages = page['stages']
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """为代码块计时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    @staticmethod
+    def new_page(scp_id: int) -> Dict:
+        """创建页面记录（跨线程/进程的流水线手动管理其生命周期）"""
+        return {'id': scp_id, 'stages': {}, 'start': time.perf_counter()}
+
+    @staticmethod
+    @contextlib.contextmanager
+    def activate(record: Dict) -> Iterator[Dict]:
+        """在块内把 record 设为当前页面，不结束它"""
+        token = _current_page.set(record)
+        try:
+            yield record
+        finally:
+            _current_page.reset(token)
+
+    @contextlib.contextmanager
+    def page(self, scp_id: int) -> Iterator[Dict]:
+        """单页上下文：块内各阶段计入该页明细，结束时记录页面总耗时"""
+        record = self.new_page(scp_id)
+        try:
+            with self.activate(record):
+                yield record
+        finally:
+            self.finish_page(record)
+
+    def finish_page(self, record: Dict, seconds: Optional[float] = None) -> None:
+        """结束页面：记录总耗时（默认为自 new_page 起的时间）并参与慢页面排行"""
+        if seconds is None:
+            seconds = time.perf_counter() - record['start']
+        self.observe('page_seconds', seconds)
+        with self._lock:
+            self._seq += 1
+            entry = (seconds, self._seq, record['id'], dict(record['stages']))
+            if len(self._slowest) < self.slow_pages:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    # --- 读取 ---
+
+    def counter(self, name: str, labels: Optional[Dict[str, object]] = None) -> float:
+        """单个计数器的值；labels 为 None 时对所有标签求和"""
+        with self._lock:
+            series = self._counters.get(name, {})
+            if labels is None:
+                return sum(series.values())
+            return series.get(_label_key(labels), 0)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, object]] = None) -> Optional[Dict[str, float]]:
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_label_key(labels))
+            return histogram.summary() if histogram is not None else None
+
+    def slowest(self) -> List[Dict]:
+        """耗时最长的页面及其阶段明细（毫秒），按耗时降序"""
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [{
+            'id': scp_id,
+            'total_ms': round(seconds * 1000, 2),
+            'stages_ms': {k: round(v * 1000, 2) for k, v in sorted(stages.items(), key=lambda kv: -kv[1])},
+        } for seconds, _, scp_id, stages in entries]
+
+    def snapshot(self) -> Dict:
+        """全部指标的 JSON 友好表示"""
+        with self._lock:
+            counters = {
+                name: {_format_labels(key) or 'total': value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {_format_labels(key) or 'all': h.summary() for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {
+            'started_at': self.started_at,
+            'elapsed_seconds': round(time.time() - self.started_at, 3),
+            'counters': counters,
+            'histograms': histograms,
+            'slowest_pages': self.slowest(),
+        }
+
+    def dump_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=4)
+
+    def prometheus_text(self) -> str:
+        """Prometheus 文本暴露格式"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = METRIC_PREFIX + name
+                lines.append(f'# TYPE {full} counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f'{full}{_format_labels(key)} {value}')
+            for name, series in sorted(self._histograms.items()):
+                full = METRIC_PREFIX + name
+                lines.append(f'# TYPE {full} histogram')
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for upper, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        le = 'le="%s"' % upper
+                        lines.append(f'{full}_bucket{_format_labels(key, le)} {cumulative}')
+                    inf = _format_labels(key, 'le="+Inf"')
+                    lines.append(f'{full}_bucket{inf} {h.count}')
+                    lines.append(f'{full}_sum{_format_labels(key)} {h.sum}')
+                    lines.append(f'{full}_count{_format_labels(key)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def stats_line(self) -> str:
+        """一行的进度摘要"""
+        elapsed = max(1e-9, time.time() - self.started_at)
+        pages = self.counter('pages_total')
+        parts = [f"{int(pages)} 页 {pages / elapsed:.1f} 页/秒"]
+        for stage in ('fetch', 'html_parse'):
+            h = self.histogram('stage_seconds', {'stage': stage})
+            if h:
+                parts.append(f"{stage} p50 {h['p50_ms']:.0f}ms p90 {h['p90_ms']:.0f}ms")
+        parts.append(f"{self.counter('http_bytes_total') / 1048576:.1f}MB")
+        parts.append(f"429×{int(self.counter('http_responses_total', {'status': 429}))}")
+        parts.append(f"重试×{int(self.counter('http_retries_total'))}")
+        parts.append(f"缓存命中×{int(self.counter('cache_hits_total'))}")
+        parts.append(f"失败×{int(self.counter('pages_total', {'result': 'failed'}))}")
+        return ' | '.join(parts)
+
+
+class StatsReporter:
+    """后台线程，每隔 interval 秒打印一行统计"""
+
+    def __init__(self, metrics: 'Metrics', interval: float = 10.0, extra: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            metrics: 指标注册表
+            interval: 打印间隔（秒）
+            extra: 可选，返回附加在统计行末尾的文字（如限速器当前速率）
+        """
+        self.metrics = metrics
+        self.interval = interval
+        self.extra = extra
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            line = self.metrics.stats_line()
+            if self.extra is not None:
+                line += f" | {self.extra()}"
+            print(f"[stats] {line}", flush=True)
+
+    def start(self) -> 'StatsReporter':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+def serve_prometheus(metrics: 'Metrics', port: int, host: str = '0.0.0.0') -> 'ThreadingHTTPServer':
+    """在后台线程中提供 /metrics（Prometheus 文本格式），返回服务器对象（shutdown() 停止）"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 全局指标注册表，各爬取引擎共用
+metrics = Metrics()
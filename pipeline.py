@@ -0,0 +1,141 @@
+"""
+SCP 两段式爬取流水线 - 下载线程与多进程解析解耦
+
+下载线程只负责获取原始页面字节并放入有界队列；主线程从队列取出页面，
+交给 ProcessPoolExecutor 中的解析进程执行 parse_scp_page。
+解析吞吐随 CPU 核数扩展，队列满时下载线程阻塞，形成背压。
+"""
+import concurrent.futures
+import os
+import queue
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from metrics import metrics
+
+from temp_scraper import (
+    fetch_scp_page,
+    get_item_url,
+    get_scp_name_from_series,
+    init_parse_worker,
+    parse_scp_page,
+    parse_worker_options,
+    report_exception,
+    report_result,
+    series_index,
+    vprint,
+)
+
+
+def _fetch_into_queue(scp_id: int, raw_queue: queue.Queue) -> None:
+    """下载单个页面并放入队列；队列已满时阻塞（背压）
+
+    队列元素为 (编号, 内容, 最终URL, 名称, 错误, 指标页面记录)，错误为 None 表示下载成功。
+    """
+    page = metrics.new_page(scp_id)
+    try:
+        with metrics.activate(page):
+            with metrics.stage('series_lookup'):
+                scp_name = get_scp_name_from_series(scp_id)
+            content, final_url = fetch_scp_page(scp_id)
+        raw_queue.put((scp_id, content, final_url, scp_name, None, page))
+    except requests.RequestException as e:
+        vprint(f"请求失败 {get_item_url(scp_id)}: {str(e)}")
+        raw_queue.put((scp_id, None, None, None, {'error': f'请求失败: {str(e)}'}, page))
+    except Exception as e:
+        raw_queue.put((scp_id, None, None, None, e, page))
+
+
+def _parse_timed(scp_id: int, content: bytes, final_url: str, scp_name: str) -> Tuple[Dict, Dict[str, float]]:
+    """在解析进程中执行 parse_scp_page，并带回各阶段耗时（子进程的指标不会自动回到主进程）"""
+    page = metrics.new_page(scp_id)
+    with metrics.activate(page):
+        record = parse_scp_page(scp_id, content, final_url, scp_name)
+    return record, page['stages']
+
+
+def _finish_page(page: Dict, stages: Optional[Dict[str, float]] = None) -> None:
+    """合并解析进程带回的阶段耗时；总耗时中其余部分记为排队等待（背压）"""
+    for stage, seconds in (stages or {}).items():
+        metrics.record_stage(stage, seconds, page)
+    total = time.perf_counter() - page['start']
+    metrics.record_stage('queue_wait', max(0.0, total - sum(page['stages'].values())), page)
+    metrics.finish_page(page, total)
+
+
+def crawl_pipeline(ids: Iterable[int], fetch_workers: int = 8, parse_workers: Optional[int] = None,
+                   queue_size: int = 64, sink=None, checkpoint=None) -> Tuple[Dict[str, Dict], List[int]]:
+    """下载/解析两段式批量爬取
+
+    Args:
+        ids: 待爬取的编号
+        fetch_workers: 下载线程数
+        parse_workers: 解析进程数，默认为 CPU 数
+        queue_size: 已下载待解析页面的队列上限
+        sink: 结果容器，支持 sink[key] = record，默认为内存字典
+        checkpoint: 检查点，记录已完成与失败的编号
+
+    Returns:
+        (db, failed_ids)
+    """
+    ids = list(ids)
+    total = len(ids)
+    parse_workers = parse_workers or os.cpu_count() or 4
+    # 已提交但未完成的解析任务上限，避免页面在进程池内部无限堆积
+    max_inflight = parse_workers * 2
+
+    db = {} if sink is None else sink
+    failed_ids = []
+    done_count = 0
+    raw_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def collect(futures):
+        nonlocal done_count
+        for future in futures:
+            scp_id, page = pending.pop(future)
+            done_count += 1
+            try:
+                data, stages = future.result()
+            except Exception as exc:
+                _finish_page(page)
+                report_exception(done_count, total, scp_id, exc, failed_ids, checkpoint)
+                continue
+            _finish_page(page, stages)
+            report_result(done_count, total, scp_id, data, db, failed_ids, checkpoint)
+
+    # 预先载入系列索引，解析进程不再需要访问网络
+    with metrics.stage('series_warm'):
+        series_index.warm()
+
+    pending: Dict[concurrent.futures.Future, Tuple[int, Dict]] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=fetch_workers) as fetchers, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers, initializer=init_parse_worker,
+                                                   initargs=parse_worker_options()) as parsers:
+        for scp_id in ids:
+            fetchers.submit(_fetch_into_queue, scp_id, raw_queue)
+
+        for _ in range(total):
+            scp_id, content, final_url, scp_name, error, page = raw_queue.get()
+
+            if error is not None:
+                _finish_page(page)
+                done_count += 1
+                if isinstance(error, dict):
+                    report_result(done_count, total, scp_id, error, db, failed_ids, checkpoint)
+                else:
+                    report_exception(done_count, total, scp_id, error, failed_ids, checkpoint)
+                continue
+
+            # 解析进程全忙时先收取已完成的结果，再继续从队列取页面
+            while len(pending) >= max_inflight:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+
+            future = parsers.submit(_parse_timed, scp_id, content, final_url, scp_name)
+            pending[future] = (scp_id, page)
+
+        collect(list(concurrent.futures.as_completed(pending)))
+
+    return db, failed_ids
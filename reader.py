@@ -0,0 +1,317 @@
+"""
+SCP 数据库随机读取模块 - 为 JSON / JSON Lines 输出建立字节偏移索引，按需解码单条记录
+
+下游服务只需要个别条目时，不必 json.load 整个数据库：
+    - 首次打开时扫描一遍数据文件，生成旁路索引 <数据文件>.offsets（编号 → 字节偏移与长度），
+      之后打开只读取索引；数据文件变化（大小或修改时间不同）时自动重建，
+      JSON Lines 文件只追加时从上次扫描的位置继续（已扫描部分的首尾字节未变时才续扫，否则重建）
+    - 数据文件以内存映射方式打开，只解码被请求的记录，内存占用取决于实际用到的记录
+    - 支持惰性遍历与字段投影（如只取 id、name、class）
+
+JSON Lines 中同一编号出现多次时以最后一次为准（与 compact_jsonl 一致）。
+
+用法：
+    python reader.py get scp_database_cn.json 173 --fields id,name,class
+    python reader.py index scp_database_cn.jsonl
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+INDEX_VERSION = 2
+# JSONL 续扫前校验的已扫描部分：开头与末尾各取这么多字节做指纹
+FINGERPRINT_BYTES = 4096
+
+# JSON 的字符串与结构字符；字符串整体匹配，其中的括号与逗号不会被误认
+RE_JSON_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\],]')
+RE_COLON = re.compile(rb'\s*:\s*')
+# 缩进格式 JSON 的开头：{ 换行后缩进若干空格的第一个键
+RE_INDENTED_HEAD = re.compile(rb'\{\n( +)"')
+# JSONLWriter 写出的行以 {"key": "<编号>" 开头，可不解码整行取得编号
+RE_JSONL_KEY = re.compile(rb'\{"key":\s*"((?:[^"\\]|\\.)*)"')
+
+
+def record_key(key: str) -> str:
+    """命令行输入的编号 → 数据库中的键：数据库的键是不补零的编号（049 → 49），其他键原样返回"""
+    return str(int(key)) if key.isdecimal() else key
+
+
+def prefix_fingerprint(buffer, scanned: int) -> str:
+    """已扫描部分 buffer[:scanned] 的指纹：开头与末尾各 FINGERPRINT_BYTES 字节的哈希"""
+    digest = hashlib.sha1(buffer[:min(scanned, FINGERPRINT_BYTES)])
+    digest.update(buffer[max(0, scanned - FINGERPRINT_BYTES):scanned])
+    return digest.hexdigest()
+
+
+def detect_format(path: str) -> str:
+    """按扩展名判断数据文件格式：.jsonl 为 JSON Lines，其余按 JSON 对象处理"""
+    return 'jsonl' if path.endswith('.jsonl') else 'json'
+
+
+def scan_json(buffer) -> Iterator[Tuple[str, int, int]]:
+    """扫描顶层为对象的 JSON，产出 (键, 值起始偏移, 值长度)，不构造任何记录对象
+
+    缩进格式（json.dump(indent=N) 与 write_json_database 的输出）中，顶层键独占一行且恰好
+    缩进 N 个空格，更深的层级缩进更多、字符串中不会有原始换行，因此只需按行匹配顶层键；
+    其余格式退回逐个字符串与括号的通用扫描。
+    """
+    head = RE_INDENTED_HEAD.match(buffer)
+    if head is None:
+        yield from _scan_json_tokens(buffer)
+        return
+    pad = head.group(1)
+    key_line = re.compile(rb'\n' + pad + rb'("(?:[^"\\]|\\.)*"): ')
+    previous = None
+    for match in key_line.finditer(buffer):
+        if previous is not None:
+            # 上一个值到本行前的逗号为止
+            yield previous[0], previous[1], match.start() - 1 - previous[1]
+        previous = (json.loads(match.group(1)), match.end())
+    if previous is not None:
+        end = buffer.rfind(b'}')
+        while buffer[end - 1:end] in (b'\n', b' ', b'\r', b'\t'):
+            end -= 1
+        yield previous[0], previous[1], end - previous[1]
+
+
+def _scan_json_tokens(buffer, start: int = 0) -> Iterator[Tuple[str, int, int]]:
+    """通用扫描：只对字符串与括号做一次正则扫描，对缩进与否没有要求"""
+    depth = 0
+    key: Optional[str] = None
+    expect_key = False
+    value_start = 0
+    for match in RE_JSON_TOKEN.finditer(buffer, start):
+        token = match.group()
+        first = token[:1]
+        if first == b'"':
+            if depth == 1 and expect_key:
+                key = json.loads(token)
+                colon = RE_COLON.match(buffer, match.end())
+                value_start = colon.end()
+                expect_key = False
+            continue
+        if first in b'{[':
+            depth += 1
+            if depth == 1:
+                expect_key = True
+            continue
+        if first == b',':
+            if depth == 1:
+                if key is not None:
+                    # 标量值：到逗号为止
+                    yield key, value_start, len(buffer[value_start:match.start()].rstrip())
+                    key = None
+                expect_key = True
+            continue
+        # 右括号
+        depth -= 1
+        if depth == 1 and key is not None:
+            yield key, value_start, match.end() - value_start
+            key = None
+        elif depth == 0:
+            if key is not None:
+                yield key, value_start, len(buffer[value_start:match.start()].rstrip())
+            return
+
+
+def scan_jsonl(buffer, start: int = 0) -> Iterator[Tuple[str, int, int]]:
+    """扫描 JSON Lines，产出 (键, 行起始偏移, 行长度)；不完整的末行不产出"""
+    end = len(buffer)
+    offset = start
+    while offset < end:
+        newline = buffer.find(b'\n', offset)
+        if newline < 0:
+            return
+        line = buffer[offset:newline]
+        match = RE_JSONL_KEY.match(line)
+        key = None
+        if match is not None:
+            key = json.loads(b'"' + match.group(1) + b'"')
+        elif line.strip():
+            try:
+                key = str(json.loads(line)['key'])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                key = None
+        if key is not None:
+            yield key, offset, newline - offset
+        offset = newline + 1
+
+
+class RecordReader:
+    """只读的随机访问数据库读取器（内存映射 + 旁路偏移索引）
+
+    多个线程共享一个实例是安全的；数据文件被替换后需重新打开才能读到新内容。
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, fmt: Optional[str] = None):
+        """
+        Args:
+            path: 数据文件（write_json_database / json.dump 写出的 JSON，或 JSONLWriter 写出的 JSONL）
+            index_path: 索引文件路径，默认为 <数据文件>.offsets
+            fmt: 'json' 或 'jsonl'，默认按扩展名判断
+        """
+        self.path = path
+        self.index_path = index_path or path + '.offsets'
+        self.format = fmt or detect_format(path)
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._scanned = 0
+        self._load_or_build(stat)
+
+    def _load_or_build(self, stat: os.stat_result) -> None:
+        index = None
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                index = None
+        if (index is not None and index.get('version') == INDEX_VERSION and index.get('format') == self.format
+                and index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns):
+            self._offsets = {key: (offset, length) for key, offset, length in index['entries']}
+            return
+        start = 0
+        if (index is not None and self.format == 'jsonl' and index.get('version') == INDEX_VERSION
+                and index.get('format') == 'jsonl' and index['scanned'] <= stat.st_size
+                and index['fingerprint'] == prefix_fingerprint(self._map, index['scanned'])):
+            # JSON Lines 只追加：已扫描部分未被改写时沿用已有索引，从上次扫描到的位置继续
+            self._offsets = {key: (offset, length) for key, offset, length in index['entries']}
+            start = index['scanned']
+        self._scan(start)
+        self._save_index(stat)
+
+    def _scan(self, start: int) -> None:
+        if not self._map:
+            return
+        scanned = start
+        if self.format == 'jsonl':
+            for key, offset, length in scan_jsonl(self._map, start):
+                self._offsets[key] = (offset, length)
+                scanned = offset + length + 1
+        else:
+            for key, offset, length in scan_json(self._map):
+                self._offsets[key] = (offset, length)
+            scanned = len(self._map)
+        self._scanned = scanned
+
+    def _save_index(self, stat: os.stat_result) -> None:
+        index = {
+            'version': INDEX_VERSION,
+            'format': self.format,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'scanned': self._scanned,
+            'fingerprint': prefix_fingerprint(self._map, self._scanned),
+            'entries': [[key, offset, length] for key, (offset, length) in self._offsets.items()],
+        }
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # 数据目录只读时索引只保存在内存中
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def raw(self, key: Any) -> Optional[bytes]:
+        """记录的原始 JSON 字节（JSONL 为整行）"""
+        span = self._offsets.get(str(key))
+        if span is None:
+            return None
+        offset, length = span
+        return self._map[offset:offset + length]
+
+    def get(self, key: Any, default: Optional[Dict[str, Any]] = None,
+            fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """按编号读取并解码一条记录
+
+        Args:
+            key: 编号（数据库中的键，整数会转为字符串）
+            default: 不存在时的返回值
+            fields: 只返回这些字段（记录中没有的字段不出现在结果里）
+        """
+        data = self.raw(key)
+        if data is None:
+            return default
+        record = json.loads(data)
+        if self.format == 'jsonl':
+            record = record['record']
+        return project(record, fields)
+
+    def __getitem__(self, key: Any) -> Dict[str, Any]:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key: Any) -> bool:
+        return str(key) in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def keys(self) -> List[str]:
+        """全部编号（按文件中的顺序）"""
+        return list(self._offsets)
+
+    def items(self, fields: Optional[Sequence[str]] = None,
+              keys: Optional[Iterable[Any]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """惰性遍历，逐条解码
+
+        Args:
+            fields: 字段投影
+            keys: 只遍历这些编号（不存在的跳过），默认按文件顺序遍历全部
+        """
+        for key in (self._offsets if keys is None else map(str, keys)):
+            record = self.get(key, fields=fields)
+            if record is not None:
+                yield key, record
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def project(record: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """字段投影；fields 为 None 时原样返回"""
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    get = commands.add_parser('get', help="读取指定编号的记录")
+    get.add_argument('database')
+    get.add_argument('keys', nargs='+')
+    get.add_argument('--fields', default=None, help="逗号分隔的字段列表")
+    index = commands.add_parser('index', help="建立或更新偏移索引")
+    index.add_argument('database')
+    args = arg_parser.parse_args()
+
+    with RecordReader(args.database) as reader:
+        if args.command == 'index':
+            print(f"{len(reader)} 条记录，索引 {reader.index_path}")
+            return
+        fields = args.fields.split(',') if args.fields else None
+        result = {key: reader.get(record_key(key), fields=fields) for key in args.keys}
+    print(json.dumps(result, ensure_ascii=False, indent=4))
+
+
+if __name__ == '__main__':
+    main()
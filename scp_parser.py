@@ -1,8 +1,57 @@
 """
 SCP 解析器模块 - 提供统一的字段提取、映射、去重和标准化功能
 """
+import json
 import re
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from dedup import PARSE_FIELDS, dedupe_record
+from text_normalize import TextNormalizer
+
+
+# 未命中映射时的回退清理
+RE_KEY_FALLBACK = re.compile(r'[^\w\u4e00-\u9fff]')
+
+
+def fold_key(key: str) -> str:
+    """将键名折叠为比较用的形式：只忽略大小写，与旧版逐项比较 pattern.lower() 的匹配范围相同
+
+    首尾空白与末尾冒号由调用方先去除；键名中间的空白与标点仍参与比较（'item #' 不等于 'item'）。
+    """
+    return key.lower()
+
+
+class KeyNormalizer:
+    """预编译的字段名映射表，带逐个原始键名的结果缓存"""
+
+    def __init__(self, mapping: Dict[str, str], cache_size: int = 65536):
+        self.index: Dict[str, str] = {}
+        for pattern, standard_key in mapping.items():
+            # 折叠后冲突时保留先出现的映射
+            self.index.setdefault(fold_key(pattern), standard_key)
+        self.cache_size = cache_size
+        self._cache: Dict[str, str] = {}
+
+    def __call__(self, key: str) -> str:
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._normalize(key)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _normalize(self, key: str) -> str:
+        if not key:
+            return ''
+        # 移除前后空白和标点
+        key = key.strip().rstrip('：:')
+        standard_key = self.index.get(fold_key(key))
+        if standard_key is not None:
+            return standard_key
+        # 如果没有找到映射，返回清理后的原键名
+        return RE_KEY_FALLBACK.sub('_', key).lower()
 
 
 class SCPParser:
@@ -80,64 +129,61 @@ class SCPParser:
         'error', 'warning', 'series', 'name', 'images', 'tags'
     ]
     
-    # 正则表达式
-    RE_REDACT = re.compile(r'\[数据删除\]|\[资料删除\]|\[已编辑\]|\[删除\]|\[REDACTED\]|\[DATA EXPUNGED\]', re.IGNORECASE)
-    RE_WS = re.compile(r'\s+')
-    RE_COLON_PREFIX = re.compile(r'^[：:]\s*')
+    # 默认映射表在首次使用时编译，所有实例共享（含键名缓存）
+    _default_normalizer: Optional[KeyNormalizer] = None
+    # 字段值规范化器，所有实例共享；set_text_normalizer 可切换选项
+    default_text_normalizer = TextNormalizer()
     
-    def __init__(self):
+    def __init__(self, mapping_files: Optional[Iterable[str]] = None,
+                 text_normalizer: Optional[TextNormalizer] = None):
+        """
+        Args:
+            mapping_files: 额外的字段映射 JSON 文件（{"原始字段名": "标准键名"}），
+                用于支持新的语言分部；与 FIELD_MAPPING 合并，文件中的映射优先
+            text_normalizer: 字段值规范化器，默认使用 default_text_normalizer
+        """
+        self.text_normalizer = text_normalizer or SCPParser.default_text_normalizer
         self.stop_indicators = ['«', '‹', '附录', '实验记录', '访谈记录', '事件记录']
+        if mapping_files:
+            mapping = {}
+            for path in mapping_files:
+                mapping.update(self.load_mapping_file(path))
+            mapping.update({k: v for k, v in self.FIELD_MAPPING.items() if k not in mapping})
+            self._normalizer = KeyNormalizer(mapping)
+        else:
+            if SCPParser._default_normalizer is None:
+                SCPParser._default_normalizer = KeyNormalizer(self.FIELD_MAPPING)
+            self._normalizer = SCPParser._default_normalizer
+    
+    @staticmethod
+    def load_mapping_file(path: str) -> Dict[str, str]:
+        """读取字段映射文件"""
+        with open(path, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+        if not isinstance(mapping, dict):
+            raise ValueError(f"字段映射文件必须是 JSON 对象: {path}")
+        return {str(k): str(v) for k, v in mapping.items()}
     
     def normalize_key(self, key: str) -> str:
-        """标准化字段键名"""
-        if not key:
-            return ''
-        
-        # 移除前后空白和标点
-        key = key.strip().rstrip('：:')
-        
-        # 转换为小写进行匹配
-        key_lower = key.lower()
-        
-        # 查找映射
-        for pattern, standard_key in self.FIELD_MAPPING.items():
-            if pattern.lower() == key_lower:
-                return standard_key
-        
-        # 如果没有找到映射，返回清理后的原键名
-        return re.sub(r'[^\w\u4e00-\u9fff]', '_', key).lower()
+        """标准化字段键名（查预编译映射表，结果按原始键名缓存）"""
+        return self._normalizer(key)
+    
+    @classmethod
+    def set_text_normalizer(cls, fold_variants: bool = False, redact_blocks: bool = False) -> None:
+        """切换默认的字段值规范化选项（影响之后创建的解析器）"""
+        cls.default_text_normalizer = TextNormalizer(fold_variants=fold_variants, redact_blocks=redact_blocks)
     
     def clean_value(self, value: str) -> str:
-        """清理字段值"""
-        if not value:
-            return ''
-        
-        # 替换敏感信息标记
-        value = self.RE_REDACT.sub('[REDACTED]', value)
-        # 规范化空白字符
-        value = self.RE_WS.sub(' ', value)
-        # 移除前导冒号
-        value = self.RE_COLON_PREFIX.sub('', value)
-        
-        return value.strip()
+        """清理字段值（敏感信息标记、空白、前导冒号，见 text_normalize）"""
+        return self.text_normalizer(value)
     
     def deduplicate_content(self, content: str) -> str:
-        """去除内容中的重复段落"""
+        """去除单个字段内容中的重复块（按句末标点切分，短句与唯一内容保留）"""
         if not content:
             return content
-        
-        # 按句号分割段落
-        sentences = [s.strip() for s in content.split('。') if s.strip()]
-        
-        # 去重（保持顺序）
-        seen = set()
-        unique_sentences = []
-        for sentence in sentences:
-            if sentence not in seen and len(sentence) > 5:  # 忽略过短的片段
-                seen.add(sentence)
-                unique_sentences.append(sentence)
-        
-        return '。'.join(unique_sentences) + ('。' if unique_sentences else '')
+        record = {'content': content}
+        dedupe_record(record)
+        return record['content']
     
     def extract_id_from_url(self, url: str) -> str:
         """从 URL 中提取 SCP 编号"""
@@ -146,13 +192,20 @@ class SCPParser:
             return f"SCP-{match.group(1).zfill(3)}"
         return ''
     
-    def ensure_required_fields(self, data: Dict[str, Any], scp_id: int, url: str = '') -> Dict[str, Any]:
-        """确保必要字段存在"""
+    def ensure_required_fields(self, data: Dict[str, Any], scp_id: int, url: str = '',
+                               default_id: Optional[str] = None) -> Dict[str, Any]:
+        """确保必要字段存在
+        
+        Args:
+            default_id: 页面未给出编号时使用的 id（非编号页面）；默认由 URL 或 scp_id 推出
+        """
         result = data.copy()
         
         # 确保有 id 字段
         if 'id' not in result or not result['id']:
-            if url:
+            if default_id:
+                result['id'] = default_id
+            elif url:
                 extracted_id = self.extract_id_from_url(url)
                 if extracted_id:
                     result['id'] = extracted_id
@@ -161,10 +214,8 @@ class SCPParser:
             else:
                 result['id'] = f"SCP-{scp_id:03d}"
         
-        # 去重主要字段内容
-        for field in ['description', 'containment']:
-            if field in result and isinstance(result[field], str):
-                result[field] = self.deduplicate_content(result[field])
+        # 去除主要字段内完全重复的块（跨字段与近似重复的删除见 dedup.py strip）
+        dedupe_record(result, fields=PARSE_FIELDS)
         
         return result
     
@@ -190,13 +241,27 @@ class SCPParser:
     
     def parse_page_content(self, elements: List, scp_id: int, url: str = '') -> Dict[str, Any]:
         """解析页面内容元素，提取字段信息"""
+        def blocks():
+            for element in elements:
+                strong_tag = element.find('strong')
+                strong_text = strong_tag.get_text().strip() if strong_tag is not None else None
+                yield element.get_text().strip(), strong_text
+        
+        return self.parse_blocks(blocks(), scp_id, url)
+    
+    def parse_blocks(self, blocks: Iterable[Tuple[str, Optional[str]]], scp_id: int, url: str = '',
+                     default_id: Optional[str] = None) -> Dict[str, Any]:
+        """解析 (块文本, 首个 strong 文本) 序列，提取字段信息
+        
+        与 parse_page_content 逻辑相同，但不依赖具体的 DOM 对象，
+        可直接消费单次遍历（dom_walk）产出的惰性块序列。
+        default_id 见 ensure_required_fields。
+        """
         result = {}
         current_key = None
         current_value = ''
         
-        for element in elements:
-            element_text = element.get_text().strip()
-            
+        for element_text, strong_text in blocks:
             # 跳过空元素
             if not element_text:
                 continue
@@ -206,10 +271,8 @@ class SCPParser:
                 if element_text.startswith(('«', '‹')):
                     break
             
-            # 查找强调标签（字段名）
-            strong_tag = element.find('strong')
-            
-            if strong_tag:
+            # 强调标签（字段名）
+            if strong_text is not None:
                 # 保存上一个字段
                 if current_key:
                     normalized_key = self.normalize_key(current_key)
@@ -218,7 +281,7 @@ class SCPParser:
                         result[normalized_key] = cleaned_value
                 
                 # 开始新字段
-                current_key = strong_tag.get_text().strip()
+                current_key = strong_text
                 # 获取字段值（去掉字段名部分）
                 current_value = element_text[len(current_key):].strip()
             else:
@@ -236,7 +299,7 @@ class SCPParser:
                 result[normalized_key] = cleaned_value
         
         # 确保必要字段存在
-        result = self.ensure_required_fields(result, scp_id, url)
+        result = self.ensure_required_fields(result, scp_id, url, default_id)
         
         # 字段分类
         result = self.categorize_fields(result)
@@ -0,0 +1,383 @@
+"""
+SCP 全文检索模块 - 基于爬取结果构建磁盘倒排索引，支持字段过滤与 BM25 排序
+
+分词：中日韩文字取相邻二字组，建索引时另外收录每个单字（单字查询可命中任意位置），
+拉丁字母与数字按词切分（统一小写、NFKC 规范化）。
+索引保存在 SQLite 中：
+    - terms: 词项 → 倒排表，倒排表为 (编号差值, 词频) 的变长整数序列，按文档号递增存储
+    - docs: 每条记录的文档号、键、内容哈希、长度以及 class/series 过滤列
+    - doc_tags: 标签过滤
+更新是增量的：只有内容哈希变化的记录会被重新分词，受影响的词项按批合并一次。
+
+用法：
+    python search_index.py build scp_database_cn.json [--index scp_search.sqlite]
+    python search_index.py query 收容 异常 --class euclid --series 1 --tag 人形
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 参与检索的字段及其词频权重；其余字符串字段（附录等）按 OTHER_FIELD_WEIGHT 计入
+FIELD_WEIGHTS = {'id': 3, 'name': 3, 'containment': 1, 'description': 1}
+OTHER_FIELD_WEIGHT = 1
+# 不参与全文检索的字段
+SKIP_FIELDS = frozenset(('url', 'class', 'series', 'tags', 'images', 'image_hashes', 'warning', 'error'))
+
+# 假名、中日韩统一表意文字（含扩展 A 与兼容区）、谚文音节
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+RE_TOKEN = re.compile(f'[0-9a-z]+|[{CJK_CHARS}]+')
+RE_CJK_CHAR = re.compile(f'[{CJK_CHARS}]')
+
+# 分词方式变化时递增；打开旧版本的索引文件会先清空，下次 update 时全部重新分词
+INDEX_VERSION = 2
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 缓存多少个词项解码后的倒排表（高频词项的解码是查询的主要开销）
+POSTINGS_CACHE_SIZE = 1024
+
+
+def tokenize(text: str, unigrams: bool = False) -> Iterator[str]:
+    """拉丁词 + 中日韩二字组（单字成段时取单字）
+
+    Args:
+        unigrams: 另外产出多字段中的每个单字（建索引用；查询时单字段本身就是单字）
+    """
+    text = unicodedata.normalize('NFKC', text).lower()
+    for match in RE_TOKEN.finditer(text):
+        token = match.group()
+        if not RE_CJK_CHAR.match(token):
+            yield token
+        elif len(token) == 1:
+            yield token
+        else:
+            if unigrams:
+                yield from token
+            for i in range(len(token) - 1):
+                yield token[i:i + 2]
+
+
+def class_key(value) -> Optional[str]:
+    """项目等级的过滤键：首个词（如 'Euclid SCP-001' → 'euclid'）"""
+    if not isinstance(value, str):
+        return None
+    match = RE_TOKEN.search(unicodedata.normalize('NFKC', value).lower())
+    return match.group() if match else None
+
+
+def record_terms(record: Dict) -> Counter:
+    """记录的加权词频"""
+    counts = Counter()
+    for field, value in record.items():
+        if field in SKIP_FIELDS or not isinstance(value, str):
+            continue
+        weight = FIELD_WEIGHTS.get(field, OTHER_FIELD_WEIGHT)
+        for token in tokenize(value, unigrams=True):
+            counts[token] += weight
+    return counts
+
+
+def record_hash(record: Dict) -> str:
+    return hashlib.sha1(json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def encode_postings(postings: Iterable[Tuple[int, int]]) -> bytes:
+    """按文档号递增的 (文档号, 词频) 编码为差值变长整数"""
+    out = bytearray()
+    previous = 0
+    for doc, tf in postings:
+        for value in (doc - previous, tf):
+            while value >= 0x80:
+                out.append((value & 0x7F) | 0x80)
+                value >>= 7
+            out.append(value)
+        previous = doc
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> Dict[int, int]:
+    """encode_postings 的逆过程，返回 {文档号: 词频}"""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    postings = {}
+    doc = 0
+    for i in range(0, len(values), 2):
+        doc += values[i]
+        postings[doc] = values[i + 1]
+    return postings
+
+
+class SearchIndex:
+    """SQLite 中的倒排索引（线程安全）"""
+
+    def __init__(self, path: str = 'scp_search.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL,
+                postings BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS docs (
+                doc INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                hash TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                terms TEXT NOT NULL,
+                scp_id TEXT,
+                name TEXT,
+                class TEXT,
+                series INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS docs_class ON docs (class);
+            CREATE INDEX IF NOT EXISTS docs_series ON docs (series);
+            CREATE TABLE IF NOT EXISTS doc_tags (
+                tag TEXT NOT NULL,
+                doc INTEGER NOT NULL,
+                PRIMARY KEY (tag, doc)
+            ) WITHOUT ROWID;
+        ''')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != INDEX_VERSION:
+            with self._conn:
+                self._conn.executescript('DELETE FROM terms; DELETE FROM docs; DELETE FROM doc_tags;')
+                self._conn.execute(f'PRAGMA user_version = {INDEX_VERSION}')
+        self._conn.commit()
+        self._postings_cache: Dict[str, List[Tuple[int, Dict[int, int]]]] = {}
+        self._load_stats()
+
+    def _load_stats(self) -> None:
+        # 文档长度常驻内存（每条记录一个整数），打分时无需回表
+        self._lengths = dict(self._conn.execute('SELECT doc, length FROM docs'))
+        self.doc_count = len(self._lengths)
+        self.avg_length = sum(self._lengths.values()) / self.doc_count if self.doc_count else 0.0
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def update(self, db: Dict[str, Dict], prune: bool = True) -> Dict[str, int]:
+        """把数据库增量同步进索引
+
+        Args:
+            db: 键→记录字典（如 scp_database_cn.json 的内容）
+            prune: 删除索引中已不在 db 里的记录
+
+        Returns:
+            计数，如 {'added': 3, 'updated': 1, 'removed': 0, 'unchanged': 120}
+        """
+        summary = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        with self._lock:
+            conn = self._conn
+            existing = {key: (doc, digest, terms)
+                        for doc, key, digest, terms in conn.execute('SELECT doc, key, hash, terms FROM docs')}
+            # 词项 → {文档号: 新词频，0 表示删除}，最后每个词项只合并一次
+            changes: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+            with conn:
+                for key, record in db.items():
+                    if not isinstance(record, dict) or 'error' in record:
+                        continue
+                    digest = record_hash(record)
+                    old = existing.pop(key, None)
+                    if old is not None and old[1] == digest:
+                        summary['unchanged'] += 1
+                        continue
+
+                    counts = record_terms(record)
+                    if old is not None:
+                        doc = old[0]
+                        for term in json.loads(old[2]):
+                            changes[term][doc] = 0
+                        conn.execute('DELETE FROM doc_tags WHERE doc = ?', (doc,))
+                        summary['updated'] += 1
+                    else:
+                        doc = None
+                        summary['added'] += 1
+
+                    row = (key, digest, sum(counts.values()), json.dumps(sorted(counts), ensure_ascii=False),
+                           record.get('id'), record.get('name'), class_key(record.get('class')),
+                           record.get('series'))
+                    if doc is None:
+                        doc = conn.execute('INSERT INTO docs (key, hash, length, terms, scp_id, name, class, series)'
+                                           ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)', row).lastrowid
+                    else:
+                        conn.execute('UPDATE docs SET key = ?, hash = ?, length = ?, terms = ?, scp_id = ?,'
+                                     ' name = ?, class = ?, series = ? WHERE doc = ?', row + (doc,))
+                    for term, tf in counts.items():
+                        changes[term][doc] = tf
+                    tags = record.get('tags') or ()
+                    conn.executemany('INSERT OR IGNORE INTO doc_tags VALUES (?, ?)',
+                                     [(tag.lower(), doc) for tag in tags if isinstance(tag, str)])
+
+                if prune:
+                    for doc, _, terms in existing.values():
+                        for term in json.loads(terms):
+                            changes[term][doc] = 0
+                        conn.execute('DELETE FROM docs WHERE doc = ?', (doc,))
+                        conn.execute('DELETE FROM doc_tags WHERE doc = ?', (doc,))
+                        summary['removed'] += 1
+
+                self._merge_postings_locked(changes)
+            self._postings_cache.clear()
+            self._load_stats()
+        return summary
+
+    def _merge_postings_locked(self, changes: Dict[str, Dict[int, int]]) -> None:
+        conn = self._conn
+        for term, delta in changes.items():
+            row = conn.execute('SELECT postings FROM terms WHERE term = ?', (term,)).fetchone()
+            postings = decode_postings(row[0]) if row else {}
+            postings.update(delta)
+            merged = sorted((doc, tf) for doc, tf in postings.items() if tf)
+            if merged:
+                conn.execute('INSERT OR REPLACE INTO terms VALUES (?, ?, ?)',
+                             (term, len(merged), encode_postings(merged)))
+            elif row:
+                conn.execute('DELETE FROM terms WHERE term = ?', (term,))
+
+    def _term_postings_locked(self, term: str) -> List[Tuple[int, Dict[int, int]]]:
+        """词项的 (df, 倒排表) 列表（精确匹配，单个中日韩字命中索引中的单字词项）"""
+        cached = self._postings_cache.get(term)
+        if cached is not None:
+            return cached
+        rows = self._conn.execute('SELECT df, postings FROM terms WHERE term = ?', (term,)).fetchall()
+        lists = [(df, decode_postings(postings)) for df, postings in rows]
+        if len(self._postings_cache) >= POSTINGS_CACHE_SIZE:
+            self._postings_cache.clear()
+        self._postings_cache[term] = lists
+        return lists
+
+    def _filter_docs_locked(self, scp_class: Optional[str], series: Optional[int],
+                            tags: Iterable[str]) -> Optional[set]:
+        clauses, params = [], []
+        if scp_class:
+            clauses.append('class = ?')
+            params.append(class_key(scp_class))
+        if series is not None:
+            clauses.append('series = ?')
+            params.append(series)
+        for tag in tags:
+            clauses.append('doc IN (SELECT doc FROM doc_tags WHERE tag = ?)')
+            params.append(tag.lower())
+        if not clauses:
+            return None
+        sql = 'SELECT doc FROM docs WHERE ' + ' AND '.join(clauses)
+        return {doc for (doc,) in self._conn.execute(sql, params)}
+
+    def search(self, query: str = '', scp_class: Optional[str] = None, series: Optional[int] = None,
+               tags: Iterable[str] = (), limit: int = 20) -> List[Dict]:
+        """检索并按 BM25 排序
+
+        所有查询词都必须出现（AND）；查询为空时只按过滤条件列出记录。
+
+        Args:
+            query: 查询文本，分词方式与索引相同
+            scp_class: 项目等级过滤（如 'Euclid'，不区分大小写）
+            series: 系列编号过滤
+            tags: 标签过滤，需全部包含
+            limit: 最多返回多少条
+
+        Returns:
+            [{'key', 'id', 'name', 'score'}, ...]
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            allowed = self._filter_docs_locked(scp_class, series, list(tags))
+            scores: Optional[Dict[int, float]] = None
+            if terms:
+                per_term = [self._term_postings_locked(term) for term in terms]
+                # 从最稀有的词项开始求交集，候选集合尽快缩小
+                per_term.sort(key=lambda lists: sum(df for df, _ in lists))
+                avg = self.avg_length or 1.0
+                for lists in per_term:
+                    matched: Dict[int, float] = defaultdict(float)
+                    for df, postings in lists:
+                        idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+                        for doc, tf in postings.items():
+                            if (scores is None or doc in scores) and (allowed is None or doc in allowed):
+                                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths.get(doc, avg) / avg)
+                                matched[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    if scores is None:
+                        scores = matched
+                    else:
+                        scores = {doc: scores[doc] + weight for doc, weight in matched.items()}
+                    if not scores:
+                        return []
+            elif allowed is not None:
+                scores = dict.fromkeys(allowed, 0.0)
+            else:
+                return []
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            results = []
+            for doc, score in ranked:
+                key, scp_id, name = self._conn.execute(
+                    'SELECT key, scp_id, name FROM docs WHERE doc = ?', (doc,)).fetchone()
+                results.append({'key': key, 'id': scp_id, 'name': name, 'score': round(score, 4)})
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def build_index(db_path: str, index_path: str = 'scp_search.sqlite') -> Dict[str, int]:
+    """从 JSON 数据库文件增量更新索引"""
+    with open(db_path, 'r', encoding='utf-8') as f:
+        db = json.load(f)
+    index = SearchIndex(index_path)
+    try:
+        return index.update(db)
+    finally:
+        index.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--index', default='scp_search.sqlite', help="索引文件")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="从数据库构建或增量更新索引")
+    build.add_argument('database', nargs='?', default='scp_database_cn.json')
+    query = commands.add_parser('query', help="检索")
+    query.add_argument('text', nargs='*')
+    query.add_argument('--class', dest='scp_class', default=None)
+    query.add_argument('--series', type=int, default=None)
+    query.add_argument('--tag', action='append', default=[])
+    query.add_argument('--limit', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        summary = build_index(args.database, args.index)
+        print(f"索引已更新: {summary}，耗时 {time.perf_counter() - start:.2f} 秒")
+        return
+
+    index = SearchIndex(args.index)
+    start = time.perf_counter()
+    results = index.search(' '.join(args.text), args.scp_class, args.series, args.tag, args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    for result in results:
+        print(f"{result['score']:8.3f}  {result['id'] or result['key']}  {result['name'] or ''}")
+    print(f"{len(results)} 条结果，{elapsed:.1f}ms")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+SCP 系列索引模块 - 将系列页一次性解析为 {编号: 名称} 映射，供名称查询与存在性判断复用
+"""
+import json
+import re
+import threading
+import concurrent.futures
+from typing import Callable, Dict, Iterable, Optional, Set
+
+
+# 系列页中条目链接形如 /scp-049 或 http://.../scp-049
+RE_SERIES_HREF = re.compile(r'/scp-(\d+)$', re.IGNORECASE)
+# 纯文本回退：形如 "SCP-049 - 名称"
+RE_SERIES_LINE = re.compile(r'SCP-(\d+)', re.IGNORECASE)
+RE_CLEAN_NAME = re.compile(r'[·•].*$')
+
+SERIES_NUMBERS = range(1, 10)
+
+
+def parse_series_page(content: bytes, parser: Optional[str] = None) -> Dict[str, Dict[int, str]]:
+    """解析单个系列页，返回名称映射与存在编号
+
+    Args:
+        content: 系列页 HTML
+        parser: BeautifulSoup 解析器名称，默认为 html_backend.BS_PARSER（优先 lxml）
+
+    Returns:
+        {'names': {编号: 名称}, 'ids': 已创建页面的编号集合}
+    """
+    names: Dict[int, str] = {}
+    existing: Set[int] = set()
+    if not content:
+        return {'names': names, 'ids': existing}
+
+    from bs4 import BeautifulSoup
+
+    if parser is None:
+        from html_backend import BS_PARSER as parser
+    soup = BeautifulSoup(content, parser)
+
+    for link in soup.find_all('a', href=True):
+        match = RE_SERIES_HREF.search(link['href'].strip())
+        if not match:
+            continue
+        scp_number = int(match.group(1))
+        # Wikidot 以 newpage 类标记尚未创建的页面（红链）
+        if 'newpage' not in (link.get('class') or []):
+            existing.add(scp_number)
+        # 链接文本通常格式为 "SCP-XXX - 名称"，只保留首次出现
+        link_text = link.get_text().strip()
+        if ' - ' in link_text and scp_number not in names:
+            name_part = link_text.split(' - ', 1)[1].strip()
+            if name_part:
+                names[scp_number] = name_part
+
+    # 名称在链接外（"<a>SCP-XXX</a> - 名称"）时，回退到按行搜索纯文本
+    for line in soup.get_text().split('\n'):
+        if ' - ' not in line:
+            continue
+        match = RE_SERIES_LINE.search(line)
+        if not match:
+            continue
+        scp_number = int(match.group(1))
+        if scp_number in names:
+            continue
+        name_part = RE_CLEAN_NAME.sub('', line.split(' - ', 1)[1].strip()).strip()
+        if name_part:
+            names[scp_number] = name_part
+
+    return {'names': names, 'ids': existing}
+
+
+class SeriesIndex:
+    """线程安全的系列索引
+
+    每个系列页只下载并解析一次；并发预热时同一系列只有一个线程在解析，
+    其余线程等待结果。名称查询为 O(1) 字典命中。
+    """
+
+    def __init__(self, fetch: Callable[[int], bytes], parser: Optional[str] = None):
+        """
+        Args:
+            fetch: 根据系列编号返回系列页 HTML 的函数，失败时返回 b""
+            parser: BeautifulSoup 解析器名称，默认为 html_backend.BS_PARSER
+        """
+        self._fetch = fetch
+        self._parser = parser
+        self._names: Dict[int, str] = {}
+        self._ids: Set[int] = set()
+        self._loaded: Set[int] = set()
+        self._lock = threading.Lock()
+        self._series_locks: Dict[int, threading.Lock] = {}
+
+    @staticmethod
+    def series_of(scp_number: int) -> int:
+        """计算编号所属系列 (1-9)，与 get_series_number 保持一致"""
+        return max(1, min((scp_number // 1000) + 1, 9))
+
+    def _series_lock(self, series_number: int) -> threading.Lock:
+        with self._lock:
+            lock = self._series_locks.get(series_number)
+            if lock is None:
+                lock = self._series_locks[series_number] = threading.Lock()
+            return lock
+
+    def is_loaded(self, series_number: int) -> bool:
+        return series_number in self._loaded
+
+    def ensure_series(self, series_number: int) -> bool:
+        """确保指定系列已载入索引
+
+        Returns:
+            是否载入成功；获取失败时不标记为已载入，之后的调用会重试
+        """
+        if series_number in self._loaded:
+            return True
+        with self._series_lock(series_number):
+            # 双重检查：等待期间可能已由其他线程完成
+            if series_number in self._loaded:
+                return True
+            content = self._fetch(series_number)
+            if not content:
+                return False
+            self.ingest(series_number, content)
+            return True
+
+    def ingest(self, series_number: int, content: bytes) -> None:
+        """解析外部获取的系列页并并入索引（如异步引擎自行下载的页面）"""
+        parsed = parse_series_page(content, self._parser)
+        with self._lock:
+            for scp_number, name in parsed['names'].items():
+                self._names.setdefault(scp_number, name)
+            self._ids.update(parsed['ids'])
+            self._loaded.add(series_number)
+
+    def warm(self, series_numbers: Iterable[int] = SERIES_NUMBERS, max_workers: int = 4) -> Set[int]:
+        """并发预热多个系列，返回载入成功的系列编号"""
+        series_numbers = list(series_numbers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self.ensure_series, series_numbers)
+            return {s for s, ok in zip(series_numbers, results) if ok}
+
+    def get_name(self, scp_number: int) -> str:
+        """获取项目名称，未找到时返回空字符串"""
+        self.ensure_series(self.series_of(scp_number))
+        return self._names.get(scp_number, "")
+
+    def exists(self, scp_number: int) -> Optional[bool]:
+        """判断编号是否在系列页中有已创建的页面
+
+        Returns:
+            True/False；所属系列无法载入时返回 None（未知）
+        """
+        if not self.ensure_series(self.series_of(scp_number)):
+            return None
+        return scp_number in self._ids
+
+    def clear(self) -> None:
+        """清空索引，之后的查询会重新下载系列页"""
+        with self._lock:
+            self._names.clear()
+            self._ids.clear()
+            self._loaded.clear()
+
+    def known_ids(self) -> Set[int]:
+        """返回所有已载入系列中存在的编号"""
+        with self._lock:
+            return set(self._ids)
+
+    def save(self, path: str) -> None:
+        """将索引保存为 JSON 文件"""
+        with self._lock:
+            data = {
+                'loaded': sorted(self._loaded),
+                'ids': sorted(self._ids),
+                'names': {str(k): v for k, v in sorted(self._names.items())},
+            }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+
+    def load(self, path: str) -> None:
+        """从 JSON 文件载入索引，已载入的系列不会再次下载"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self._lock:
+            self._names.update({int(k): v for k, v in data.get('names', {}).items()})
+            self._ids.update(int(i) for i in data.get('ids', []))
+            self._loaded.update(int(s) for s in data.get('loaded', []))
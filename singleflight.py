@@ -0,0 +1,138 @@
+"""
+SCP 单飞缓存模块 - 合并对同一共享资源的并发请求，并缓存成功结果
+
+functools.lru_cache 不能阻止并发未命中：多个线程同时查询同一个键时会各自下载一次，
+而且会把失败时返回的兜底值一并缓存下来。SingleFlightCache：
+    - 同一个键同时只有一个加载在进行，其余调用者（线程或协程）等待它的结果
+    - 成功结果按 LRU 与 TTL 淘汰；加载抛出的异常会传给当时等待的调用者，但不会被缓存
+    - 命中、未命中、合并等待与失败次数可通过 stats() 查看，并计入全局指标
+"""
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import metrics
+
+
+class SingleFlightCache:
+    """线程安全、也可在事件循环中使用的单飞缓存
+
+    同一个键的同步加载与异步加载共用一个进行中的 Future；不要在事件循环线程中用 get()
+    等待一个由同一事件循环中的协程加载的键（会阻塞事件循环），应使用 get_async()。
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None, name: str = 'cache'):
+        """
+        Args:
+            maxsize: 最多缓存多少个键，超出时淘汰最久未使用的
+            ttl: 缓存有效期（秒），None 表示不过期
+            name: 指标标签中的缓存名称
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, Optional[float]]]' = OrderedDict()
+        self._flights: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'evictions': 0}
+
+    def _count_locked(self, result: str) -> None:
+        self._stats[result] += 1
+        metrics.inc('singleflight_total', labels={'cache': self.name, 'result': result})
+
+    def _begin(self, key: Hashable) -> Tuple[str, Any]:
+        """查询缓存并登记加载
+
+        Returns:
+            ('hit', 值)、('wait', 进行中的 Future) 或 ('lead', 由调用者负责完成的 Future)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self._count_locked('hits')
+                    return 'hit', value
+                del self._entries[key]
+                self._count_locked('evictions')
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._count_locked('coalesced')
+                return 'wait', flight
+            flight = self._flights[key] = concurrent.futures.Future()
+            self._count_locked('misses')
+            return 'lead', flight
+
+    def _finish(self, key: Hashable, flight: concurrent.futures.Future, value: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+            if error is None:
+                expires = time.monotonic() + self.ttl if self.ttl is not None else None
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._count_locked('evictions')
+            else:
+                self._count_locked('errors')
+        if error is None:
+            flight.set_result(value)
+        else:
+            flight.set_exception(error)
+
+    def get(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        """返回缓存值；未命中时调用 loader(key)，并发的相同请求只加载一次
+
+        Raises:
+            loader 抛出的异常（本次及同时等待的调用者都会收到，不会被缓存）
+        """
+        state, value = self._begin(key)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            return value.result()
+        try:
+            result = loader(key)
+        except BaseException as e:
+            self._finish(key, value, error=e)
+            raise
+        self._finish(key, value, result)
+        return result
+
+    async def get_async(self, key: Hashable, loader: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        """get 的协程版本，loader(key) 返回可等待对象；等待期间不阻塞事件循环"""
+        state, value = self._begin(key)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            import asyncio
+
+            return await asyncio.wrap_future(value)
+        try:
+            result = await loader(key)
+        except BaseException as e:
+            self._finish(key, value, error=e)
+            raise
+        self._finish(key, value, result)
+        return result
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存（进行中的加载不受影响）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """命中/未命中/合并等待/失败/淘汰次数与当前大小"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), inflight=len(self._flights))
+
+    def __len__(self) -> int:
+        return len(self._entries)
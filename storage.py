@@ -0,0 +1,358 @@
+"""
+SCP 数据存储模块 - 流式 JSON Lines 写入、SQLite 存储与标准 JSON 数据库的相互转换
+
+JSONLWriter 每完成一条记录就追加一行 {"key": 编号, "record": 记录}，按批刷新到磁盘，
+内存占用不随语料增长，崩溃后已写入的进度不会丢失。
+compact_jsonl 将 JSONL 转换为原有的缩进 JSON 格式（同一编号以最后一次写入为准）。
+SQLiteStore 把记录存入 SQLite（WAL 模式、按批提交），编号、系列、等级与标签建有索引，
+按编号随机读取或按条件筛选都无需载入整个数据库；可与 JSON 数据库相互导入导出。
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class JSONLWriter:
+    """线程安全的 JSON Lines 追加写入器
+
+    支持 writer[key] = record 的字典式写入，可直接作为各爬取引擎的结果容器（sink）。
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 5.0, fsync: bool = False):
+        """
+        Args:
+            path: JSONL 文件路径，已存在时追加
+            batch_size: 缓冲多少条记录后刷新
+            flush_interval: 距上次刷新超过该秒数时也会刷新
+            fsync: 刷新时是否调用 os.fsync，确保断电后也不丢失
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._file = open(path, 'a', encoding='utf-8')
+        # 上次崩溃可能留下没有换行的半行，先补换行避免与新记录粘连
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+        self._buffer = []
+        self._count = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, key: str, record: Dict[str, Any]) -> None:
+        """追加一条记录"""
+        line = json.dumps({'key': str(key), 'record': record}, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            self._count += 1
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def __setitem__(self, key: str, record: Dict[str, Any]) -> None:
+        self.write(key, record)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._buffer.clear()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """逐行读取 JSONL，产出 (key, record)；跳过崩溃时可能残留的不完整末行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield item['key'], item['record']
+
+
+def compact_jsonl(jsonl_path: str, json_path: str, indent: int = 4) -> int:
+    """将 JSONL 紧凑化为原有的缩进 JSON 数据库
+
+    两遍扫描：第一遍只记录每个编号最后一次出现的字节偏移，第二遍按偏移逐条读取并写出，
+    内存占用与编号数量成正比而非与记录大小成正比。输出与 json.dump(db, indent=4) 完全一致。
+
+    Returns:
+        写出的记录数
+    """
+    offsets: Dict[str, int] = {}
+    with open(jsonl_path, 'rb') as f:
+        offset = 0
+        for raw in f:
+            line = raw.strip()
+            if line:
+                try:
+                    key = json.loads(line)['key']
+                except (json.JSONDecodeError, KeyError):
+                    key = None
+                if key is not None:
+                    # 与 dict 更新语义一致：位置取首次出现，内容取最后一次
+                    offsets[key] = offset
+            offset += len(raw)
+
+    def records() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with open(jsonl_path, 'rb') as src:
+            for key, offset in offsets.items():
+                src.seek(offset)
+                yield key, json.loads(src.readline())['record']
+
+    return write_json_database(records(), json_path, indent)
+
+
+def write_json_database(items: Iterable[Tuple[str, Dict[str, Any]]], json_path: str, indent: int = 4) -> int:
+    """逐条写出缩进 JSON 数据库，输出与 json.dump(dict(items), indent=indent) 完全一致
+
+    先写临时文件再原子替换，中途失败不会破坏已有的数据库文件。
+
+    Returns:
+        写出的记录数
+    """
+    tmp_path = json_path + '.tmp'
+    pad = ' ' * indent
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for key, record in items:
+            body = json.dumps(record, ensure_ascii=False, indent=indent).replace('\n', '\n' + pad)
+            out.write(',\n' if count else '{\n')
+            out.write(f"{pad}{json.dumps(key, ensure_ascii=False)}: {body}")
+            count += 1
+        out.write('\n}' if count else '{}')
+    os.replace(tmp_path, json_path)
+    return count
+
+
+class SQLiteStore:
+    """SQLite 记录存储，可直接作为各爬取引擎的结果容器（sink）
+
+    写入先进入缓冲区，达到 batch_size 条或距上次提交超过 flush_interval 秒时在一个事务中提交；
+    读取前会先提交缓冲区，保证读到自己的写入。所有操作共用一个连接并由锁串行化，
+    多个写线程不会互相破坏；WAL 模式下其他进程可以同时读取。
+    """
+
+    def __init__(self, path: str = 'scp_database_cn.sqlite', batch_size: int = 200, flush_interval: float = 5.0):
+        """
+        Args:
+            path: 数据库文件，不存在时创建
+            batch_size: 缓冲多少条记录后提交
+            flush_interval: 距上次提交超过该秒数时也会提交
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS records (
+                key TEXT UNIQUE NOT NULL,
+                scp_id TEXT,
+                series INTEGER,
+                class TEXT COLLATE NOCASE,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_scp_id ON records (scp_id);
+            CREATE INDEX IF NOT EXISTS records_series ON records (series);
+            CREATE INDEX IF NOT EXISTS records_class ON records (class);
+            CREATE TABLE IF NOT EXISTS record_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS record_tags_key ON record_tags (key);
+        ''')
+        self._conn.commit()
+        self._buffer: Dict[str, Dict[str, Any]] = {}
+        self._count = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def write(self, key: str, record: Dict[str, Any]) -> None:
+        """写入或覆盖一条记录（同一编号保留首次写入的位置，内容取最后一次）"""
+        with self._lock:
+            self._buffer[str(key)] = record
+            self._count += 1
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def __setitem__(self, key: str, record: Dict[str, Any]) -> None:
+        self.write(key, record)
+
+    def __len__(self) -> int:
+        """本次打开以来写入的记录数（与 JSONLWriter 一致）；库中总数见 count()"""
+        return self._count
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            now = time.time()
+            rows, tags = [], []
+            for key, record in self._buffer.items():
+                rows.append((key, record.get('id'), record.get('series'), record.get('class'),
+                             json.dumps(record, ensure_ascii=False), now))
+                tags.extend((tag, key) for tag in record.get('tags') or () if isinstance(tag, str))
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO records (key, scp_id, series, class, record, updated_at) VALUES (?, ?, ?, ?, ?, ?)'
+                    ' ON CONFLICT(key) DO UPDATE SET scp_id = excluded.scp_id, series = excluded.series,'
+                    ' class = excluded.class, record = excluded.record, updated_at = excluded.updated_at',
+                    rows)
+                self._conn.executemany('DELETE FROM record_tags WHERE key = ?', [(key,) for key in self._buffer])
+                self._conn.executemany('INSERT OR IGNORE INTO record_tags VALUES (?, ?)', tags)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """按编号读取一条记录"""
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute('SELECT record FROM records WHERE key = ?', (str(key),)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if str(key) in self._buffer:
+                return True
+            return self._conn.execute('SELECT 1 FROM records WHERE key = ?', (str(key),)).fetchone() is not None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                self._conn.execute('DELETE FROM records WHERE key = ?', (str(key),))
+                self._conn.execute('DELETE FROM record_tags WHERE key = ?', (str(key),))
+
+    def count(self) -> int:
+        """库中的记录总数"""
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def query(self, series: Optional[int] = None, scp_class: Optional[str] = None,
+              tags: Iterable[str] = (), limit: Optional[int] = None,
+              page_size: int = 500) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """按条件筛选记录，按首次写入顺序逐页产出 (key, record)
+
+        Args:
+            series: 系列编号
+            scp_class: 项目等级前缀（不区分大小写，如 'euclid'）
+            tags: 需全部包含的标签
+            limit: 最多产出多少条
+            page_size: 每次从数据库取多少条，内存占用与此成正比
+        """
+        clauses, params = [], []
+        if series is not None:
+            clauses.append('series = ?')
+            params.append(series)
+        if scp_class:
+            clauses.append("class LIKE ? ESCAPE '\\'")
+            params.append(scp_class.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        for tag in tags:
+            clauses.append('key IN (SELECT key FROM record_tags WHERE tag = ?)')
+            params.append(tag)
+        where = ''.join(f' AND {clause}' for clause in clauses)
+
+        with self._lock:
+            self._flush_locked()
+        last_rowid, produced = 0, 0
+        while limit is None or produced < limit:
+            size = page_size if limit is None else min(page_size, limit - produced)
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT rowid, key, record FROM records WHERE rowid > ?{where} ORDER BY rowid LIMIT ?',
+                    [last_rowid, *params, size]).fetchall()
+            if not rows:
+                return
+            for rowid, key, record in rows:
+                yield key, json.loads(record)
+            last_rowid = rows[-1][0]
+            produced += len(rows)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self.query()
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            self._flush_locked()
+            return [key for (key,) in self._conn.execute('SELECT key FROM records ORDER BY rowid')]
+
+    def import_json(self, json_path: str) -> int:
+        """导入标准 JSON 数据库（已有编号被覆盖），返回导入的记录数"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+        with self._lock:
+            self._flush_locked()
+            self._buffer.update(db)
+            self._flush_locked()
+        return len(db)
+
+    def export_json(self, json_path: str, indent: int = 4) -> int:
+        """导出为标准缩进 JSON 数据库（格式与 json.dump(db, indent=4) 一致），返回记录数"""
+        return write_json_database(self.query(), json_path, indent)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_sqlite(sqlite_path: str, json_path: str, indent: int = 4) -> int:
+    """将 SQLiteStore 数据库导出为标准 JSON 数据库"""
+    with SQLiteStore(sqlite_path) as store:
+        return store.export_json(json_path, indent)
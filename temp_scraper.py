@@ -1,28 +1,20 @@
 # imports 和全局设置 cell
-import requests
-from bs4 import BeautifulSoup
+# requests / bs4 / lxml 在首次使用时才导入，短任务（查询记录、打印帮助）不承担其导入开销
 import json
-import re
-from functools import lru_cache
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import threading
 from urllib.parse import urljoin
-import concurrent.futures
 import time
 
 # 导入新的解析器模块
 from scp_parser import SCPParser, SCPValidator
-
-# 优先使用 lxml，加速解析；不可用则回退
-try:
-    import lxml  # 仅用于检查是否可用
-    BS_PARSER = 'lxml'
-except Exception:
-    BS_PARSER = 'html.parser'
-
-# 复用 Session + 重试策略 + 连接池
-session = requests.Session()
-retry_strategy = Retry(
+from series_index import SeriesIndex
+from singleflight import SingleFlightCache
+from archive import item_key, page_key, series_key
+from link_graph import page_kind, page_links
+from metrics import metrics
+
+# 复用 Session + 重试策略 + 连接池，首次使用时创建（见 get_session）
+RETRY_OPTIONS = dict(
     total=3,
     connect=3,
     read=3,
@@ -31,12 +23,145 @@ retry_strategy = Retry(
     allowed_methods=["GET"],
     raise_on_status=False,
 )
-adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=20, pool_maxsize=20)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
-session.headers.update({
+HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-})
+}
+_session = None
+_retry_strategy = None
+_session_lock = threading.Lock()
+
+# 可选的响应缓存与自适应节流，由 _mount_adapter 组合挂载到 session
+response_cache = None
+_cache_options = {}
+throttle = None
+# 可选的原始页面归档（archive.PageArchive），由 enable_archive 启用
+page_archive = None
+
+def get_retry_strategy():
+    """全局 urllib3 重试策略（同步 session、图片下载与 async 引擎共用）"""
+    global _retry_strategy
+    if _retry_strategy is None:
+        from urllib3.util.retry import Retry
+
+        _retry_strategy = Retry(**RETRY_OPTIONS)
+    return _retry_strategy
+
+def get_session():
+    """全局 requests.Session，首次调用时导入 requests 并创建（线程安全）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+
+                new_session = requests.Session()
+                new_session.headers.update(HEADERS)
+                _mount_adapter(new_session)
+                _session = new_session
+    return _session
+
+def __getattr__(name):
+    # 兼容 `from temp_scraper import session, retry_strategy`：访问时才创建
+    if name == 'session':
+        return get_session()
+    if name == 'retry_strategy':
+        return get_retry_strategy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def throttled_retry_strategy():
+    """启用节流时使用的重试策略：429/503 交给节流器等待后重发，urllib3 只处理其余瞬时错误"""
+    from throttle import RETRY_STATUSES
+
+    retry_strategy = get_retry_strategy()
+    # urllib3 对带 Retry-After 的 429/503 会无视 status_forcelist 自行重试，需一并关闭
+    return retry_strategy.new(
+        status_forcelist=[s for s in retry_strategy.status_forcelist if s not in RETRY_STATUSES],
+        respect_retry_after_header=False)
+
+def _mount_adapter(session=None):
+    """根据已启用的功能构造 adapter 并挂载到全局 session（尚未创建时由 get_session 挂载）"""
+    if session is None:
+        if _session is None:
+            return
+        session = _session
+    retry_strategy = get_retry_strategy()
+    kwargs = dict(pool_connections=20, pool_maxsize=20)
+    if throttle is not None:
+        from throttle import ThrottledAdapter, ThrottledCachingAdapter
+
+        kwargs['max_retries'] = throttled_retry_strategy()
+        if response_cache is not None:
+            mounted = ThrottledCachingAdapter(response_cache, throttle=throttle, **_cache_options, **kwargs)
+        else:
+            mounted = ThrottledAdapter(throttle=throttle, **kwargs)
+    elif response_cache is not None:
+        from http_cache import CachingAdapter
+
+        mounted = CachingAdapter(response_cache, max_retries=retry_strategy, **_cache_options, **kwargs)
+    else:
+        from requests.adapters import HTTPAdapter
+
+        mounted = HTTPAdapter(max_retries=retry_strategy, **kwargs)
+    session.mount("http://", mounted)
+    session.mount("https://", mounted)
+
+def enable_http_cache(path='http_cache.sqlite', offline=False, max_age=0):
+    """为全局 session 挂载持久化响应缓存
+
+    Args:
+        path: SQLite 缓存文件路径
+        offline: 离线模式，只从缓存读取，不访问网络
+        max_age: 缓存新鲜期（秒），期内直接命中不做重验证
+
+    Returns:
+        ResponseCache 实例
+    """
+    global response_cache, _cache_options
+    from http_cache import ResponseCache
+
+    response_cache = ResponseCache(path)
+    _cache_options = {'offline': offline, 'max_age': max_age}
+    _mount_adapter()
+    return response_cache
+
+def enable_throttle(rate=5.0, max_rate=50.0, max_concurrency=16, **options):
+    """为全局 session 启用按主机的自适应限速（令牌桶 + AIMD 并发）
+
+    Args:
+        rate: 初始速率（请求/秒）
+        max_rate: 速率上限
+        max_concurrency: 单主机并发上限
+        **options: 其余 throttle.HostThrottle 参数
+
+    Returns:
+        AdaptiveThrottle 实例，可通过 snapshot()/describe() 查看当前速率
+    """
+    global throttle
+    from throttle import AdaptiveThrottle
+
+    throttle = AdaptiveThrottle(rate=rate, max_rate=max_rate, max_concurrency=max_concurrency, **options)
+    _mount_adapter()
+    return throttle
+
+def enable_archive(path='scp_pages.arc'):
+    """把之后下载的条目页与系列页原始内容压缩归档，供 archive.py reparse 离线重新解析
+
+    Args:
+        path: 归档文件路径（旁边生成 .idx 偏移索引）
+
+    Returns:
+        PageArchive 实例
+    """
+    global page_archive
+    from archive import PageArchive
+
+    page_archive = PageArchive(path)
+    return page_archive
+
+def archive_page(key, content, url):
+    """启用了归档时保存一个页面"""
+    if page_archive is not None and content:
+        page_archive.put(key, content, url)
 
 # 可控日志
 VERBOSE = False
@@ -44,15 +169,59 @@ def vprint(*args, **kwargs):
     if VERBOSE:
         print(*args, **kwargs)
 
-# 在第一个cell中添加预编译正则
-# 预编译正则
-RE_REDACT = re.compile('\u2588+')
-RE_WS = re.compile(r'\s+')
-RE_CLEAN_NAME = re.compile(r'[·•].*$')  # 新增：清理名称的正则
-
 IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')
 
-base_url = "http://scp-wiki-cn.wikidot.com/scp-"
+SITE_URL = "http://scp-wiki-cn.wikidot.com"
+base_url = SITE_URL + "/scp-"
+
+def set_site_url(site_url):
+    """切换目标站点（如本地测试服务器），同时清空依赖站点的缓存"""
+    global SITE_URL, base_url
+    SITE_URL = site_url.rstrip('/')
+    base_url = SITE_URL + "/scp-"
+    series_page_cache.clear()
+    series_index.clear()
+
+# 页面解析后端（见 html_backend），所有爬取引擎共用；None 表示默认后端，首次解析时载入
+HTML_BACKEND = None
+_parse_html = None
+
+def set_html_backend(name=None):
+    """切换页面 HTML 解析后端（bs4 / strainer / lxml，None 为默认后端）
+
+    Raises:
+        ValueError: 名称未知或依赖未安装
+    """
+    global HTML_BACKEND, _parse_html
+    from html_backend import DEFAULT_BACKEND, get_backend
+
+    name = name or DEFAULT_BACKEND
+    _parse_html = get_backend(name)
+    HTML_BACKEND = name
+
+def parse_html(content):
+    """用当前后端把页面解析为 PageWalk"""
+    if _parse_html is None:
+        set_html_backend(HTML_BACKEND)
+    return _parse_html(content)
+
+def set_text_options(fold_variants=False, redact_blocks=False):
+    """切换字段值规范化选项（繁简折叠、涂黑字符替换，见 text_normalize），所有爬取引擎共用"""
+    SCPParser.set_text_normalizer(fold_variants=fold_variants, redact_blocks=redact_blocks)
+
+def text_options():
+    """当前的字段值规范化选项 (fold_variants, redact_blocks)"""
+    normalizer = SCPParser.default_text_normalizer
+    return normalizer.fold_variants, normalizer.redact_blocks
+
+def parse_worker_options():
+    """解析进程需要与主进程一致的选项 (HTML 后端, 字段值规范化选项)，作为 init_parse_worker 的参数"""
+    return HTML_BACKEND, text_options()
+
+def init_parse_worker(html_backend=None, options=(False, False)):
+    """解析进程初始化：spawn/forkserver 启动的子进程不继承主进程的模块状态，需重新设置"""
+    set_html_backend(html_backend)
+    set_text_options(*options)
 
 def analyze_images(scp_id: int):
     """分析页面中的图片并打印与项目相关的图片URL"""
@@ -120,7 +289,10 @@ def analyze_images(scp_id: int):
     _id = harmonize_id(scp_id)
     page_url = base_url + _id
     try:
-        resp = session.get(page_url, timeout=10)
+        from bs4 import BeautifulSoup
+        from html_backend import BS_PARSER
+
+        resp = get_session().get(page_url, timeout=10)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.content, BS_PARSER)
         page_content = soup.find('div', id='page-content')
@@ -137,6 +309,14 @@ def harmonize_id(_id: int) -> str:
     # zfill性能优于字符串拼接,因为它是C实现的内置方法
     return str(_id).zfill(3)
 
+def get_item_url(_id: int) -> str:
+    """根据项目编号获取项目页面URL"""
+    return base_url + harmonize_id(_id)
+
+def get_page_url(name: str) -> str:
+    """根据页面名获取页面URL（非编号页面，如 scp-cn-001、故事与中心页）"""
+    return f"{SITE_URL}/{name}"
+
 def get_series_number(_id: int) -> int:
     """根据项目编号计算所属系列
     
@@ -159,34 +339,63 @@ def get_series_url(series_number: int) -> str:
     Returns:
         系列页面的URL
     """
-    base_series_url = "http://scp-wiki-cn.wikidot.com/scp-series"
+    base_series_url = f"{SITE_URL}/scp-series"
     if series_number == 1:
         return base_series_url
     else:
         return f"{base_series_url}-{series_number}"
 
-@lru_cache(maxsize=16)
-def fetch_series_page(series_number: int) -> bytes:
-    """缓存系列页 HTML，减少重复请求"""
+def get_recent_changes_url() -> str:
+    """获取站点最近修改（RSS）的URL"""
+    return f"{SITE_URL}/feed/site-changes.xml"
+
+def record_response(response):
+    """把一次 requests 响应计入指标：状态码、字节数、首字节时间、重试与缓存命中"""
+    if getattr(response, 'from_cache', False):
+        metrics.inc('cache_hits_total')
+    # urllib3 Retry 的历史中记录了被重试掉的中间响应（如 429/503）
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    for attempt in getattr(retries, 'history', None) or ():
+        metrics.inc('http_retries_total')
+        if attempt.status:
+            metrics.inc('http_responses_total', labels={'status': attempt.status})
+    metrics.inc('http_responses_total', labels={'status': response.status_code})
+    metrics.inc('http_bytes_total', len(response.content))
+    if response.elapsed:
+        metrics.observe('http_ttfb_seconds', response.elapsed.total_seconds())
+
+# 系列页单飞缓存：并发查询同一系列只下载一次，下载失败不缓存（之后的查询会重试）
+series_page_cache = SingleFlightCache(maxsize=16, ttl=6 * 3600, name='series_page')
+
+def download_series_page(series_number: int) -> bytes:
+    """下载系列页 HTML
+
+    Raises:
+        requests.RequestException: 请求失败或状态码异常
+    """
     url = get_series_url(series_number)
+    resp = get_session().get(url, timeout=10)
+    record_response(resp)
+    resp.raise_for_status()
+    archive_page(series_key(series_number), resp.content, resp.url)
+    return resp.content
+
+def fetch_series_page(series_number: int) -> bytes:
+    """获取系列页 HTML（经单飞缓存），失败时返回 b"""""
     try:
-        resp = session.get(url, timeout=10)
-        resp.raise_for_status()
-        return resp.content
+        return series_page_cache.get(series_number, download_series_page)
     except Exception as e:
-        vprint(f"获取系列页失败 {url}: {e}")
+        vprint(f"获取系列页失败 {get_series_url(series_number)}: {e}")
         return b""
 
-def extract_images_from_soup(soup, page_content, scp_id, page_url):
-    """从已解析的soup中提取图片，避免重复请求和解析"""
-    if not page_content:
-        return []
+# 全局系列索引：线程间共享，可通过 series_index.save()/load() 持久化
+series_index = SeriesIndex(fetch_series_page)
 
+def extract_images_from_attrs(imgs, scp_id, page_url):
+    """从 <img> 标签（或其属性字典）序列中提取与项目相关的图片URL"""
     scp_id_formatted = harmonize_id(scp_id)
     ordered, seen = [], set()
 
-    # 只在主体内容区域中找图片
-    imgs = page_content.find_all('img')
     for img in imgs:
         candidates = _extract_urls_from_img(img)
         normalized = _normalize_and_filter_urls(candidates, page_url)
@@ -200,82 +409,63 @@ def extract_images_from_soup(soup, page_content, scp_id, page_url):
 
     return ordered
 
+def extract_images_from_soup(soup, page_content, scp_id, page_url):
+    """从已解析的soup中提取图片，避免重复请求和解析"""
+    if not page_content:
+        return []
+
+    # 只在主体内容区域中找图片
+    return extract_images_from_attrs(page_content.find_all('img'), scp_id, page_url)
+
+# 定义需要过滤的标签（不区分大小写）
+FILTERED_TAGS = {
+    'scp', 'safe', 'euclid', 'keter', 'thaumiel', 'apollyon',
+    'archon', 'neutralized', 'explained', 'decommissioned'
+}
+
+def collect_tags(tag_texts, content_tag_texts=()):
+    """过滤并去重标签文本
+
+    Args:
+        tag_texts: 页面标签容器中的链接文本
+        content_tag_texts: 页面内容中 /tag/ 链接的文本，仅在前者没有有效标签时使用
+    """
+    tags = []
+    for tag_text in tag_texts:
+        tag_text = tag_text.strip()
+        if tag_text and tag_text.lower() not in FILTERED_TAGS and tag_text not in tags:
+            tags.append(tag_text)
+
+    # 如果没有找到标签，尝试使用页面内容中的标签链接
+    if not tags:
+        for tag_text in content_tag_texts:
+            tag_text = tag_text.strip()
+            if tag_text and tag_text.lower() not in FILTERED_TAGS and tag_text not in tags:
+                tags.append(tag_text)
+
+    return tags
+
 # 在extract_images_from_soup函数之后添加新的代码单元格
 def extract_tags_from_soup(soup, page_content):
     """从已解析的soup中提取SCP项目的标签信息，并过滤掉不需要的标签"""
     if not soup:
         return []
-    
-    tags = []
-    
-    # 定义需要过滤的标签（不区分大小写）
-    filtered_tags = {
-        'scp', 'safe', 'euclid', 'keter', 'thaumiel', 'apollyon', 
-        'archon', 'neutralized', 'explained', 'decommissioned'
-    }
-    
-    # 查找页面标签容器
+
+    # 查找页面标签容器，在其中查找所有链接
     page_tags_div = soup.find('div', class_='page-tags')
-    if page_tags_div:
-        # 在标签容器中查找所有链接
-        tag_links = page_tags_div.find_all('a')
-        for link in tag_links:
-            tag_text = link.get_text().strip()
-            if tag_text and tag_text.lower() not in filtered_tags and tag_text not in tags:
-                tags.append(tag_text)
-    
-    # 如果没有找到标签容器，尝试在页面内容中查找标签链接
-    if not tags and page_content:
-        # 查找可能的标签链接（通常以/tag/开头）
-        tag_links = page_content.find_all('a', href=True)
-        for link in tag_links:
-            href = link.get('href', '')
-            if '/tag/' in href:
-                tag_text = link.get_text().strip()
-                if tag_text and tag_text.lower() not in filtered_tags and tag_text not in tags:
-                    tags.append(tag_text)
-    
-    return tags
+    tag_texts = [link.get_text() for link in page_tags_div.find_all('a')] if page_tags_div else []
+
+    # 查找可能的标签链接（通常以/tag/开头）
+    content_tag_texts = []
+    if page_content:
+        content_tag_texts = [link.get_text() for link in page_content.find_all('a', href=True)
+                             if '/tag/' in link.get('href', '')]
+
+    return collect_tags(tag_texts, content_tag_texts)
 def get_scp_name_from_series(_id: int) -> str:
-    """从系列页面获取SCP项目名称（优化版）"""
+    """从系列索引获取SCP项目名称（每个系列页只解析一次）"""
     try:
-        series_number = get_series_number(_id)
-        content = fetch_series_page(series_number)
-        if not content:
-            return ""
-
-        soup = BeautifulSoup(content, BS_PARSER)
-
-        # 查找包含SCP编号的链接
-        scp_id_formatted = harmonize_id(_id)
-        scp_link_pattern = f"scp-{scp_id_formatted}"
-
-        # 在页面中查找匹配的SCP链接
-        links = soup.find_all('a', href=True)
-        for link in links:
-            if scp_link_pattern in link.get('href', ''):
-                # 获取链接文本，通常格式为 "SCP-XXX - 名称"
-                link_text = link.get_text().strip()
-                if ' - ' in link_text:
-                    # 提取名称部分（去掉SCP-XXX部分）
-                    name_part = link_text.split(' - ', 1)[1].strip()
-                    return name_part
-
-        # 如果没有找到，尝试在文本中直接搜索
-        page_text = soup.get_text()
-        lines = page_text.split('\n')
-        for line in lines:
-            if f"SCP-{scp_id_formatted}" in line and ' - ' in line:
-                parts = line.split(' - ', 1)
-                if len(parts) > 1:
-                    name_part = parts[1].strip()
-                    # 使用预编译正则清理可能的额外字符
-                    name_part = RE_CLEAN_NAME.sub('', name_part).strip()
-                    if name_part:
-                        return name_part
-
-        return ""  # 未找到名称
-
+        return series_index.get_name(_id)
     except Exception as e:
         vprint(f"获取SCP-{_id}名称时出错: {str(e)}")
         return ""
@@ -295,65 +485,66 @@ def affix_additional(results):
             del _results['more_info']
     
     return _results
-# 函数：scrape_scp（优化连接、解析与日志）
-def scrape_scp(id):
-    """改进的SCP爬取函数，增强错误处理和解析逻辑，包含系列、名称与图片信息"""
-    result_dict = {}
-    _id = harmonize_id(id)
-    url = base_url + _id
+# 函数：parse_scp_page（纯解析，不涉及网络）
+def parse_scp_page(id, content, page_url, scp_name=''):
+    """将已下载的页面 HTML 解析为记录字典
 
-    # 获取项目系列和名称
-    series_number = get_series_number(id)
-    scp_name = get_scp_name_from_series(id)
+    与网络请求解耦，同步、异步与多进程路径共用，保证输出一致。
+
+    Args:
+        id: SCP项目编号
+        content: 页面 HTML（bytes 或 str）
+        page_url: 页面最终URL，用于补全相对链接
+        scp_name: 从系列索引得到的项目名称
+
+    Returns:
+        记录字典；未找到页面主体时返回 {'error': ...}
+    """
+    result_dict = {}
 
     # 添加系列和名称到结果中
-    result_dict['series'] = series_number
+    result_dict['series'] = get_series_number(id)
     if scp_name:
         result_dict['name'] = scp_name
 
     # 先放入兜底的 id（标准格式），解析器会根据页面解析再覆盖或保持
     result_dict['id'] = f"SCP-{id:03d}"
 
-    try:
-        # 复用全局 session（含UA与重试）
-        response = session.get(url, timeout=10)
-        response.raise_for_status()  # 检查HTTP状态码
-        vprint(f"成功访问: {url}")
-
-    except requests.RequestException as e:
-        vprint(f"请求失败 {url}: {str(e)}")
-        return {'error': f'请求失败: {str(e)}'}
-
-    soup = BeautifulSoup(response.content, BS_PARSER)
-    page_content = soup.find('div', id='page-content')
+    # 解析 HTML 并单次遍历，同时收集字段块、图片与标签
+    with metrics.stage('html_parse'):
+        walk = parse_html(content)
 
-    if not page_content:
-        vprint(f"未找到页面内容: {url}")
+    if not walk.found:
+        vprint(f"未找到页面内容: {page_url}")
         return {'error': '未找到页面内容'}
 
-    # 获取所有可能包含信息的元素，不仅仅是p标签
-    elements = page_content.find_all(['p', 'div', 'blockquote'])
-
-    # 使用通用解析器解析字段
+    # 使用通用解析器解析字段（p/div/blockquote 块）
     parser = SCPParser()
-    parsed = parser.parse_page_content(elements, id, response.url)
+    with metrics.stage('fields'):
+        parsed = parser.parse_blocks(walk.iter_blocks(), id, page_url)
 
     # 合并解析结果
     result_dict.update(parsed)
 
-    # 优化：复用已获取的soup和page_content来提取图片，避免重复请求
-    images = extract_images_from_soup(soup, page_content, id, response.url)
-    if images:
-        result_dict['images'] = images
+    with metrics.stage('extract'):
+        # 提取图片信息（只在主体内容区域中）
+        images = extract_images_from_attrs(walk.images, id, page_url)
+        if images:
+            result_dict['images'] = images
 
-    # 提取标签信息
-    tags = extract_tags_from_soup(soup, page_content)
-    if tags:
-        result_dict['tags'] = tags
+        # 提取标签信息
+        tags = collect_tags(walk.tag_texts or [], walk.content_tag_texts)
+        if tags:
+            result_dict['tags'] = tags
+
+        # 站内链接（见 link_graph）
+        links = page_links(walk.links, page_url)
+        if links:
+            result_dict['links'] = links
 
     # 如果没有提取到任何有效字段
     if not result_dict or all(key == 'error' for key in result_dict.keys()):
-        vprint(f"警告: 未能提取到有效字段 {url}")
+        vprint(f"警告: 未能提取到有效字段 {page_url}")
         result_dict['warning'] = '未能提取到标准SCP字段'
 
     result_dict = affix_additional(result_dict)
@@ -363,50 +554,175 @@ def scrape_scp(id):
 
     return result_dict
 
-# --- Main Execution ---
-if __name__ == "__main__":
-    db = {}
-    
-    # --- 多线程爬取 ---
-    start_id = 1
-    end_id = 9999
-    max_workers = 8  # 可以根据网络和CPU调整
+def fetch_scp_page(id):
+    """下载项目页面原始内容
+
+    Returns:
+        (content, final_url)
+
+    Raises:
+        requests.RequestException: 请求失败或状态码异常
+    """
+    url = get_item_url(id)
+    # 复用全局 session（含UA与重试）
+    with metrics.stage('fetch'):
+        response = get_session().get(url, timeout=10)
+        content = response.content
+    record_response(response)
+    response.raise_for_status()  # 检查HTTP状态码
+    vprint(f"成功访问: {url}")
+    archive_page(item_key(id), content, response.url)
+    return content, response.url
+
+def parse_page(name, content, page_url):
+    """解析非编号页面（-CN-、-J、-EX 条目，故事与中心页等）
+
+    字段、图片、标签与链接的提取与 parse_scp_page 相同；没有系列与系列索引名称，
+    页面未给出编号时，条目类页面的 id 取大写的页面名（如 SCP-CN-001），其他页面取页面名；
+    只有条目类页面做字段完整性检查。
+    """
+    with metrics.stage('html_parse'):
+        walk = parse_html(content)
+
+    if not walk.found:
+        vprint(f"未找到页面内容: {page_url}")
+        return {'error': '未找到页面内容'}
+
+    kind = page_kind(name)
+    result_dict = {'page': name, 'kind': kind}
+    parser = SCPParser()
+    with metrics.stage('fields'):
+        result_dict.update(parser.parse_blocks(walk.iter_blocks(), 0, page_url, default_id=name if kind == 'page' else name.upper()))
+
+    with metrics.stage('extract'):
+        images = extract_images_from_attrs(walk.images, 0, page_url)
+        if images:
+            result_dict['images'] = images
+        tags = collect_tags(walk.tag_texts or [], walk.content_tag_texts)
+        if tags:
+            result_dict['tags'] = tags
+        links = page_links(walk.links, page_url)
+        if links:
+            result_dict['links'] = links
+
+    result_dict = affix_additional(result_dict)
+    if kind != 'page':
+        result_dict = SCPValidator.validate(result_dict)
+    return result_dict
+
+def fetch_page(name):
+    """下载非编号页面原始内容
+
+    Returns:
+        (content, final_url)
 
+    Raises:
+        requests.RequestException: 请求失败或状态码异常
+    """
+    url = get_page_url(name)
+    with metrics.stage('fetch'):
+        response = get_session().get(url, timeout=10)
+        content = response.content
+    record_response(response)
+    response.raise_for_status()
+    vprint(f"成功访问: {url}")
+    archive_page(page_key(name), content, response.url)
+    return content, response.url
+
+def scrape_page(name):
+    """抓取并解析一个非编号页面"""
+    import requests
+
+    try:
+        content, final_url = fetch_page(name)
+    except requests.RequestException as e:
+        vprint(f"请求失败 {get_page_url(name)}: {str(e)}")
+        return {'error': f'请求失败: {str(e)}'}
+    return parse_page(name, content, final_url)
+
+# 函数：scrape_scp（优化连接、解析与日志）
+def scrape_scp(id):
+    """改进的SCP爬取函数，增强错误处理和解析逻辑，包含系列、名称与图片信息"""
+    import requests
+
+    with metrics.page(id):
+        # 获取项目名称
+        with metrics.stage('series_lookup'):
+            scp_name = get_scp_name_from_series(id)
+
+        try:
+            content, final_url = fetch_scp_page(id)
+        except requests.RequestException as e:
+            vprint(f"请求失败 {get_item_url(id)}: {str(e)}")
+            return {'error': f'请求失败: {str(e)}'}
+
+        return parse_scp_page(id, content, final_url, scp_name)
+
+def report_result(i, total, scp_id, data, db, failed_ids, checkpoint=None):
+    """记录单条爬取结果并打印进度（各引擎共用）"""
+    if data and 'error' not in data:
+        with metrics.stage('write'):
+            db[str(scp_id)] = data
+        metrics.inc('pages_total', labels={'result': 'ok'})
+        if checkpoint is not None:
+            checkpoint.mark_done(scp_id)
+        print(f"({i}/{total}) 成功: SCP-{scp_id:03d}")
+    else:
+        error = data.get('error', '未知错误')
+        metrics.inc('pages_total', labels={'result': 'failed'})
+        failed_ids.append(scp_id)
+        if checkpoint is not None:
+            checkpoint.mark_failed(scp_id, error)
+        print(f"({i}/{total}) 失败: SCP-{scp_id:03d} - {error}")
+
+def report_exception(i, total, scp_id, exc, failed_ids, checkpoint=None):
+    """记录单条爬取中抛出的异常并打印进度"""
+    metrics.inc('pages_total', labels={'result': 'failed'})
+    failed_ids.append(scp_id)
+    if checkpoint is not None:
+        checkpoint.mark_failed(scp_id, str(exc))
+    print(f"({i}/{total}) 异常: SCP-{scp_id:03d} - {exc}")
+
+def crawl_threaded(ids, max_workers=8, sink=None, checkpoint=None):
+    """基于线程池的批量爬取
+
+    Args:
+        ids: 待爬取的编号
+        max_workers: 线程数
+        sink: 结果容器，支持 sink[key] = record（如 storage.JSONLWriter），默认为内存字典
+        checkpoint: 检查点（checkpoint.Checkpoint），记录已完成与失败的编号
+
+    Returns:
+        (db, failed_ids)
+    """
+    import concurrent.futures
+
+    ids = list(ids)
+    db = {} if sink is None else sink
     failed_ids = []
-    
-    start_time = time.time()
+
+    # 预先并发载入所有系列页，避免各线程首次查询时排队等待
+    with metrics.stage('series_warm'):
+        series_index.warm()
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 创建future到id的映射
-        future_to_id = {executor.submit(scrape_scp, i): i for i in range(start_id, end_id + 1)}
-        
+        future_to_id = {executor.submit(scrape_scp, i): i for i in ids}
+
         for i, future in enumerate(concurrent.futures.as_completed(future_to_id), 1):
             scp_id = future_to_id[future]
             try:
-                data = future.result()
-                if data and 'error' not in data:
-                    db[str(scp_id)] = data
-                    print(f"({i}/{end_id-start_id+1}) 成功: SCP-{scp_id:03d}")
-                else:
-                    failed_ids.append(scp_id)
-                    print(f"({i}/{end_id-start_id+1}) 失败: SCP-{scp_id:03d} - {data.get('error', '未知错误')}")
+                report_result(i, len(ids), scp_id, future.result(), db, failed_ids, checkpoint)
             except Exception as exc:
-                failed_ids.append(scp_id)
-                print(f"({i}/{end_id-start_id+1}) 异常: SCP-{scp_id:03d} - {exc}")
+                report_exception(i, len(ids), scp_id, exc, failed_ids, checkpoint)
 
-    end_time = time.time()
-    
-    # --- 结果处理 ---
-    # 写入数据库文件
-    try:
-        with open('scp_database_cn.json', 'w', encoding='utf-8') as f:
-            json.dump(db, f, ensure_ascii=False, indent=4)
-    except IOError as e:
-        print(f"写入文件失败: {e}")
-
-    print("\n=== 爬取完成 ===")
-    print(f"耗时: {end_time - start_time:.2f} 秒")
-    print(f"成功: {len(db)} 个")
-    print(f"失败: {len(failed_ids)} 个")
-    if failed_ids:
-        print(f"失败的ID: {sorted(failed_ids)}")
\ No newline at end of file
+    return db, failed_ids
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    # 兼容旧的运行方式：等同于 python cli.py crawl ...（参数见 cli.py）
+    # 由 cli 导入 temp_scraper 模块，站点、解析后端等设置作用于各引擎实际使用的同一模块
+    import sys
+    from cli import main
+
+    main(['crawl'] + sys.argv[1:])
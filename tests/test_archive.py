@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from archive import PageArchive, item_key, reparse_archive
+
+
+def snapshot(path):
+    return {p.name: p.read_bytes() for p in path.parent.iterdir()}
+
+
+def test_readonly_missing_archive_creates_nothing(tmp_path):
+    path = tmp_path / 'missing.arc'
+    with pytest.raises(FileNotFoundError):
+        PageArchive(str(path), readonly=True)
+    with pytest.raises(FileNotFoundError):
+        reparse_archive(str(path), workers=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_readonly_recovers_tail_in_memory_only(tmp_path):
+    path = tmp_path / 'pages.arc'
+    with PageArchive(str(path)) as archive:
+        archive.put(item_key(1), b'<html>one</html>')
+        archive.put(item_key(2), b'<html>two</html>')
+    # 索引丢掉最后一行、归档尾部残留半条记录
+    index = path.with_name('pages.arc.idx')
+    index.write_bytes(b''.join(index.read_bytes().splitlines(keepends=True)[:1]))
+    with open(path, 'ab') as f:
+        f.write(b'SCPARC1 {"key": "scp-3", "len')
+    before = snapshot(path)
+
+    with PageArchive(str(path), readonly=True) as archive:
+        assert [entry['key'] for entry in archive.entries()] == [item_key(1), item_key(2)]
+        assert archive.get(item_key(2)) == b'<html>two</html>'
+        with pytest.raises(io.UnsupportedOperation):
+            archive.put(item_key(3), b'<html>three</html>')
+    assert snapshot(path) == before
+
+
+def test_reparse_leaves_archive_untouched(tmp_path):
+    path = tmp_path / 'pages.arc'
+    with PageArchive(str(path)) as archive:
+        archive.put(item_key(1), b'<html><body>no content</body></html>')
+    before = snapshot(path)
+
+    db, failed_ids = reparse_archive(str(path), workers=1)
+    assert db == {}
+    assert failed_ids == [1]
+    assert snapshot(path) == before
@@ -0,0 +1,53 @@
+import pytest
+
+from checkpoint import Checkpoint, http_status, is_retryable
+from distributed import WorkQueue
+
+
+@pytest.mark.parametrize('error, status, retryable', [
+    ("请求失败: 404 Client Error: Not Found for url: http://scp-wiki-cn.wikidot.com/scp-049", 404, False),
+    ("请求失败: 404, message='Not Found', url='http://scp-wiki-cn.wikidot.com/scp-049'", 404, False),
+    ("404 Client Error: Not Found for url: http://scp-wiki-cn.wikidot.com/scp-049", 404, False),
+    ('未找到页面内容', None, False),
+    # URL 中含 404 的瞬时错误仍应重试
+    ("请求失败: 500 Server Error: Internal Server Error for url: http://scp-wiki-cn.wikidot.com/scp-1404", 500, True),
+    ("请求失败: 503, message='Service Unavailable', url='http://scp-wiki-cn.wikidot.com/scp-404'", 503, True),
+    ("请求失败: HTTPConnectionPool(host='scp-wiki-cn.wikidot.com', port=80): "
+     "Max retries exceeded with url: /scp-4040", None, True),
+    ("请求失败: Read timed out. (read timeout=10) /scp-2404", None, True),
+    ('', None, True),
+])
+def test_is_retryable(error, status, retryable):
+    assert http_status(error) == status
+    assert is_retryable(error) is retryable
+
+
+def test_explicit_status_overrides_text():
+    assert is_retryable('请求失败: 连接被重置', status=404) is False
+    assert is_retryable('请求失败: 连接被重置', status=503) is True
+
+
+def test_checkpoint_keeps_transient_failures_retryable(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    checkpoint.mark_failed(404, "请求失败: 502 Server Error: Bad Gateway for url: http://x/scp-404")
+    checkpoint.mark_failed(1404, "请求失败: HTTPConnectionPool(host='x'): Max retries exceeded with url: /scp-1404")
+    checkpoint.mark_failed(12, "请求失败: 404 Client Error: Not Found for url: http://x/scp-012")
+    checkpoint.save()
+
+    reloaded = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    assert reloaded.failed[404]['status'] == 502
+    assert reloaded.failed[12]['status'] == 404
+    assert reloaded.retryable_failures(max_attempts=5) == [404, 1404]
+
+
+def test_work_queue_requeues_transient_failures(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'))
+    queue.enqueue([12, 1404])
+    assert queue.lease('w1', 10) == [12, 1404]
+    queue.complete('w1', [], {
+        12: "请求失败: 404 Client Error: Not Found for url: http://x/scp-012",
+        1404: "请求失败: 500 Server Error: Internal Server Error for url: http://x/scp-1404",
+    })
+    assert queue.stats()['pending'] == 1
+    assert list(queue.failures()) == [12]
+    queue.close()
@@ -0,0 +1,69 @@
+import copy
+
+from dedup import PARSE_FIELDS, dedupe_record, expand_shared, pack_shared, split_segments
+from scp_parser import SCPParser
+
+RECORD = {
+    'id': 'SCP-999',
+    'description': 'SCP-999 是一团橙色的凝胶状物质。它会主动拥抱人员。SCP-999 是一团橙色的凝胶状物质。',
+    'containment': 'SCP-999 is kept in a standard containment cell. Staff may visit. '
+                   'SCP-999 is kept in a standard containment cell.',
+    'addendum': '测试 12：向 SCP-999 展示一只猫。结果：SCP-999 没有表现出任何反应。'
+                '测试 13：向 SCP-999 展示一只狗。结果：SCP-999 没有表现出任何反应。',
+    'experiment_log': '结果：SCP-999 没有表现出任何反应。',
+    'notes': 'SCP-999 是一团橙色的凝胶状物质，它会主动拥抱人员。',
+}
+
+
+def test_split_segments_is_lossless():
+    for value in RECORD.values():
+        assert ''.join(split_segments(value)) == value
+
+
+def test_parse_time_dedupes_only_within_main_fields():
+    record = copy.deepcopy(RECORD)
+    saved = dedupe_record(record, fields=PARSE_FIELDS)
+    assert record['description'] == 'SCP-999 是一团橙色的凝胶状物质。它会主动拥抱人员。'
+    assert record['containment'] == 'SCP-999 is kept in a standard containment cell. Staff may visit.'
+    # 各次实验中相同的结果句、其他字段中重复的内容都是有意义的，原样保留
+    for field in ('id', 'addendum', 'experiment_log', 'notes'):
+        assert record[field] == RECORD[field]
+    assert saved == sum(len(RECORD[f].encode('utf-8')) - len(record[f].encode('utf-8')) for f in PARSE_FIELDS)
+
+
+def test_ensure_required_fields_keeps_repeated_results():
+    result = SCPParser().ensure_required_fields(copy.deepcopy(RECORD), 999)
+    assert result['addendum'] == RECORD['addendum']
+    assert result['experiment_log'] == RECORD['experiment_log']
+
+
+def test_deduplicate_content_keeps_short_unique_sentences():
+    parser = SCPParser()
+    assert parser.deduplicate_content('是。否。是的，确实如此。') == '是。否。是的，确实如此。'
+    assert parser.deduplicate_content('Stop. Stop. Go on.') == 'Stop. Go on.'
+
+
+def test_cross_field_is_opt_in():
+    record = copy.deepcopy(RECORD)
+    dedupe_record(record, cross_field=True)
+    assert record['addendum'].count('没有表现出任何反应') == 1
+    # 整个字段都与前文重复时变为空串，不保留原样
+    assert record['experiment_log'] == ''
+    assert record['notes'] == RECORD['notes']
+
+
+def test_near_compares_against_single_blocks():
+    first = 'The subject was observed for seventy two hours without any change in behaviour.'
+    second = 'Gears noted the anomalous readings persisted through every single trial run.'
+    # 由前两个块拼成：与前文整体的重合率超过阈值，但与任何一个块都不近似
+    mixed = ('observed for seventy two hours without any change; '
+             'anomalous readings persisted through every single trial run.')
+    near = 'The subject was observed for seventy two hours without any change in behaviours.'
+    record = {'description': ' '.join((first, second, mixed, near))}
+    dedupe_record(record, near=True)
+    assert record['description'] == ' '.join((first, second, mixed))
+
+
+def test_pack_round_trip():
+    db = {'1': copy.deepcopy(RECORD), '2': copy.deepcopy(RECORD)}
+    assert expand_shared(pack_shared(db)) == db
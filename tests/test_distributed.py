@@ -0,0 +1,19 @@
+import pytest
+
+from distributed import WorkQueue
+
+
+@pytest.mark.parametrize('mode', ['wal', 'delete'])
+def test_journal_mode(tmp_path, mode):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), journal_mode=mode)
+    try:
+        assert queue._conn.execute('PRAGMA journal_mode').fetchone()[0] == mode
+        assert queue.enqueue(range(1, 4)) == 3
+    finally:
+        queue.close()
+
+
+def test_unknown_journal_mode(tmp_path):
+    with pytest.raises(ValueError):
+        WorkQueue(str(tmp_path / 'queue.sqlite'), journal_mode='memory')
+    assert not (tmp_path / 'queue.sqlite').exists()
@@ -0,0 +1,24 @@
+from requests.adapters import HTTPAdapter
+
+import temp_scraper
+from images import image_session
+from throttle import RETRY_STATUSES, AdaptiveThrottle, ThrottledAdapter
+
+
+def test_image_session_without_throttle(monkeypatch):
+    monkeypatch.setattr(temp_scraper, 'throttle', None)
+    http = image_session(4)
+    adapter = http.get_adapter('https://scp-wiki-cn.wikidot.com/')
+    assert type(adapter) is HTTPAdapter
+    assert http.headers['User-Agent'] == temp_scraper.get_session().headers['User-Agent']
+
+
+def test_image_session_shares_throttle(monkeypatch):
+    # 图片下载与页面请求共用同一个节流器，计入 --throttle/--global-rate 的速率
+    throttle = AdaptiveThrottle(rate=2.0, max_rate=4.0)
+    monkeypatch.setattr(temp_scraper, 'throttle', throttle)
+    http = image_session(4)
+    adapter = http.get_adapter('https://scp-wiki-cn.wikidot.com/')
+    assert isinstance(adapter, ThrottledAdapter)
+    assert adapter.throttle is throttle
+    assert not set(adapter.max_retries.status_forcelist) & set(RETRY_STATUSES)
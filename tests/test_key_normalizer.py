@@ -0,0 +1,60 @@
+import json
+import os
+import re
+
+import pytest
+
+from scp_parser import KeyNormalizer, SCPParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_normalize_key(key):
+    """旧版 SCPParser.normalize_key：逐项小写比较 FIELD_MAPPING"""
+    if not key:
+        return ''
+    key = key.strip().rstrip('：:')
+    key_lower = key.lower()
+    for pattern, standard_key in SCPParser.FIELD_MAPPING.items():
+        if pattern.lower() == key_lower:
+            return standard_key
+    return re.sub(r'[^\w\u4e00-\u9fff]', '_', key).lower()
+
+
+def sample_keys():
+    keys = []
+    with open(os.path.join(ROOT, 'sample_database.json'), 'r', encoding='utf-8') as f:
+        for record in json.load(f).values():
+            keys.extend(record)
+            for value in record.values():
+                if isinstance(value, dict):
+                    keys.extend(value)
+    return keys
+
+
+def key_variants():
+    keys = sample_keys() + [
+        '', 'Item', 'item', 'Item#', 'ITEM #', 'Item # :', 'item_number', 'item-number', 'Object-Class',
+        'SCP-编号', '项目 编号', '附录 049-1：', '实验记录 049-A：', 'Description', 'ß', 'İtem #',
+    ]
+    for pattern in SCPParser.FIELD_MAPPING:
+        keys += [pattern, pattern.upper(), pattern.title(), f'  {pattern}：', f'{pattern}:', f'{pattern} :',
+                 pattern.replace(' ', ''), pattern.replace(' ', '_')]
+    return keys
+
+
+@pytest.mark.parametrize('key', key_variants())
+def test_matches_legacy_normalize_key(key):
+    assert SCPParser().normalize_key(key) == legacy_normalize_key(key)
+
+
+def test_uncached_matches_cached():
+    uncached = KeyNormalizer(SCPParser.FIELD_MAPPING, cache_size=0)
+    cached = KeyNormalizer(SCPParser.FIELD_MAPPING)
+    for key in key_variants() * 2:
+        assert uncached(key) == cached(key) == legacy_normalize_key(key)
+
+
+def test_bare_item_is_not_an_id():
+    assert SCPParser().normalize_key('Item') == 'item'
+    assert SCPParser().normalize_key('Item #:') == 'id'
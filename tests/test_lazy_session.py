@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_engines_does_not_build_session():
+    # 在独立进程中检查：导入各引擎模块不应创建全局 session 与重试策略
+    code = ('import async_scraper, discovery, images, incremental, temp_scraper; '
+            'print(temp_scraper._session, temp_scraper._retry_strategy)')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['None', 'None']
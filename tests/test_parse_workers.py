@@ -0,0 +1,24 @@
+import multiprocessing
+
+import pytest
+
+import temp_scraper
+from async_scraper import process_parse_pool
+
+
+@pytest.fixture
+def spawn_with_options():
+    # spawn 启动的子进程不继承主进程的模块状态，只能靠进程池初始化函数传递选项
+    method = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method('spawn', force=True)
+    temp_scraper.set_html_backend('strainer')
+    temp_scraper.set_text_options(fold_variants=True, redact_blocks=True)
+    yield
+    temp_scraper.set_html_backend(None)
+    temp_scraper.set_text_options()
+    multiprocessing.set_start_method(method, force=True)
+
+
+def test_process_parse_pool_passes_options(spawn_with_options):
+    with process_parse_pool(1) as pool:
+        assert pool.submit(temp_scraper.parse_worker_options).result() == ('strainer', (True, True))
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from reader import RecordReader, record_key
+from storage import JSONLWriter, write_json_database
+
+DB = {
+    '1': {'id': 'SCP-001', 'name': '"引号" 与 {括号}, [逗号]', 'class': 'Thaumiel'},
+    '49': {'id': 'SCP-049', 'name': '疫医', 'class': 'Euclid', 'tags': ['人形', 'euclid'],
+           'more_info': {'附录': '第一行\n第二行'}},
+    '173': {'id': 'SCP-173', 'name': '雕像 - 原初', 'class': 'Euclid', 'empty': {}},
+    '8900': {'id': 'SCP-8900', 'name': '\\ 反斜杠 \\"', 'class': 'Keter', 'list': []},
+}
+
+
+def assert_round_trip(path, expected):
+    with RecordReader(str(path)) as reader:
+        assert reader.keys() == list(expected)
+        assert dict(reader.items()) == expected
+        assert reader.get(49, fields=['id', 'class', 'missing']) == {'id': 'SCP-049', 'class': 'Euclid'}
+        assert reader.get('404') is None
+    # 第二次打开只读取索引
+    with RecordReader(str(path)) as reader:
+        assert dict(reader.items()) == expected
+
+
+def dump_json(**options):
+    def dump(db, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(db, f, **options)
+    return dump
+
+
+@pytest.mark.parametrize('dump', [
+    lambda db, path: write_json_database(db.items(), path),
+    dump_json(ensure_ascii=False, indent=2),
+    dump_json(ensure_ascii=False),
+    dump_json(separators=(',', ':')),
+], ids=['write_json_database', 'indent-2', 'compact', 'ascii-compact'])
+def test_json_round_trip(tmp_path, dump):
+    path = tmp_path / 'scp_database_cn.json'
+    dump(DB, str(path))
+    assert_round_trip(path, DB)
+
+
+def test_json_rebuilds_stale_index(tmp_path):
+    path = tmp_path / 'scp_database_cn.json'
+    write_json_database(DB.items(), str(path))
+    assert_round_trip(path, DB)
+    changed = dict(DB, **{'49': {'id': 'SCP-049', 'name': '已更新', 'class': 'Euclid'}})
+    write_json_database(changed.items(), str(path))
+    assert_round_trip(path, changed)
+
+
+def test_jsonl_appends_and_torn_tail(tmp_path):
+    path = tmp_path / 'scp_database_cn.jsonl'
+    with JSONLWriter(str(path)) as writer:
+        for key in ('1', '49'):
+            writer[key] = DB[key]
+    with RecordReader(str(path)) as reader:
+        assert dict(reader.items()) == {'1': DB['1'], '49': DB['49']}
+
+    # 追加的记录从上次扫描位置继续索引；同一编号以最后一次为准
+    updated = {'id': 'SCP-049', 'name': '疫医（重写）'}
+    with JSONLWriter(str(path)) as writer:
+        writer['173'] = DB['173']
+        writer['49'] = updated
+    with RecordReader(str(path)) as reader:
+        assert reader.keys() == ['1', '49', '173']
+        assert reader['49'] == updated
+
+    # 崩溃残留的半行不产出，补全后可读
+    line = json.dumps({'key': '8900', 'record': DB['8900']}, ensure_ascii=False) + '\n'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line[:20])
+    with RecordReader(str(path)) as reader:
+        assert '8900' not in reader
+        assert len(reader) == 3
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line[20:])
+    with RecordReader(str(path)) as reader:
+        assert reader['8900'] == DB['8900']
+        assert reader['49'] == updated
+
+
+def test_jsonl_rewritten_file_rebuilds_index(tmp_path):
+    path = tmp_path / 'scp_database_cn.jsonl'
+    with JSONLWriter(str(path)) as writer:
+        writer['1'] = DB['1']
+    with RecordReader(str(path)) as reader:
+        assert reader['1'] == DB['1']
+
+    # 删除后重新爬取：文件更长，但旧偏移指向的已是别的内容
+    path.unlink()
+    rewritten = {'8900': DB['8900'], '1': {'id': 'SCP-001', 'name': '重新爬取'}, '49': DB['49']}
+    with JSONLWriter(str(path)) as writer:
+        for key, record in rewritten.items():
+            writer[key] = record
+    with RecordReader(str(path)) as reader:
+        assert dict(reader.items()) == rewritten
+
+
+@pytest.mark.parametrize('key, expected', [
+    ('049', '49'), ('173', '173'), ('0', '0'), ('SCP-100', 'SCP-100'), ('²', '²'),
+])
+def test_record_key(key, expected):
+    assert record_key(key) == expected
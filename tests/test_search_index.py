@@ -0,0 +1,70 @@
+import math
+import sqlite3
+
+import pytest
+
+from search_index import BM25_B, BM25_K1, INDEX_VERSION, SearchIndex, tokenize
+
+DB = {
+    '1': {'id': 'SCP-001', 'name': '大门', 'description': '一扇大门'},
+    '2': {'id': 'SCP-002', 'name': '门卫', 'description': '看守'},
+    '3': {'id': 'SCP-003', 'name': '雕像', 'description': '它在大厅里'},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / 'scp_search.sqlite'))
+    index.update(DB)
+    yield index
+    index.close()
+
+
+def keys(results):
+    return sorted(result['key'] for result in results)
+
+
+def test_tokenize():
+    assert list(tokenize('SCP-173 雕像')) == ['scp', '173', '雕像']
+    assert list(tokenize('雕像', unigrams=True)) == ['雕', '像', '雕像']
+    assert list(tokenize('门')) == ['门']
+
+
+@pytest.mark.parametrize('query, expected', [
+    # 单字位于二字组的开头、末尾或中间都能命中
+    ('门', ['1', '2']),
+    ('扇', ['1']),
+    ('像', ['3']),
+    ('大', ['1', '3']),
+    ('大门', ['1']),
+    ('大 门', ['1']),
+    ('scp-003', ['3']),
+])
+def test_single_character_recall(index, query, expected):
+    assert keys(index.search(query)) == expected
+
+
+def test_single_character_is_scored_once(index):
+    # 一个查询字只对应一个词项，不会按它所在的每个二字组重复计分
+    df, tf = 2, 3 + 1  # 文档 1 中 '门' 出现在 name（权重 3）与 description 中
+    idf = math.log(1 + (index.doc_count - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * index._lengths[1] / index.avg_length)
+    scores = {result['key']: result['score'] for result in index.search('门')}
+    assert scores['1'] == round(idf * tf * (BM25_K1 + 1) / (tf + norm), 4)
+
+
+def test_old_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'scp_search.sqlite')
+    SearchIndex(path).close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO docs (key, hash, length, terms) VALUES ('1', 'stale', 1, '[]')")
+        conn.execute('PRAGMA user_version = 1')
+    index = SearchIndex(path)
+    try:
+        assert len(index) == 0
+        assert index.update(DB)['added'] == 3
+        assert keys(index.search('门')) == ['1', '2']
+    finally:
+        index.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == INDEX_VERSION
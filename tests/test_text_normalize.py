@@ -0,0 +1,57 @@
+import random
+import re
+
+import pytest
+
+from text_normalize import TextNormalizer
+
+# 旧版 SCPParser.clean_value：依次做三次正则替换
+RE_REDACT = re.compile(r'\[数据删除\]|\[资料删除\]|\[已编辑\]|\[删除\]|\[REDACTED\]|\[DATA EXPUNGED\]', re.IGNORECASE)
+RE_WS = re.compile(r'\s+')
+RE_COLON_PREFIX = re.compile(r'^[：:]\s*')
+
+
+def legacy_clean_value(value):
+    if not value:
+        return ''
+    value = RE_REDACT.sub('[REDACTED]', value)
+    value = RE_WS.sub(' ', value)
+    value = RE_COLON_PREFIX.sub('', value)
+    return value.strip()
+
+
+PIECES = [
+    'a', 'SCP-049', '收容', '項目', '應', ' ', '\t', '\n', '\r\n', '\u3000', '\x85', '\u2028', '\x1c', '\xa0',
+    ':', '：', '[', ']', '[数据删除]', '[DATA expunged]', '[redacted]', '[數據刪除]', '[刪除]',
+    '█', '▇', '▉', '\u200b', '\u00ad', '\ufeff',
+]
+
+
+@pytest.mark.parametrize('value', [
+    None, '', '   ', ':', '：  Euclid', ' : Keter ', '\n：Safe', '项目编号：\tSCP-173',
+    '描述：SCP-049 是一个 [数据删除] 的人形实体。\n\n', 'Dr. [Redacted] 于 [DATA EXPUNGED] 进行了实验。',
+    '应收容於標準人形收容單元內 [數據刪除]', '██████ 博士', '▇▇ 站点', 'zero\u200bwidth\u00adsoft\ufeff',
+])
+def test_defaults_match_legacy(value):
+    assert TextNormalizer()(value) == legacy_clean_value(value)
+
+
+def test_defaults_match_legacy_fuzz():
+    normalizer = TextNormalizer()
+    rng = random.Random(20240601)
+    for _ in range(5000):
+        value = ''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 12)))
+        assert normalizer(value) == legacy_clean_value(value), repr(value)
+
+
+def test_fold_variants_is_opt_in():
+    normalizer = TextNormalizer(fold_variants=True)
+    assert normalizer('應收容於標準單元 [數據刪除]') == '应收容于标准单元 [REDACTED]'
+    assert normalizer('zero\u200bwidth') == 'zerowidth'
+    assert normalizer('▇▇') == '▇▇'
+
+
+def test_redact_blocks_is_opt_in():
+    normalizer = TextNormalizer(redact_blocks=True)
+    assert normalizer('██▇▉ 博士') == '[REDACTED] 博士'
+    assert normalizer('[數據刪除]') == '[數據刪除]'
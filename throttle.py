@@ -0,0 +1,286 @@
+"""
+SCP 自适应限速模块 - 按主机的令牌桶 + AIMD 并发控制
+
+固定线程数配合 urllib3 的重试退避时，一旦站点开始限流，所有线程会同时陷入重试等待。
+这里由所有请求共享一个按主机的节流器：
+    - 令牌桶限制请求速率，并发上限限制同时在途的请求数
+    - 起步阶段（慢启动）每个健康响应使速率与并发 +0.5，约每秒翻倍，直到第一次拥塞信号
+    - 之后响应健康时加性增加速率与并发（每个响应 +1/当前值，约每秒或每个往返周期 +1）
+    - 收到 429/5xx、连接错误或延迟明显上升时乘性减少，并在冷却期内只减少一次
+    - 遵守 Retry-After：在指定时间内暂停该主机的所有请求
+当前速率与并发通过 snapshot()/describe() 公开，可据此把爬取速度维持在站点的真实上限附近。
+"""
+import asyncio
+import email.utils
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachingAdapter
+from metrics import metrics
+
+# 由节流器自行等待并重发的状态码；使用节流器时应从 urllib3 Retry 的 status_forcelist 中去掉
+RETRY_STATUSES = frozenset((429, 503))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostThrottle:
+    """单个主机的令牌桶与 AIMD 并发控制（线程安全，也可在事件循环中使用）"""
+
+    def __init__(self, rate: float = 5.0, min_rate: float = 0.5, max_rate: float = 50.0,
+                 concurrency: float = 4, min_concurrency: int = 1, max_concurrency: int = 32,
+                 latency_factor: float = 2.0, cooldown: float = 1.0, max_pause: float = 60.0):
+        """
+        Args:
+            rate: 初始速率（请求/秒）
+            min_rate/max_rate: 速率上下限
+            concurrency: 初始并发上限
+            min_concurrency/max_concurrency: 并发上下限
+            latency_factor: 平滑延迟超过最低延迟的该倍数时视为拥塞
+            cooldown: 两次减速之间的最短间隔（秒），避免同一波限流被重复惩罚
+            max_pause: 429 未带 Retry-After 时的最长暂停（秒）
+        """
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+
+        self.tokens = 1.0
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.min_latency: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._consecutive_throttled = 0
+        self._slow_start = True
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _try_acquire_locked(self, now: float) -> Optional[float]:
+        """尝试占用一个请求名额
+
+        Returns:
+            0 表示已占用；正数为至少需要等待的秒数；None 表示并发已满，需等待释放
+        """
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.inflight >= max(1, int(self.limit)):
+            return None
+        # 桶容量随速率变化，最多积攒约一秒的令牌
+        capacity = max(1.0, self.rate)
+        self.tokens = min(capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        if self.tokens < 1.0:
+            return (1.0 - self.tokens) / self.rate
+        self.tokens -= 1.0
+        self.inflight += 1
+        self.requests += 1
+        return 0.0
+
+    def acquire(self) -> None:
+        """阻塞直到可以发出一个请求"""
+        with self._cond:
+            while True:
+                wait = self._try_acquire_locked(time.monotonic())
+                if wait == 0.0:
+                    return
+                # 并发已满时等待 release 的通知；超时兜底，防止丢失通知
+                self._cond.wait(timeout=1.0 if wait is None else wait)
+
+    async def acquire_async(self) -> None:
+        """acquire 的协程版本（只短暂持锁，不阻塞事件循环）"""
+        while True:
+            with self._cond:
+                wait = self._try_acquire_locked(time.monotonic())
+            if wait == 0.0:
+                return
+            await asyncio.sleep(0.01 if wait is None else wait)
+
+    def release(self, status: Optional[int] = None, latency: Optional[float] = None,
+                retry_after: Optional[float] = None) -> None:
+        """归还名额并根据响应调整速率
+
+        Args:
+            status: HTTP 状态码；请求抛出异常时为 None
+            latency: 从发出请求到收到响应头的秒数
+            retry_after: 已解析的 Retry-After 秒数
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.inflight -= 1
+            if status == 429 or (status == 503 and retry_after is not None):
+                self.throttled += 1
+                self._consecutive_throttled += 1
+                if retry_after is None:
+                    retry_after = min(self.max_pause, 2.0 ** self._consecutive_throttled)
+                self.paused_until = max(self.paused_until, now + retry_after)
+                self._decrease_locked(now, 0.5)
+            elif status is None or status >= 500:
+                self.errors += 1
+                self._decrease_locked(now, 0.7)
+            else:
+                self._consecutive_throttled = 0
+                if latency is not None and self._latency_rising(latency):
+                    self._decrease_locked(now, 0.9)
+                elif self._slow_start:
+                    self.limit = min(self.max_concurrency, self.limit + 0.5)
+                    self.rate = min(self.max_rate, self.rate + 0.5)
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+                    self.rate = min(self.max_rate, self.rate + 1.0 / self.rate)
+            self._cond.notify_all()
+
+    def _latency_rising(self, latency: float) -> bool:
+        """更新延迟统计，判断平滑延迟是否明显高于历史最低值"""
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = 0.8 * self.ewma_latency + 0.2 * latency
+        # 绝对差也需超过 50ms，避免本地或极快响应上的抖动被当作拥塞
+        return (self.ewma_latency > self.min_latency * self.latency_factor
+                and self.ewma_latency - self.min_latency > 0.05)
+
+    def _decrease_locked(self, now: float, factor: float) -> None:
+        self._slow_start = False
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.limit = max(self.min_concurrency, self.limit * factor)
+        self.tokens = min(self.tokens, 1.0)
+
+    def set_max_rate(self, max_rate: float) -> None:
+        """调整速率上限，当前速率超出时立即降到上限"""
+        with self._cond:
+            self.max_rate = max_rate
+            self.min_rate = min(self.min_rate, max_rate)
+            self.rate = min(self.rate, max_rate)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, float]:
+        """当前状态"""
+        with self._cond:
+            return {
+                'rate': round(self.rate, 2),
+                'concurrency': int(self.limit),
+                'inflight': self.inflight,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'latency_ms': round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+                'paused_for': round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+
+class AdaptiveThrottle:
+    """按主机分配 HostThrottle 的共享节流器"""
+
+    def __init__(self, **host_options):
+        """
+        Args:
+            **host_options: 传给每个 HostThrottle 的参数（rate、max_rate、max_concurrency 等）
+        """
+        self.host_options = host_options
+        self._hosts: Dict[str, HostThrottle] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostThrottle:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            throttle = self._hosts.get(host)
+            if throttle is None:
+                throttle = self._hosts[host] = HostThrottle(**self.host_options)
+            return throttle
+
+    def set_max_rate(self, max_rate: float) -> None:
+        """调整所有主机（包括之后新建的）的速率上限，如多个工作进程分摊全局限额时"""
+        with self._lock:
+            self.host_options['max_rate'] = max_rate
+            if 'rate' in self.host_options:
+                self.host_options['rate'] = min(self.host_options['rate'], max_rate)
+            hosts = list(self._hosts.values())
+        for host in hosts:
+            host.set_max_rate(max_rate)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: throttle.snapshot() for host, throttle in hosts.items()}
+
+    def describe(self) -> str:
+        """一行文字的当前状态，如 'example.com 12.5 req/s 并发 8 429×3'"""
+        parts = []
+        for host, s in self.snapshot().items():
+            parts.append(f"{host} {s['rate']} req/s 并发 {s['concurrency']} 429×{s['throttled']} 错误×{s['errors']}")
+        return '; '.join(parts) or '尚无请求'
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """经过 AdaptiveThrottle 发送请求的 HTTPAdapter
+
+    429/503 由这里等待（遵守 Retry-After）后重发，最多 throttle_retries 次；
+    其余瞬时错误仍交给 urllib3 Retry。
+    """
+
+    def __init__(self, throttle: Optional[AdaptiveThrottle] = None, throttle_retries: int = 5, **kwargs):
+        super().__init__(**kwargs)
+        self.throttle = throttle
+        self.throttle_retries = throttle_retries
+
+    def send(self, request, **kwargs):
+        if self.throttle is None:
+            return super().send(request, **kwargs)
+
+        host = self.throttle.for_url(request.url)
+        for attempt in range(self.throttle_retries + 1):
+            host.acquire()
+            start = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                host.release(None, time.monotonic() - start)
+                raise
+            host.release(response.status_code, time.monotonic() - start,
+                         parse_retry_after(response.headers.get('Retry-After')))
+            if response.status_code not in RETRY_STATUSES or attempt == self.throttle_retries:
+                return response
+            metrics.inc('http_responses_total', labels={'status': response.status_code})
+            metrics.inc('http_retries_total')
+            # 读完并释放连接，以便重发时复用
+            response.content
+            response.close()
+        return response
+
+
+class ThrottledCachingAdapter(CachingAdapter, ThrottledAdapter):
+    """先查缓存，需要访问网络时再经过节流器（缓存命中不消耗令牌）"""